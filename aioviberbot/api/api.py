@@ -1,26 +1,80 @@
-import hashlib
-import hmac
+import asyncio
 import json
 import logging
+import time
 
 from aioviberbot.api.consts import VIBER_BOT_API_URL, VIBER_BOT_USER_AGENT
-from aioviberbot.api.viber_requests import create_request
+from aioviberbot.api.errors import ViberReceiverSuppressedError
+from aioviberbot.api.viber_requests import (
+    ViberConversationStartedRequest,
+    ViberMessageRequest,
+    ViberSubscribedRequest,
+    create_request,
+)
 from aioviberbot.api.api_request_sender import ApiRequestSender
+from aioviberbot.api.broadcaster import DEFAULT_BROADCAST_PARALLELISM, Broadcaster
 from aioviberbot.api.message_sender import MessageSender
+from aioviberbot.api.online_coalescer import OnlineStatusCoalescer
+from aioviberbot.api.signature_verifier import SignatureVerifier
 
 
 class Api:
-    def __init__(self, bot_configuration, client_session=None):
-        self._logger = logging.getLogger('aioviberbot')
+    def __init__(
+            self,
+            bot_configuration,
+            client_session=None,
+            rate_limiter=None,
+            retry_policy=None,
+            logger=None,
+            json_loads=None,
+            user_cache=None,
+            online_batch_window=None,
+            verification_tokens=None,
+            api_url=VIBER_BOT_API_URL,
+            instrumentation=None,
+            hedge_policy=None,
+            suppression_list=None,
+    ):
+        self._logger = logger or logging.getLogger('aioviberbot')
         self._bot_configuration = bot_configuration
+        # json.loads accepts bytes as well, so request data is never decoded to str first
+        self._json_loads = json_loads or json.loads
         self._request_sender = ApiRequestSender(
             logger=self._logger,
-            viber_bot_api_url=VIBER_BOT_API_URL,
+            viber_bot_api_url=api_url,
             bot_configuration=bot_configuration,
             viber_bot_user_agent=VIBER_BOT_USER_AGENT,
             client_session=client_session,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            instrumentation=instrumentation,
+            hedge_policy=hedge_policy,
         )
         self._message_sender = MessageSender(self._logger, self._request_sender)
+        self._broadcaster = Broadcaster(self._logger, self._message_sender, bot_configuration, suppression_list)
+        self._user_cache = user_cache
+        self._get_online_status = self._request_sender.get_online_status
+        if online_batch_window is not None:
+            self._get_online_status = OnlineStatusCoalescer(
+                self._request_sender.get_online_status, online_batch_window).get_online
+        self._background_tasks = set()
+        self._instrumentation = instrumentation
+        self._signature_verifier = SignatureVerifier(
+            [bot_configuration.auth_token] + list(verification_tokens or ()))
+        self._suppression_list = suppression_list
+
+    async def close(self):
+        """
+        Releases the connections opened by the api.
+        Does nothing with the client_session passed to the constructor.
+        """
+        await self._request_sender.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
 
     @property
     def name(self):
@@ -31,7 +85,7 @@ class Api:
         return self._bot_configuration.avatar
 
     async def set_webhook(self, url, webhook_events=None, is_inline=False, send_name=True, send_photo=True):
-        self._logger.debug('setting webhook to url: {0}'.format(url))
+        self._logger.debug('setting webhook to url: %s', url)
         return await self._request_sender.set_webhook(url, webhook_events, is_inline, send_name, send_photo)
 
     async def unset_webhook(self):
@@ -39,67 +93,172 @@ class Api:
         return await self._request_sender.set_webhook('')
 
     async def get_online(self, ids):
-        return await self._request_sender.get_online_status(ids)
+        if self._user_cache is not None:
+            return await self._user_cache.get_online(ids, self._get_online_status)
+        return await self._get_online_status(ids)
 
-    async def get_user_details(self, user_id):
+    async def get_user_details(self, user_id, allow_partial=False):
+        """
+        :param user_id: Viber user id
+        :param allow_partial: Optional. Whether details of the user cache primed from callbacks are enough,
+            they have no device fields.
+        """
+        if self._user_cache is not None and user_id is not None:
+            return await self._user_cache.get_user_details(
+                user_id, self._request_sender.get_user_details, allow_partial)
         return await self._request_sender.get_user_details(user_id)
 
     async def get_account_info(self):
         self._logger.debug('requesting account info')
         account_info = await self._request_sender.get_account_info()
-        self._logger.debug('received account info: {0}'.format(account_info))
+        self._logger.debug('received account info: %s', account_info)
         return account_info
 
     def verify_signature(self, request_data, signature):
-        return signature == self._calculate_message_signature(request_data)
+        if self._instrumentation is None:
+            return self._signature_verifier.verify(request_data, signature)
+
+        started = time.perf_counter()
+        verified = self._signature_verifier.verify(request_data, signature)
+        self._instrumentation.signature_verified(time.perf_counter() - started, len(request_data), verified)
+        return verified
 
     def parse_request(self, request_data):
+        if self._instrumentation is None:
+            return self._parse_request(request_data)
+
+        started = time.perf_counter()
+        try:
+            request = self._parse_request(request_data)
+        except Exception as e:
+            self._instrumentation.request_parsed(None, time.perf_counter() - started, len(request_data), e)
+            raise
+        self._instrumentation.request_parsed(
+            request.event_type, time.perf_counter() - started, len(request_data), None)
+        return request
+
+    def _parse_request(self, request_data):
         self._logger.debug('parsing request')
-        request_dict = json.loads(request_data.decode() if isinstance(
-            request_data, bytes) else request_data)
+        request_dict = self._json_loads(request_data)
         request = create_request(request_dict)
-        self._logger.debug('parsed request={0}'.format(request))
+        self._logger.debug('parsed request=%s', request)
+        if self._user_cache is not None:
+            self._prime_user_cache(request)
+        if self._suppression_list is not None:
+            self._suppression_list.update(request)
         return request
 
-    async def send_messages(self, to, messages, chat_id=None):
+    def _prime_user_cache(self, request):
+        if isinstance(request, ViberMessageRequest):
+            user_profile = request.sender
+        elif isinstance(request, (ViberConversationStartedRequest, ViberSubscribedRequest)):
+            user_profile = request.user
+        else:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # parsed outside of the event loop, nothing to schedule the priming on
+            return
+
+        task = loop.create_task(self._user_cache.prime(user_profile))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def send_messages(self, to, messages, chat_id=None, concurrency=None):
         """
         :param to: Viber user id
         :param messages: list of Message objects to be sent
         :param chat_id: Optional. String. Indicates that this is a message sent in inline conversation.
-        :return: list of tokens of the sent messages
+        :param concurrency: Optional. Int. Max number of messages sent at the same time.
+            By default messages are sent one by one, so they are shown to the user in the given order.
+            Concurrently sent messages may be shown in any order.
+        :return: list of tokens of the sent messages, in the order of messages
         """
-        self._logger.debug('going to send messages: {0}, to: {1}'.format(messages, to))
+        self._logger.debug('going to send messages: %s, to: %s', messages, to)
         if not isinstance(messages, list):
             messages = [messages]
+        self._check_suppressed(to)
+
+        async def send_message(message):
+            return await self._message_sender.send_message(
+                to, self._bot_configuration.name, self._bot_configuration.avatar, message, chat_id)
+
+        if concurrency is not None and concurrency > 1:
+            return await _gather_bounded(send_message, messages, concurrency)
 
         sent_messages_tokens = []
 
         for message in messages:
-            token = await self._message_sender.send_message(
-                to, self._bot_configuration.name, self._bot_configuration.avatar, message, chat_id)
+            token = await send_message(message)
             sent_messages_tokens.append(token)
 
         return sent_messages_tokens
 
+    def prepare_message(self, message):
+        """
+        Validates and encodes the message once, for sending it to many users.
+        :param message: Message object
+        :return: PreparedMessage, can be passed to send_messages or send_prepared_message
+        """
+        return self._message_sender.prepare_message(
+            message, self._bot_configuration.name, self._bot_configuration.avatar)
+
+    async def send_prepared_message(self, to, prepared_message, chat_id=None, tracking_data=None):
+        """
+        :param to: Viber user id
+        :param prepared_message: PreparedMessage object
+        :param chat_id: Optional. String. Indicates that this is a message sent in inline conversation.
+        :param tracking_data: Optional. Overrides tracking_data of the prepared message.
+        :return: token of the sent message
+        """
+        self._check_suppressed(to)
+        return await self._message_sender.send_prepared_message(to, prepared_message, chat_id, tracking_data)
+
     async def broadcast_messages(self, broadcast_list, messages):
         """
         :param broadcast_list: list of Viber user ids
         :param messages: list of Message objects to be sent
         :return: list of tokens of the sent messages
         """
-        self._logger.debug('going to broadcast messages: {0}'.format(messages))
+        self._logger.debug('going to broadcast messages: %s', messages)
         if not isinstance(messages, list):
             messages = [messages]
 
+        if self._suppression_list is not None and isinstance(broadcast_list, (list, tuple)):
+            receivers_count = len(broadcast_list)
+            broadcast_list = self._suppression_list.filter(broadcast_list)
+            if receivers_count and not broadcast_list:
+                raise ViberReceiverSuppressedError('all receivers of the broadcast list are suppressed')
+
         sent_messages_tokens = []
 
         for message in messages:
-            token = await self._message_sender.broadcast_message(
-                broadcast_list, self._bot_configuration.name, self._bot_configuration.avatar, message)
+            if self._suppression_list is None:
+                token = await self._message_sender.broadcast_message(
+                    broadcast_list, self._bot_configuration.name, self._bot_configuration.avatar, message)
+            else:
+                result = await self._message_sender.broadcast_message_result(
+                    broadcast_list, self._bot_configuration.name, self._bot_configuration.avatar, message)
+                self._suppression_list.update_failed_list(result.get('failed_list') or [])
+                token = result['message_token']
             sent_messages_tokens.append(token)
 
         return sent_messages_tokens
 
+    async def broadcast(self, receivers, messages, parallelism=DEFAULT_BROADCAST_PARALLELISM):
+        """
+        Broadcasts messages to any number of users, in chunks of BROADCAST_LIST_MAX_LENGTH ids.
+        Receivers are read lazily, so the whole audience is never held in memory.
+        :param receivers: iterable or async iterable of Viber user ids
+        :param messages: list of Message objects to be sent
+        :param parallelism: Optional. Int. Max number of chunks sent at the same time.
+        :return: BroadcastResult with tokens and failed_list entries of all chunks
+        """
+        self._logger.debug('going to broadcast messages: %s', messages)
+        return await self._broadcaster.broadcast(receivers, messages, parallelism)
+
     async def post_messages_to_public_account(self, sender, messages):
         if not isinstance(messages, list):
             messages = [messages]
@@ -113,6 +272,27 @@ class Api:
 
         return sent_messages_tokens
 
-    def _calculate_message_signature(self, message):
-        key = bytes(self._bot_configuration.auth_token.encode('ascii'))
-        return hmac.new(key, message, hashlib.sha256).hexdigest()
+    def _check_suppressed(self, to):
+        if self._suppression_list is not None and to in self._suppression_list:
+            raise ViberReceiverSuppressedError('receiver {0} is suppressed'.format(to))
+
+
+async def _gather_bounded(func, items, limit):
+    """
+    Runs func for every item with at most limit calls in flight.
+    Results are returned in the order of items, the first error is raised
+    and the calls that are still pending are cancelled.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(item):
+        async with semaphore:
+            return await func(item)
+
+    tasks = [asyncio.ensure_future(run(item)) for item in items]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
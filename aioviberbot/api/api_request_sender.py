@@ -1,9 +1,16 @@
 import asyncio
-import traceback
+import json
+import time
 
 import aiohttp
 
-from aioviberbot.api.consts import BOT_API_ENDPOINT
+from aioviberbot.api.consts import (
+    BOT_API_ENDPOINT,
+    CONNECTION_KEEPALIVE_TIMEOUT,
+    CONNECTION_POOL_LIMIT,
+    DNS_CACHE_TTL,
+    REQUEST_TIMEOUT,
+)
 from aioviberbot.api.errors import (
     ViberClientError,
     ViberRequestError,
@@ -12,6 +19,21 @@ from aioviberbot.api.errors import (
 )
 
 
+def create_client_session():
+    """
+    :return: aiohttp.ClientSession with a pool of keep-alive connections and DNS cache
+    """
+    connector = aiohttp.TCPConnector(
+        limit=CONNECTION_POOL_LIMIT,
+        keepalive_timeout=CONNECTION_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(REQUEST_TIMEOUT),
+    )
+
+
 class ApiRequestSender:
     def __init__(
             self,
@@ -20,49 +42,123 @@ class ApiRequestSender:
             bot_configuration,
             viber_bot_user_agent,
             client_session=None,
+            rate_limiter=None,
+            retry_policy=None,
+            instrumentation=None,
+            hedge_policy=None,
     ):
         self._logger = logger
         self._viber_bot_api_url = viber_bot_api_url
         self._bot_configuration = bot_configuration
         self._user_agent = viber_bot_user_agent
         self._client_session = client_session
+        self._own_session = None
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        self._instrumentation = instrumentation
+        self._hedge_policy = hedge_policy
+
+    @property
+    def auth_token(self):
+        return self._bot_configuration.auth_token
+
+    def _get_session(self):
+        if self._client_session:
+            return self._client_session
+
+        # the session is created lazily, so it is bound to the running event loop
+        if self._own_session is None or self._own_session.closed:
+            self._own_session = create_client_session()
+        return self._own_session
+
+    async def close(self):
+        """
+        Closes the session owned by the sender.
+        A session passed from outside is left open, its owner is responsible for closing it.
+        """
+        if self._own_session is not None:
+            await self._own_session.close()
+            self._own_session = None
 
     async def post_request(self, endpoint, payload=None):
-        url = self._viber_bot_api_url + '/' + endpoint
         payload = payload or {}
         payload['auth_token'] = self._bot_configuration.auth_token
+        if self._instrumentation is not None:
+            # encoded here to know the payload size, aiohttp would encode it the same way
+            return await self.post_request_body(endpoint, json.dumps(payload).encode('utf-8'))
+
         headers = {'User-Agent': self._user_agent}
+        return await self._post(endpoint, {'json': payload}, headers)
 
-        if self._client_session:
-            session = self._client_session
-        else:
-            session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(10))
+    async def post_request_body(self, endpoint, body):
+        """
+        Posts a request already encoded to json, e.g. by PreparedMessage.
+        :param body: json bytes, should contain auth_token
+        """
+        headers = {'User-Agent': self._user_agent, 'Content-Type': 'application/json'}
+        return await self._post(endpoint, {'data': body}, headers)
+
+    async def _post(self, endpoint, body, headers):
+        url = self._viber_bot_api_url + '/' + endpoint
+
+        def request():
+            return self._post_request_once(endpoint, url, body, headers)
+
+        if self._hedge_policy is not None:
+            # every attempt of the retry policy is hedged separately
+            post_request_once = request
+
+            def request():
+                return self._hedge_policy.call(endpoint, post_request_once)
+
+        if self._retry_policy is None:
+            return await request()
 
+        return await self._retry_policy.call(endpoint, request)
+
+    async def _post_request_once(self, endpoint, url, body, headers):
+        if self._rate_limiter is not None:
+            await self._rate_limiter.acquire(endpoint)
+
+        if self._instrumentation is None:
+            return await self._send(endpoint, url, body, headers, _RequestOutcome())
+
+        outcome = _RequestOutcome()
+        context = self._instrumentation.request_started(endpoint, len(body['data']))
+        started = time.perf_counter()
+        error = None
+        try:
+            return await self._send(endpoint, url, body, headers, outcome)
+        except asyncio.CancelledError:
+            # e.g. the losing attempt of a hedged request, it did not fail
+            raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._instrumentation.request_finished(
+                context, endpoint, time.perf_counter() - started, outcome.http_status, outcome.viber_status, error)
+
+    async def _send(self, endpoint, url, body, headers, outcome):
+        session = self._get_session()
         try:
             response = await session.post(
                 url=url,
-                json=payload,
                 headers=headers,
+                **body
             )
+            outcome.http_status = response.status
             response.raise_for_status()
             result = await response.json()
+            outcome.viber_status = result['status']
         except aiohttp.ClientError as e:
-            self._logger.error(
-                'client error on post request to endpoint={0}, with payload={1}. error is: {2}'
-                .format(endpoint, payload, traceback.format_exc()),
-            )
+            self._logger.error('client error on post request to endpoint=%s', endpoint, exc_info=True)
             raise ViberClientError(e)
         except asyncio.TimeoutError as e:
-            self._logger.error(
-                'timeout error on post request to endpoint={0}, with payload={1}. error is: {2}'
-                .format(endpoint, payload, traceback.format_exc()),
-            )
+            self._logger.error('timeout error on post request to endpoint=%s', endpoint, exc_info=True)
             raise ViberTimeoutError(e)
         except Exception:
-            self._logger.error(
-                'unexpected Exception while trying to post request. error is: {0}'
-                .format(traceback.format_exc()),
-            )
+            self._logger.error('unexpected Exception while trying to post request to endpoint=%s', endpoint, exc_info=True)
             raise
         else:
             if result['status'] == 0:
@@ -71,10 +167,8 @@ class ApiRequestSender:
             raise ViberRequestError(
                 'failed with status: {0}, message: {1}'
                 .format(result['status'], result.get('status_message')),
+                status=result['status'],
             )
-        finally:
-            if not self._client_session:
-                await session.close()
 
     async def set_webhook(self, url, webhook_events=None, is_inline=False, send_name=True, send_photo=True):
         payload = {
@@ -123,3 +217,11 @@ class ApiRequestSender:
             payload=payload,
         )
         return result['user']
+
+
+class _RequestOutcome:
+    __slots__ = ('http_status', 'viber_status')
+
+    def __init__(self):
+        self.http_status = None
+        self.viber_status = None
@@ -0,0 +1,174 @@
+import asyncio
+import itertools
+
+from aioviberbot.api.consts import BROADCAST_LIST_MAX_LENGTH
+from aioviberbot.api.errors import ViberError, ViberValidationError
+
+DEFAULT_BROADCAST_PARALLELISM = 4
+
+
+class BroadcastResult:
+    def __init__(self):
+        self._message_tokens = []
+        self._failed_list = []
+        self._receivers_count = 0
+        self._chunks_count = 0
+        self._suppressed_count = 0
+
+    @property
+    def message_tokens(self):
+        """
+        tokens of every broadcast_message request, one per chunk and message
+        """
+        return self._message_tokens
+
+    @property
+    def failed_list(self):
+        """
+        failed_list entries of all chunks; receivers of requests failed as a whole
+        are reported with status None and the error text as status_message
+        """
+        return self._failed_list
+
+    @property
+    def receivers_count(self):
+        return self._receivers_count
+
+    @property
+    def chunks_count(self):
+        return self._chunks_count
+
+    @property
+    def suppressed_count(self):
+        """
+        number of receivers skipped as they are in the suppression list
+        """
+        return self._suppressed_count
+
+    def __str__(self):
+        return 'BroadcastResult[receivers_count={0}, chunks_count={1}, message_tokens={2}, failed={3}]'.format(
+            self._receivers_count,
+            self._chunks_count,
+            len(self._message_tokens),
+            len(self._failed_list),
+        )
+
+
+class Broadcaster:
+    def __init__(self, logger, message_sender, bot_configuration, suppression_list=None):
+        self._logger = logger
+        self._message_sender = message_sender
+        self._bot_configuration = bot_configuration
+        self._suppression_list = suppression_list
+
+    async def broadcast(self, receivers, messages, parallelism=DEFAULT_BROADCAST_PARALLELISM):
+        """
+        :param receivers: iterable or async iterable of Viber user ids, of any length
+        :param messages: list of Message objects to be sent
+        :param parallelism: max number of chunks sent at the same time
+        :return: BroadcastResult
+        """
+        if not isinstance(messages, list):
+            messages = [messages]
+
+        for message in messages:
+            if not message.validate():
+                raise ViberValidationError('failed validating message: {0}'.format(message))
+
+        if parallelism < 1:
+            raise ViberValidationError('broadcast parallelism should be positive')
+
+        result = BroadcastResult()
+        errors = []
+        # bounded queue keeps at most 2 * parallelism chunks in memory
+        chunks = asyncio.Queue(maxsize=parallelism)
+        workers = [
+            asyncio.ensure_future(self._send_chunks(chunks, messages, result, errors))
+            for _ in range(parallelism)
+        ]
+
+        try:
+            if self._suppression_list is not None:
+                receivers = self._filter_suppressed(receivers, result)
+            async for chunk in _iter_chunks(receivers, BROADCAST_LIST_MAX_LENGTH):
+                if errors:
+                    break
+                result._receivers_count += len(chunk)
+                result._chunks_count += 1
+                await chunks.put(chunk)
+
+            for _ in workers:
+                await chunks.put(None)
+            await asyncio.gather(*workers)
+        except BaseException:
+            for worker in workers:
+                worker.cancel()
+            raise
+
+        if errors:
+            raise errors[0]
+
+        return result
+
+    async def _send_chunks(self, chunks, messages, result, errors):
+        # a worker keeps draining the queue until the end marker even after
+        # an unexpected error, so the producer never blocks on a full queue
+        while True:
+            chunk = await chunks.get()
+            if chunk is None:
+                return
+            if errors:
+                continue
+
+            try:
+                await self._send_chunk(chunk, messages, result)
+            except Exception as e:
+                errors.append(e)
+
+    async def _send_chunk(self, chunk, messages, result):
+        # messages of a chunk are sent in order, so they are shown in order
+        for message in messages:
+            try:
+                chunk_result = await self._message_sender.broadcast_message_result(
+                    chunk, self._bot_configuration.name, self._bot_configuration.avatar, message)
+            except ViberError as e:
+                self._logger.error('failed to broadcast chunk of %d receivers: %s', len(chunk), e)
+                result._failed_list.extend(
+                    {'receiver': receiver, 'status': None, 'status_message': str(e)}
+                    for receiver in chunk
+                )
+                return
+
+            result._message_tokens.append(chunk_result['message_token'])
+            failed_list = chunk_result.get('failed_list') or []
+            result._failed_list.extend(failed_list)
+            if self._suppression_list is not None:
+                self._suppression_list.update_failed_list(failed_list)
+
+    async def _filter_suppressed(self, receivers, result):
+        # filtered before chunking, so chunks stay full
+        async for chunk in _iter_chunks(receivers, BROADCAST_LIST_MAX_LENGTH):
+            receivers_chunk = self._suppression_list.filter(chunk)
+            result._suppressed_count += len(chunk) - len(receivers_chunk)
+            for receiver in receivers_chunk:
+                yield receiver
+
+
+async def _iter_chunks(receivers, size):
+    if hasattr(receivers, '__aiter__'):
+        chunk = []
+        async for receiver in receivers:
+            chunk.append(receiver)
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+        return
+
+    iterator = iter(receivers)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -3,6 +3,16 @@ from ..version import __version__
 VIBER_BOT_API_URL = 'https://chatapi.viber.com/pa'
 VIBER_BOT_USER_AGENT = 'AioViberBot-Python/' + __version__
 BROADCAST_LIST_MAX_LENGTH = 300
+GET_ONLINE_MAX_IDS = 100
+
+# defaults for the connection pool used when no client_session is passed to Api
+REQUEST_TIMEOUT = 10
+CONNECTION_POOL_LIMIT = 100
+CONNECTION_KEEPALIVE_TIMEOUT = 30
+DNS_CACHE_TTL = 300
+
+# viber statuses of failed requests which may succeed when sent again later, 12 - tooManyRequests
+TRANSIENT_STATUSES = frozenset([12])
 
 
 class BOT_API_ENDPOINT:
@@ -0,0 +1,114 @@
+import time
+
+
+class MemoryDeduplicationStore:
+    """
+    Time-windowed set of seen keys kept in two generations: the current one
+    and the previous one. Generations rotate every window seconds or once the current
+    one has max_size keys, so a key is remembered for at least one window unless
+    more than max_size keys arrive within it, and at most 2 * max_size keys are kept.
+
+    A shared store (e.g. redis SET NX EX) should implement the same add and discard coroutines.
+    """
+
+    def __init__(self, window=3600, max_size=1000000, clock=time.monotonic):
+        self._window = window
+        self._max_size = max_size
+        self._clock = clock
+        self._current = set()
+        self._previous = set()
+        self._rotated_at = clock()
+
+    async def add(self, key):
+        """
+        :return: True when the key was not seen before
+        """
+        self._rotate()
+        if key in self._current or key in self._previous:
+            return False
+
+        self._current.add(key)
+        return True
+
+    async def discard(self, key):
+        self._current.discard(key)
+        self._previous.discard(key)
+
+    def _rotate(self):
+        now = self._clock()
+        if now - self._rotated_at >= 2 * self._window:
+            self._previous = set()
+            self._current = set()
+            self._rotated_at = now
+        elif now - self._rotated_at >= self._window or len(self._current) >= self._max_size:
+            self._previous = self._current
+            self._current = set()
+            self._rotated_at = now
+
+    def __len__(self):
+        return len(self._current) + len(self._previous)
+
+
+class Deduplicator:
+    """
+    Detects callbacks viber delivered more than once.
+    """
+
+    def __init__(self, store=None):
+        """
+        :param store: Optional. Store of seen keys, defaults to MemoryDeduplicationStore.
+        """
+        self._store = store if store is not None else MemoryDeduplicationStore()
+        self._duplicates_count = 0
+
+    @property
+    def duplicates_count(self):
+        return self._duplicates_count
+
+    async def is_duplicate(self, viber_request, namespace=None):
+        """
+        Remembers the request, so the next call with the same callback returns True.
+        :param namespace: Optional. Keeps keys of e.g. different bots sharing the deduplicator apart.
+        """
+        if await self._store.add(get_request_key(viber_request, namespace)):
+            return False
+
+        self._duplicates_count += 1
+        return True
+
+    async def forget(self, viber_request, namespace=None):
+        """
+        Lets a callback which was not processed, e.g. rejected to be retried, through again.
+        """
+        await self._store.discard(get_request_key(viber_request, namespace))
+
+    def wrap(self, handler):
+        """
+        :return: coroutine function calling the handler for the first delivery of a callback only
+        """
+        async def deduplicated_handler(viber_request):
+            if await self.is_duplicate(viber_request):
+                return None
+            return await handler(viber_request)
+        return deduplicated_handler
+
+
+def get_request_key(viber_request, namespace=None):
+    """
+    Delivered, seen and failed callbacks of a broadcast share the message token,
+    so the user id is a part of the key. Requests without a token are told apart by timestamp.
+    :param namespace: Optional. Prefix of the key, e.g. bot id.
+    """
+    token = getattr(viber_request, 'message_token', None)
+    if token is None:
+        token = viber_request.timestamp
+
+    user_id = getattr(viber_request, 'user_id', None)
+    if user_id is None:
+        user = getattr(viber_request, 'user', None)
+        user_id = user.id if user is not None else ''
+
+    key = '{0}:{1}:{2}'.format(viber_request.event_type, token, user_id)
+    if namespace is not None:
+        return '{0}:{1}'.format(namespace, key)
+    return key
@@ -0,0 +1,342 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+from aioviberbot.api.event_type import EventType
+
+
+class DeliveryState:
+    SENT = 'sent'
+    DELIVERED = 'delivered'
+    SEEN = 'seen'
+    FAILED = 'failed'
+
+
+# callbacks may come out of order, a state never goes back
+_STATE_RANK = {DeliveryState.SENT: 0, DeliveryState.DELIVERED: 1, DeliveryState.SEEN: 2, DeliveryState.FAILED: 3}
+_EVENT_TYPE_TO_STATE = {
+    EventType.DELIVERED: DeliveryState.DELIVERED,
+    EventType.SEEN: DeliveryState.SEEN,
+    EventType.FAILED: DeliveryState.FAILED,
+}
+
+
+class _Delivery:
+    __slots__ = ('state', 'campaign', 'sent_at', 'delivered_at', 'seen_at', 'failed_at', 'waiters')
+
+    def __init__(self, campaign, sent_at):
+        self.state = DeliveryState.SENT
+        self.campaign = campaign
+        self.sent_at = sent_at
+        self.delivered_at = None
+        self.seen_at = None
+        self.failed_at = None
+        self.waiters = None
+
+
+class DeliveryTracker:
+    """
+    Links message tokens of sent messages with the delivered, seen and failed callbacks.
+    Deliveries are kept in memory for ttl seconds after sending, campaign counters are kept until reset.
+    A persistent backend gets the changed deliveries in batches on flush, and is looked up for deliveries
+    which are not in memory, e.g. evicted ones or those tracked before a restart.
+    """
+
+    def __init__(self, ttl=86400, max_size=1000000, backend=None, clock=time.time, logger=None):
+        """
+        :param ttl: seconds a delivery is tracked for after sending
+        :param max_size: max number of tracked deliveries, the oldest ones are evicted first
+        :param backend: Optional. Object with a save(deliveries) coroutine taking a list of delivery dicts
+            and a get(message_token, user_id) coroutine returning a saved delivery dict or None.
+        """
+        self._ttl = ttl
+        self._max_size = max_size
+        self._backend = backend
+        self._clock = clock
+        self._logger = logger or logging.getLogger('aioviberbot')
+        # (message_token, user_id) -> _Delivery, in the order of sending
+        self._deliveries = OrderedDict()
+        self._campaigns = {}
+        self._dirty = set()
+        # changed deliveries evicted before they were saved, key -> _Delivery
+        self._evicted = {}
+        self._backend_lookups = set()
+        self._untracked_count = 0
+
+    @property
+    def untracked_count(self):
+        """
+        number of callbacks for messages which are not tracked, e.g. already evicted
+        """
+        return self._untracked_count
+
+    def __len__(self):
+        return len(self._deliveries)
+
+    def track(self, message_token, user_id, campaign=None):
+        """
+        Starts tracking a sent message.
+        :param message_token: token returned by send_messages
+        :param user_id: Viber user id the message was sent to
+        :param campaign: Optional. Name the counters of the message are aggregated by.
+        """
+        self._evict()
+        key = (message_token, user_id)
+        if key in self._deliveries:
+            return
+
+        self._deliveries[key] = _Delivery(campaign, self._clock())
+        if self._backend is not None:
+            self._dirty.add(key)
+        if campaign is not None:
+            self._get_counters(campaign)[DeliveryState.SENT] += 1
+
+    def track_broadcast(self, message_token, user_ids, campaign=None):
+        """
+        Starts tracking a broadcast message, its callbacks have the same token for every user.
+        """
+        for user_id in user_ids:
+            self.track(message_token, user_id, campaign)
+
+    def update(self, viber_request):
+        """
+        Applies a delivered, seen or failed callback in O(1).
+        A callback of a message which is not in memory is applied in background after the backend lookup.
+        :return: True when the callback is of a message tracked in memory
+        """
+        state = _EVENT_TYPE_TO_STATE.get(viber_request.event_type)
+        if state is None:
+            return False
+
+        key = (viber_request.message_token, viber_request.user_id)
+        timestamp = viber_request.timestamp / 1000 if viber_request.timestamp else self._clock()
+        delivery = self._deliveries.get(key)
+        if delivery is None:
+            if self._backend is None:
+                self._untracked_count += 1
+            else:
+                lookup = asyncio.ensure_future(self._update_from_backend(key, state, timestamp))
+                self._backend_lookups.add(lookup)
+                lookup.add_done_callback(self._backend_lookups.discard)
+            return False
+
+        self._apply(key, delivery, state, timestamp)
+        return True
+
+    async def _update_from_backend(self, key, state, timestamp):
+        try:
+            delivery = await self._load(key)
+        except Exception:
+            self._logger.exception('failed to look up delivery of message=%s to user=%s', *key)
+            delivery = None
+
+        if delivery is None:
+            self._untracked_count += 1
+            return
+        self._apply(key, delivery, state, timestamp)
+
+    def _apply(self, key, delivery, state, timestamp):
+        counters = self._campaigns.get(delivery.campaign) if delivery.campaign is not None else None
+
+        if state == DeliveryState.FAILED:
+            if delivery.failed_at is None:
+                delivery.failed_at = timestamp
+                if counters is not None:
+                    counters[DeliveryState.FAILED] += 1
+        else:
+            if delivery.delivered_at is None:
+                # seen message is delivered as well, even if the delivered callback comes later
+                delivery.delivered_at = timestamp
+                if counters is not None:
+                    counters[DeliveryState.DELIVERED] += 1
+            if state == DeliveryState.SEEN and delivery.seen_at is None:
+                delivery.seen_at = timestamp
+                if counters is not None:
+                    counters[DeliveryState.SEEN] += 1
+
+        if _STATE_RANK[state] > _STATE_RANK[delivery.state]:
+            delivery.state = state
+            if self._backend is not None:
+                self._dirty.add(key)
+            self._notify(delivery)
+
+    def get(self, message_token, user_id):
+        """
+        :return: delivery dict or None when the message is not tracked
+        """
+        delivery = self._deliveries.get((message_token, user_id))
+        if delivery is None:
+            return None
+        return _to_dict((message_token, user_id), delivery)
+
+    async def load(self, message_token, user_id):
+        """
+        Same as get, but looks the delivery up in the backend when it is not in memory.
+        :return: delivery dict or None when the message is not tracked
+        """
+        key = (message_token, user_id)
+        delivery = self._deliveries.get(key)
+        if delivery is None and self._backend is not None:
+            delivery = await self._load(key)
+        if delivery is None:
+            return None
+        return _to_dict(key, delivery)
+
+    def get_campaign_counters(self, campaign):
+        """
+        :return: dict of number of sent, delivered, seen and failed messages of the campaign
+        """
+        return dict(self._get_counters(campaign))
+
+    def reset_campaign(self, campaign):
+        self._campaigns.pop(campaign, None)
+
+    async def wait_for(self, message_token, user_id, state=DeliveryState.DELIVERED, timeout=None):
+        """
+        Waits until the message reaches the state, a seen message is delivered as well.
+        :return: state the message reached, DeliveryState.FAILED when it failed instead
+        """
+        key = (message_token, user_id)
+        delivery = self._deliveries.get(key)
+        if delivery is None and self._backend is not None:
+            delivery = await self._load(key)
+        if delivery is None:
+            raise KeyError('message {0} to {1} is not tracked'.format(message_token, user_id))
+
+        if _reached(delivery.state, state):
+            return delivery.state
+
+        future = asyncio.get_event_loop().create_future()
+        if delivery.waiters is None:
+            delivery.waiters = []
+        delivery.waiters.append((state, future))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            if delivery.waiters is not None and (state, future) in delivery.waiters:
+                delivery.waiters.remove((state, future))
+
+    def wrap(self, handler):
+        """
+        :return: coroutine function updating the tracker with every request before calling the handler
+        """
+        async def tracking_handler(viber_request):
+            self.update(viber_request)
+            return await handler(viber_request)
+        return tracking_handler
+
+    async def flush(self):
+        """
+        Saves the deliveries changed since the last flush to the backend in one call,
+        evicted ones included.
+        :return: number of saved deliveries
+        """
+        if self._backend is None:
+            return 0
+        if self._backend_lookups:
+            # callbacks waiting for the backend are applied first
+            await asyncio.gather(*self._backend_lookups, return_exceptions=True)
+        if not self._dirty and not self._evicted:
+            return 0
+
+        dirty, self._dirty = self._dirty, set()
+        evicted, self._evicted = self._evicted, {}
+        deliveries = [_to_dict(key, self._deliveries[key]) for key in dirty]
+        deliveries.extend(_to_dict(key, delivery) for key, delivery in evicted.items())
+        try:
+            await self._backend.save(deliveries)
+        except Exception:
+            # saved with the next flush
+            self._dirty |= {key for key in dirty if key in self._deliveries}
+            for key, delivery in evicted.items():
+                self._evicted.setdefault(key, delivery)
+            raise
+        return len(deliveries)
+
+    async def _load(self, key):
+        """
+        :return: _Delivery put back in memory from the evicted ones or the backend, None when it is unknown
+        """
+        delivery = self._evicted.pop(key, None)
+        dirty = delivery is not None
+        if delivery is None:
+            data = await self._backend.get(*key)
+            if data is None:
+                return None
+            # tracked again or loaded by another lookup meanwhile
+            delivery = self._deliveries.get(key)
+            if delivery is not None:
+                return delivery
+            delivery = _from_dict(data)
+
+        self._evict()
+        self._deliveries[key] = delivery
+        if dirty:
+            self._dirty.add(key)
+        return delivery
+
+    def _get_counters(self, campaign):
+        counters = self._campaigns.get(campaign)
+        if counters is None:
+            counters = self._campaigns[campaign] = dict.fromkeys(_STATE_RANK, 0)
+        return counters
+
+    def _notify(self, delivery):
+        if not delivery.waiters:
+            return
+
+        waiters = []
+        for state, future in delivery.waiters:
+            if future.done():
+                continue
+            if _reached(delivery.state, state):
+                future.set_result(delivery.state)
+            else:
+                waiters.append((state, future))
+        delivery.waiters = waiters or None
+
+    def _evict(self):
+        expired_at = self._clock() - self._ttl
+        deliveries = self._deliveries
+        while deliveries:
+            key, delivery = next(iter(deliveries.items()))
+            if delivery.sent_at > expired_at and len(deliveries) < self._max_size:
+                return
+
+            del deliveries[key]
+            if key in self._dirty:
+                # kept until the next flush saves it
+                self._dirty.discard(key)
+                self._evicted[key] = delivery
+            if delivery.waiters:
+                for _, future in delivery.waiters:
+                    if not future.done():
+                        future.set_exception(KeyError('message {0} to {1} is not tracked'.format(*key)))
+
+
+def _reached(current_state, state):
+    # failed is the last state, so a failed message stops every wait
+    return _STATE_RANK[current_state] >= _STATE_RANK[state]
+
+
+def _to_dict(key, delivery):
+    return {
+        'message_token': key[0],
+        'user_id': key[1],
+        'campaign': delivery.campaign,
+        'state': delivery.state,
+        'sent_at': delivery.sent_at,
+        'delivered_at': delivery.delivered_at,
+        'seen_at': delivery.seen_at,
+        'failed_at': delivery.failed_at,
+    }
+
+
+def _from_dict(data):
+    delivery = _Delivery(data.get('campaign'), data['sent_at'])
+    delivery.state = data['state']
+    delivery.delivered_at = data.get('delivered_at')
+    delivery.seen_at = data.get('seen_at')
+    delivery.failed_at = data.get('failed_at')
+    return delivery
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+
+from aioviberbot.api.errors import ViberValidationError
+from aioviberbot.api.event_type import EventType
+from aioviberbot.api.messages import MESSAGE_CLASS_TO_TYPE, MESSAGE_TYPE_TO_CLASS
+from aioviberbot.api.viber_requests import EVENT_TYPE_TO_CLASS
+
+
+class Dispatcher:
+    """
+    Routes parsed viber requests to handlers registered by event type, message type
+    and optional text or tracking_data filters.
+
+    dispatcher = Dispatcher()
+
+    @dispatcher.message(MessageType.TEXT, text='hi')
+    async def greet(viber_request):
+        ...
+    """
+
+    def __init__(self, logger=None):
+        self._logger = logger or logging.getLogger('aioviberbot')
+        # (event_type, message_type or None) -> list of (text, tracking_data, handler)
+        self._handlers = {}
+        self._tasks = set()
+
+    def add_handler(self, handler, event_type, message_type=None, text=None, tracking_data=None):
+        """
+        :param handler: coroutine function called with the viber request
+        :param event_type: EventType of the request
+        :param message_type: Optional. MessageType of the message, for EventType.MESSAGE only.
+        :param text: Optional. Text of the message: a string, a compiled regular expression or a predicate.
+        :param tracking_data: Optional. Tracking data of the message, same as text.
+        """
+        if event_type not in EVENT_TYPE_TO_CLASS:
+            raise ViberValidationError("event type '{0}' is not supported".format(event_type))
+
+        if (message_type is not None or text is not None or tracking_data is not None) \
+                and event_type != EventType.MESSAGE:
+            raise ViberValidationError('message filters can only be used with message event')
+
+        if message_type is not None and message_type not in MESSAGE_TYPE_TO_CLASS:
+            raise ViberValidationError("message type '{0}' is not supported".format(message_type))
+
+        self._handlers.setdefault((event_type, message_type), []).append(
+            (_make_filter(text), _make_filter(tracking_data), handler),
+        )
+
+    def on(self, event_type, message_type=None, text=None, tracking_data=None):
+        def decorator(handler):
+            self.add_handler(handler, event_type, message_type, text, tracking_data)
+            return handler
+        return decorator
+
+    def message(self, message_type=None, text=None, tracking_data=None):
+        return self.on(EventType.MESSAGE, message_type, text, tracking_data)
+
+    def resolve(self, viber_request):
+        """
+        Handlers of a message type go before the ones for any message,
+        handlers with the same key are checked in the order they were added.
+        :return: handler for the request or None
+        """
+        event_type = viber_request.event_type
+        if event_type != EventType.MESSAGE:
+            handlers = self._handlers.get((event_type, None))
+            return handlers[0][2] if handlers else None
+
+        message = viber_request.message
+        message_type = MESSAGE_CLASS_TO_TYPE.get(type(message))
+        for key in ((event_type, message_type), (event_type, None)):
+            for text, tracking_data, handler in self._handlers.get(key, ()):
+                if text is not None and not text(getattr(message, 'text', None)):
+                    continue
+                if tracking_data is not None and not tracking_data(message.tracking_data):
+                    continue
+                return handler
+        return None
+
+    async def dispatch(self, viber_request):
+        """
+        :return: result of the handler, None when there is no handler for the request
+        """
+        handler = self.resolve(viber_request)
+        if handler is None:
+            self._logger.debug('no handler for request=%s', viber_request)
+            return None
+        return await handler(viber_request)
+
+    def dispatch_in_background(self, viber_request):
+        """
+        Runs the handler as a task, so the webhook can respond right away.
+        Errors of the handler are logged.
+        """
+        task = asyncio.ensure_future(self.dispatch(viber_request))
+        self._tasks.add(task)
+        task.add_done_callback(self._on_task_done)
+        return task
+
+    def _on_task_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self._logger.error('handler failed', exc_info=task.exception())
+
+    @property
+    def pending_count(self):
+        return len(self._tasks)
+
+    async def join(self):
+        """
+        Waits for the handlers running in background, e.g. on shutdown.
+        """
+        while self._tasks:
+            await asyncio.wait(list(self._tasks))
+
+
+def _make_filter(expected):
+    if expected is None or callable(expected):
+        return expected
+
+    if hasattr(expected, 'fullmatch'):
+        return lambda value: isinstance(value, str) and expected.fullmatch(value) is not None
+
+    return lambda value: value == expected
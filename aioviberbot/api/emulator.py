@@ -0,0 +1,358 @@
+"""
+Local emulator of the Viber bot api for integration and load tests without network access.
+
+    emulator = ViberApiEmulator(faults=[Fault(Fault.HTTP_ERROR, rate=0.01)], latency=0.02)
+    await emulator.start()
+    viber = Api(bot_configuration, api_url=emulator.url)
+    ...
+    await emulator.send_callback(message_callback(user_id, {'type': 'text', 'text': 'hi'}))
+
+or as a standalone server:
+
+    python -m aioviberbot.api.emulator --port 8080 --latency 0.02
+"""
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import random
+import time
+
+import aiohttp
+from aiohttp import web
+
+from aioviberbot.api.consts import BOT_API_ENDPOINT, BROADCAST_LIST_MAX_LENGTH, GET_ONLINE_MAX_IDS
+from aioviberbot.api.errors import ViberValidationError
+from aioviberbot.api.event_type import EventType
+from aioviberbot.api.signature_verifier import SignatureVerifier
+
+API_PATH = '/pa'
+ALL_ENDPOINTS = tuple(
+    value for key, value in vars(BOT_API_ENDPOINT).items() if not key.startswith('_')
+)
+DEFAULT_EVENT_TYPES = [
+    EventType.DELIVERED, EventType.SEEN, EventType.FAILED, EventType.SUBSCRIBED,
+    EventType.UNSUBSCRIBED, EventType.CONVERSATION_STARTED,
+]
+
+
+class Fault:
+    # response is delayed by delay seconds, longer than the client timeout
+    TIMEOUT = 'timeout'
+    # 200 response with a non-zero viber status
+    STATUS = 'status'
+    # 5xx response
+    HTTP_ERROR = 'http_error'
+    # 429 response
+    RATE_LIMIT = 'rate_limit'
+
+    def __init__(self, kind, rate=1.0, endpoints=None, status=None, status_message=None, delay=60):
+        """
+        :param kind: one of Fault.TIMEOUT, Fault.STATUS, Fault.HTTP_ERROR, Fault.RATE_LIMIT
+        :param rate: share of the requests the fault is injected to, from 0 to 1
+        :param endpoints: Optional. Endpoints the fault applies to, all of them by default.
+        :param status: viber status for Fault.STATUS, http status for Fault.HTTP_ERROR
+        :param status_message: Optional. Viber status message for Fault.STATUS.
+        :param delay: seconds a response is delayed for Fault.TIMEOUT
+        """
+        if kind not in (Fault.TIMEOUT, Fault.STATUS, Fault.HTTP_ERROR, Fault.RATE_LIMIT):
+            raise ViberValidationError("fault kind '{0}' is not supported".format(kind))
+
+        self.kind = kind
+        self.rate = rate
+        self.endpoints = endpoints
+        self.status = status
+        self.status_message = status_message
+        self.delay = delay
+
+    def applies_to(self, endpoint, rand):
+        return (self.endpoints is None or endpoint in self.endpoints) and rand() < self.rate
+
+
+class ViberApiEmulator:
+    def __init__(self, auth_tokens=None, latency=0, faults=None, delivery_callbacks=False,
+                 rand=random.random, clock=time.time):
+        """
+        :param auth_tokens: Optional. Accepted auth tokens, any token is accepted by default.
+                            Callbacks are signed with the first one.
+        :param latency: seconds every response is delayed, or a function returning them
+        :param faults: Optional. List of Fault injected to the responses, the first matching one is applied.
+        :param delivery_callbacks: send a delivered callback for every sent message to the webhook
+        """
+        self._auth_tokens = set(auth_tokens) if auth_tokens else None
+        self._callback_token = auth_tokens[0] if auth_tokens else 'emulator-auth-token'
+        self._signature_verifier = SignatureVerifier([self._callback_token])
+        self._latency = latency
+        self._faults = list(faults or ())
+        self._delivery_callbacks = delivery_callbacks
+        self._rand = rand
+        self._clock = clock
+        self._message_tokens = itertools.count(5000000000000000000)
+        self._webhook = None
+        self._event_types = list(DEFAULT_EVENT_TYPES)
+        self._requests_count = collections.Counter()
+        self._last_requests = collections.deque(maxlen=1000)
+        self._runner = None
+        self._url = None
+        self._session = None
+        self._callbacks = set()
+
+    @property
+    def url(self):
+        """
+        :return: api url to pass to Api, available once the emulator is started
+        """
+        return self._url
+
+    @property
+    def webhook(self):
+        return self._webhook
+
+    @property
+    def faults(self):
+        return self._faults
+
+    @property
+    def requests_count(self):
+        """
+        :return: Counter of handled requests by endpoint
+        """
+        return self._requests_count
+
+    @property
+    def last_requests(self):
+        """
+        :return: (endpoint, payload) of the last 1000 requests
+        """
+        return self._last_requests
+
+    def create_app(self):
+        app = web.Application()
+        for endpoint in ALL_ENDPOINTS:
+            app.router.add_route('POST', '{0}/{1}'.format(API_PATH, endpoint), self._make_route(endpoint))
+        return app
+
+    async def start(self, host='127.0.0.1', port=0):
+        self._runner = web.AppRunner(self.create_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self._url = 'http://{0}:{1}{2}'.format(host, port, API_PATH)
+
+    async def close(self):
+        for callback in list(self._callbacks):
+            callback.cancel()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _make_route(self, endpoint):
+        handle = getattr(self, '_handle_' + endpoint)
+
+        async def route(request):
+            return await self._handle(endpoint, handle, request)
+        return route
+
+    async def _handle(self, endpoint, handle, request):
+        self._requests_count[endpoint] += 1
+        try:
+            payload = await request.json(loads=json.loads)
+        except ValueError:
+            return web.json_response(_failure(999, 'badData'))
+        self._last_requests.append((endpoint, payload))
+
+        latency = self._latency() if callable(self._latency) else self._latency
+        if latency:
+            await asyncio.sleep(latency)
+
+        for fault in self._faults:
+            if fault.applies_to(endpoint, self._rand):
+                return await self._inject(fault)
+
+        if self._auth_tokens is not None and payload.get('auth_token') not in self._auth_tokens:
+            return web.json_response(_failure(2, 'invalidAuthToken'))
+
+        return web.json_response(handle(payload))
+
+    async def _inject(self, fault):
+        if fault.kind == Fault.TIMEOUT:
+            await asyncio.sleep(fault.delay)
+            return web.json_response(_ok())
+        if fault.kind == Fault.STATUS:
+            return web.json_response(_failure(fault.status or 5, fault.status_message or 'receiverNotRegistered'))
+        if fault.kind == Fault.RATE_LIMIT:
+            return web.json_response(_failure(12, 'tooManyRequests'), status=429)
+        return web.Response(status=fault.status or 500)
+
+    def _handle_set_webhook(self, payload):
+        url = payload.get('url')
+        if url is None:
+            return _failure(3, 'missing url')
+
+        self._webhook = url or None
+        if 'event_types' in payload:
+            self._event_types = list(payload['event_types'])
+        return _ok(event_types=self._event_types)
+
+    def _handle_get_account_info(self, payload):
+        return _ok(
+            id='pa:emulator',
+            name='emulator',
+            uri='emulator',
+            icon='http://example.com/icon.jpg',
+            background='http://example.com/background.jpg',
+            category='Test',
+            subcategory='Test',
+            location={'lon': 0.0, 'lat': 0.0},
+            country='UA',
+            webhook=self._webhook or '',
+            event_types=self._event_types,
+            subscribers_count=0,
+            members=[],
+        )
+
+    def _handle_send_message(self, payload):
+        if not payload.get('receiver'):
+            return _failure(999, 'missing receiver')
+        if not payload.get('type') and 'keyboard' not in payload:
+            # a keyboard can be sent on its own
+            return _failure(3, 'missing message type')
+
+        message_token = next(self._message_tokens)
+        self._schedule_delivered(message_token, [payload['receiver']])
+        return _ok(message_token=message_token, chat_hostname='SN-CHAT-01_')
+
+    def _handle_broadcast_message(self, payload):
+        broadcast_list = payload.get('broadcast_list')
+        if not broadcast_list or len(broadcast_list) > BROADCAST_LIST_MAX_LENGTH:
+            return _failure(3, 'broadcast_list should have 1 to {0} receivers'.format(BROADCAST_LIST_MAX_LENGTH))
+
+        message_token = next(self._message_tokens)
+        self._schedule_delivered(message_token, broadcast_list)
+        return _ok(message_token=message_token, failed_list=[])
+
+    def _handle_post(self, payload):
+        if not payload.get('from'):
+            return _failure(999, 'missing from')
+        return _ok(message_token=next(self._message_tokens))
+
+    def _handle_get_online(self, payload):
+        ids = payload.get('ids')
+        if not ids or len(ids) > GET_ONLINE_MAX_IDS:
+            return _failure(3, 'ids should have 1 to {0} ids'.format(GET_ONLINE_MAX_IDS))
+
+        users = [{'id': user_id, 'online_status': 0, 'online_status_message': 'online'} for user_id in ids]
+        return _ok(users=users)
+
+    def _handle_get_user_details(self, payload):
+        user_id = payload.get('id')
+        if not user_id:
+            return _failure(999, 'missing id')
+
+        return _ok(user={
+            'id': user_id,
+            'name': 'User ' + user_id,
+            'avatar': 'http://example.com/avatar.jpg',
+            'country': 'UA',
+            'language': 'uk',
+            'primary_device_os': 'Android 12',
+            'api_version': 10,
+            'viber_version': '20.0.0.0',
+            'mcc': 255,
+            'mnc': 1,
+            'device_type': 'emulator',
+        })
+
+    def _schedule_delivered(self, message_token, receivers):
+        if not self._delivery_callbacks or self._webhook is None:
+            return
+
+        for receiver in receivers:
+            self._spawn(self.send_callback(callback(
+                EventType.DELIVERED, message_token=message_token, user_id=receiver)))
+
+    def _spawn(self, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        self._callbacks.add(task)
+        task.add_done_callback(self._callbacks.discard)
+
+    async def send_callback(self, callback_dict, webhook=None):
+        """
+        Posts a signed callback to the webhook set by the bot, or to the webhook passed.
+        :return: http status of the webhook response
+        """
+        webhook = webhook or self._webhook
+        if webhook is None:
+            raise ViberValidationError('webhook is not set')
+
+        callback_dict.setdefault('timestamp', int(self._clock() * 1000))
+        body = json.dumps(callback_dict).encode('utf-8')
+        headers = {
+            'Content-Type': 'application/json',
+            'X-Viber-Content-Signature': self._signature_verifier.calculate_signature(body),
+        }
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        async with self._session.post(webhook, data=body, headers=headers) as response:
+            return response.status
+
+
+def callback(event_type, **fields):
+    """
+    :return: callback dict of the event type with the fields
+    """
+    fields['event'] = event_type
+    return fields
+
+
+def message_callback(user_id, message, message_token=None):
+    """
+    :param message: message dict, e.g. {'type': 'text', 'text': 'hi'}
+    """
+    return callback(
+        EventType.MESSAGE,
+        message_token=message_token or random.getrandbits(62),
+        sender={'id': user_id, 'name': 'User ' + user_id, 'language': 'uk', 'country': 'UA', 'api_version': 10},
+        message=message,
+    )
+
+
+def _ok(**fields):
+    fields['status'] = 0
+    fields['status_message'] = 'ok'
+    return fields
+
+
+def _failure(status, status_message):
+    return {'status': status, 'status_message': status_message}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local emulator of the Viber bot api')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0, help='seconds every response is delayed')
+    parser.add_argument('--error-rate', type=float, default=0, help='share of 500 responses')
+    parser.add_argument('--auth-token', action='append', help='accepted auth token, any by default')
+    args = parser.parse_args()
+
+    faults = [Fault(Fault.HTTP_ERROR, rate=args.error_rate)] if args.error_rate else None
+    emulator = ViberApiEmulator(auth_tokens=args.auth_token, latency=args.latency, faults=faults)
+    print('api url: http://{0}:{1}{2}'.format(args.host, args.port, API_PATH))
+    web.run_app(emulator.create_app(), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -15,4 +15,13 @@ class ViberTimeoutError(ViberError):
 
 
 class ViberRequestError(ViberError):
+    def __init__(self, *args, status=None):
+        """
+        :param status: Optional. Viber status of the failed request.
+        """
+        super(ViberRequestError, self).__init__(*args)
+        self.status = status
+
+
+class ViberReceiverSuppressedError(ViberValidationError):
     pass
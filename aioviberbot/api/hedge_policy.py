@@ -0,0 +1,101 @@
+import asyncio
+import collections
+import time
+
+from aioviberbot.api.consts import BOT_API_ENDPOINT
+from aioviberbot.api.errors import ViberValidationError
+
+# requests without side effects, a hedged send request could deliver a message twice
+READ_ONLY_ENDPOINTS = frozenset([
+    BOT_API_ENDPOINT.GET_ACCOUNT_INFO,
+    BOT_API_ENDPOINT.GET_ONLINE,
+    BOT_API_ENDPOINT.GET_USER_DETAILS,
+])
+
+
+class HedgePolicy:
+    """
+    Sends a second request when the first one has not answered within the given percentile
+    of recent latencies of the endpoint, whichever request succeeds first wins.
+    """
+
+    def __init__(
+            self,
+            percentile=95,
+            min_delay=0.05,
+            max_delay=2,
+            window=100,
+            min_samples=20,
+            endpoints=READ_ONLY_ENDPOINTS,
+            clock=time.monotonic,
+    ):
+        """
+        :param percentile: percentile of recent latencies a request waits for before it is hedged
+        :param min_delay: lower bound of the hedge delay in seconds
+        :param max_delay: upper bound of the hedge delay in seconds, used until min_samples latencies are known
+        :param window: number of recent latencies kept per endpoint
+        :param min_samples: number of latencies needed to use the percentile
+        :param endpoints: endpoints to hedge, a subset of READ_ONLY_ENDPOINTS
+        """
+        endpoints = frozenset(endpoints)
+        if not endpoints <= READ_ONLY_ENDPOINTS:
+            raise ViberValidationError('only read-only endpoints can be hedged, got: {0}'.format(
+                ', '.join(sorted(endpoints - READ_ONLY_ENDPOINTS))))
+
+        self._percentile = percentile
+        self._min_delay = min_delay
+        self._max_delay = max_delay
+        self._min_samples = min_samples
+        self._endpoints = endpoints
+        self._clock = clock
+        self._latencies = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self._hedges_count = 0
+
+    @property
+    def hedges_count(self):
+        """
+        total number of hedge requests sent with this policy
+        """
+        return self._hedges_count
+
+    def get_delay(self, endpoint):
+        latencies = self._latencies[endpoint]
+        if len(latencies) < self._min_samples:
+            return self._max_delay
+
+        latencies = sorted(latencies)
+        delay = latencies[int(round(self._percentile / 100 * (len(latencies) - 1)))]
+        return min(self._max_delay, max(self._min_delay, delay))
+
+    async def call(self, endpoint, request):
+        """
+        :param endpoint: BOT_API_ENDPOINT the request is sent to
+        :param request: coroutine function making one attempt
+        """
+        if endpoint not in self._endpoints:
+            return await request()
+
+        attempts = {asyncio.ensure_future(self._timed(endpoint, request))}
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=self.get_delay(endpoint))
+            if not done:
+                attempts.add(asyncio.ensure_future(self._timed(endpoint, request)))
+                self._hedges_count += 1
+
+            error = None
+            while attempts:
+                done, attempts = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        return attempt.result()
+                    error = error or attempt.exception()
+            raise error
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+
+    async def _timed(self, endpoint, request):
+        started_at = self._clock()
+        result = await request()
+        self._latencies[endpoint].append(self._clock() - started_at)
+        return result
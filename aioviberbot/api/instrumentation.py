@@ -0,0 +1,150 @@
+import time
+
+
+class Instrumentation:
+    """
+    Hooks called around api requests, request parsing and signature verification.
+    Every hook does nothing, subclasses override the ones they need. Hooks must not raise.
+    When no instrumentation is passed to Api, the hooks are not called and nothing is timed.
+    """
+
+    def request_started(self, endpoint, payload_size):
+        """
+        Called before every attempt of an api request.
+        :param payload_size: size of the json body in bytes
+        :return: context passed to request_finished, e.g. a span
+        """
+        return None
+
+    def request_finished(self, context, endpoint, duration, http_status, viber_status, error):
+        """
+        :param duration: seconds the attempt took
+        :param http_status: http status of the response, None when there was no response
+        :param viber_status: status field of the response, None when it was not received
+        :param error: exception raised by the attempt, None when it succeeded or was cancelled,
+            e.g. as the losing attempt of a hedged request
+        """
+
+    def request_parsed(self, event_type, duration, size, error):
+        """
+        :param event_type: event type of the parsed request, None when parsing failed
+        :param size: size of the request data
+        """
+
+    def signature_verified(self, duration, size, verified):
+        pass
+
+
+class PrometheusInstrumentation(Instrumentation):
+    """
+    Exposes latency histograms, request and error counters and in-flight requests
+    with prometheus_client, which has to be installed.
+    """
+
+    def __init__(self, registry=None, namespace='aioviberbot'):
+        """
+        :param registry: Optional. prometheus_client CollectorRegistry, the default one by default.
+        """
+        from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+
+        registry = registry if registry is not None else REGISTRY
+        self._request_duration = Histogram(
+            'request_duration_seconds', 'Viber api request duration', ['endpoint'],
+            namespace=namespace, registry=registry)
+        self._request_payload = Histogram(
+            'request_payload_bytes', 'Viber api request payload size', ['endpoint'],
+            buckets=(256, 1024, 4096, 16384, 65536), namespace=namespace, registry=registry)
+        self._requests = Counter(
+            'requests', 'Viber api requests by http and viber status', ['endpoint', 'http_status', 'viber_status'],
+            namespace=namespace, registry=registry)
+        self._request_errors = Counter(
+            'request_errors', 'Failed viber api requests', ['endpoint', 'error'],
+            namespace=namespace, registry=registry)
+        self._requests_in_flight = Gauge(
+            'requests_in_flight', 'Viber api requests in flight', ['endpoint'],
+            namespace=namespace, registry=registry)
+        self._parse_duration = Histogram(
+            'parse_request_duration_seconds', 'Webhook request parsing duration', ['event_type'],
+            namespace=namespace, registry=registry)
+        self._parse_errors = Counter(
+            'parse_request_errors', 'Webhook requests failed to parse',
+            namespace=namespace, registry=registry)
+        self._verify_duration = Histogram(
+            'verify_signature_duration_seconds', 'Webhook signature verification duration',
+            namespace=namespace, registry=registry)
+        self._signatures = Counter(
+            'signatures', 'Verified webhook signatures', ['verified'],
+            namespace=namespace, registry=registry)
+
+    def request_started(self, endpoint, payload_size):
+        self._requests_in_flight.labels(endpoint).inc()
+        if payload_size is not None:
+            self._request_payload.labels(endpoint).observe(payload_size)
+
+    def request_finished(self, context, endpoint, duration, http_status, viber_status, error):
+        self._requests_in_flight.labels(endpoint).dec()
+        self._request_duration.labels(endpoint).observe(duration)
+        self._requests.labels(endpoint, str(http_status), str(viber_status)).inc()
+        if error is not None:
+            self._request_errors.labels(endpoint, type(error).__name__).inc()
+
+    def request_parsed(self, event_type, duration, size, error):
+        if error is not None:
+            self._parse_errors.inc()
+            return
+        self._parse_duration.labels(event_type).observe(duration)
+
+    def signature_verified(self, duration, size, verified):
+        self._verify_duration.observe(duration)
+        self._signatures.labels(str(verified).lower()).inc()
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """
+    Records a client span per api request attempt and spans of request parsing
+    and signature verification with opentelemetry-api, which has to be installed.
+    """
+
+    def __init__(self, tracer=None):
+        """
+        :param tracer: Optional. opentelemetry Tracer, the one of the global tracer provider by default.
+        """
+        from opentelemetry import trace
+
+        self._trace = trace
+        self._tracer = tracer if tracer is not None else trace.get_tracer('aioviberbot')
+
+    def request_started(self, endpoint, payload_size):
+        return self._tracer.start_span(
+            'viber ' + endpoint,
+            kind=self._trace.SpanKind.CLIENT,
+            attributes={'viber.endpoint': endpoint, 'http.request.body.size': payload_size or 0},
+        )
+
+    def request_finished(self, context, endpoint, duration, http_status, viber_status, error):
+        span = context
+        if http_status is not None:
+            span.set_attribute('http.response.status_code', http_status)
+        if viber_status is not None:
+            span.set_attribute('viber.status', viber_status)
+        if error is not None:
+            span.record_exception(error)
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, str(error)))
+        span.end()
+
+    def request_parsed(self, event_type, duration, size, error):
+        attributes = {'viber.event_type': event_type or '', 'http.request.body.size': size}
+        self._record_span('viber parse_request', duration, attributes, error)
+
+    def signature_verified(self, duration, size, verified):
+        attributes = {'viber.signature.verified': verified, 'http.request.body.size': size}
+        self._record_span('viber verify_signature', duration, attributes, None)
+
+    def _record_span(self, name, duration, attributes, error):
+        # the work is already done, the span is recorded with its start and end time
+        end_time = time.time_ns()
+        span = self._tracer.start_span(name, start_time=end_time - int(duration * 1e9), attributes=attributes)
+        if error is not None:
+            span.record_exception(error)
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, str(error)))
+        span.end(end_time=end_time)
@@ -0,0 +1,61 @@
+import json
+
+from aioviberbot.api.errors import ViberValidationError
+
+# fastest first
+JSON_BACKENDS = ('orjson', 'msgspec', 'ujson', 'json')
+
+
+def _orjson_loads():
+    import orjson
+    return orjson.loads
+
+
+def _msgspec_loads():
+    import msgspec
+
+    decode = msgspec.json.decode
+
+    def loads(data):
+        try:
+            return decode(data)
+        except msgspec.DecodeError as e:
+            # keep the ValueError contract of json.loads
+            raise ValueError(str(e)) from e
+
+    return loads
+
+
+def _ujson_loads():
+    import ujson
+    return ujson.loads
+
+
+def _json_loads():
+    return json.loads
+
+
+_LOADERS = {
+    'orjson': _orjson_loads,
+    'msgspec': _msgspec_loads,
+    'ujson': _ujson_loads,
+    'json': _json_loads,
+}
+
+
+def get_json_loads(backend='auto'):
+    """
+    :param backend: one of JSON_BACKENDS, or 'auto' for the fastest installed one
+    :return: function decoding json from bytes or str, raising ValueError on invalid input
+    """
+    if backend == 'auto':
+        for name in JSON_BACKENDS:
+            try:
+                return _LOADERS[name]()
+            except ImportError:
+                continue
+
+    if backend not in _LOADERS:
+        raise ViberValidationError("json backend '{0}' is not supported".format(backend))
+
+    return _LOADERS[backend]()
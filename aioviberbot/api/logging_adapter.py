@@ -0,0 +1,32 @@
+import logging
+
+
+class StructuredLoggerAdapter(logging.LoggerAdapter):
+    """
+    Adds bound fields to every log record as attributes, so structured (e.g. JSON) formatters can emit them.
+    Like any LoggerAdapter, it does nothing for records below the enabled level.
+
+    viber = Api(bot_configuration, logger=StructuredLoggerAdapter(logging.getLogger('aioviberbot'), bot='shop'))
+    """
+
+    def __init__(self, logger, **fields):
+        super(StructuredLoggerAdapter, self).__init__(logger, fields)
+
+    def bind(self, **fields):
+        """
+        :return: new adapter with the fields added to the bound ones
+        """
+        bound_fields = dict(self.extra)
+        bound_fields.update(fields)
+        return StructuredLoggerAdapter(self.logger, **bound_fields)
+
+    def process(self, msg, kwargs):
+        # unlike the base adapter, fields passed in the call are merged with the bound ones
+        extra = kwargs.get('extra')
+        if extra:
+            merged = dict(self.extra)
+            merged.update(extra)
+            kwargs['extra'] = merged
+        else:
+            kwargs['extra'] = self.extra
+        return msg, kwargs
@@ -1,5 +1,7 @@
 from aioviberbot.api.consts import BOT_API_ENDPOINT, BROADCAST_LIST_MAX_LENGTH
 from aioviberbot.api.errors import ViberValidationError
+from aioviberbot.api.messages.payload_serializer import get_payload_serializer
+from aioviberbot.api.prepared_message import PreparedMessage
 
 
 class MessageSender:
@@ -8,8 +10,11 @@ class MessageSender:
         self._request_sender = request_sender
 
     async def send_message(self, to, sender_name, sender_avatar, message, chat_id=None):
+        if isinstance(message, PreparedMessage):
+            return await self.send_prepared_message(to, message, chat_id)
+
         if not message.validate():
-            self._logger.error('failed validating message: {0}'.format(message))
+            self._logger.error('failed validating message: %s', message)
             raise ViberValidationError('failed validating message: {0}'.format(message))
 
         payload = self._prepare_payload(
@@ -20,16 +25,45 @@ class MessageSender:
             chat_id=chat_id
         )
 
-        self._logger.debug('going to send message: {0}'.format(payload))
+        self._logger.debug('going to send message: %s', payload)
 
         result = await self._request_sender.post_request(
             BOT_API_ENDPOINT.SEND_MESSAGE, payload,
         )
         return result['message_token']
 
+    def prepare_message(self, message, sender_name, sender_avatar):
+        if not message.validate():
+            self._logger.error('failed validating message: %s', message)
+            raise ViberValidationError('failed validating message: {0}'.format(message))
+
+        payload = self._prepare_payload(
+            message=message,
+            sender_name=sender_name,
+            sender_avatar=sender_avatar,
+        )
+        return PreparedMessage(message, payload)
+
+    async def send_prepared_message(self, to, prepared_message, chat_id=None, tracking_data=None):
+        body = prepared_message.build_body(to, chat_id, tracking_data, self._request_sender.auth_token)
+
+        self._logger.debug('going to send message: %s', body)
+
+        result = await self._request_sender.post_request_body(
+            BOT_API_ENDPOINT.SEND_MESSAGE, body,
+        )
+        return result['message_token']
+
     async def broadcast_message(self, broadcast_list, sender_name, sender_avatar, message):
+        result = await self.broadcast_message_result(broadcast_list, sender_name, sender_avatar, message)
+        return result['message_token']
+
+    async def broadcast_message_result(self, broadcast_list, sender_name, sender_avatar, message):
+        """
+        Same as broadcast_message, but returns the whole response with message_token and failed_list.
+        """
         if not message.validate():
-            self._logger.error('failed validating message: {0}'.format(message))
+            self._logger.error('failed validating message: %s', message)
             raise ViberValidationError('failed validating message: {0}'.format(message))
 
         if not isinstance(broadcast_list, (list, tuple)):
@@ -50,16 +84,15 @@ class MessageSender:
             sender_avatar=sender_avatar,
         )
 
-        self._logger.debug('going to broadcast message: {0}'.format(payload))
+        self._logger.debug('going to broadcast message: %s', payload)
 
-        result = await self._request_sender.post_request(
+        return await self._request_sender.post_request(
             BOT_API_ENDPOINT.BROADCAST_MESSAGE, payload,
         )
-        return result['message_token']
 
     async def post_to_public_account(self, sender, sender_name, sender_avatar, message):
         if not message.validate():
-            self._logger.error('failed validating message: {0}'.format(message))
+            self._logger.error('failed validating message: %s', message)
             raise ViberValidationError('failed validating message: {0}'.format(message))
 
         if sender is None:
@@ -72,7 +105,7 @@ class MessageSender:
             sender_avatar=sender_avatar
         )
 
-        self._logger.debug('going to send message: {0}'.format(payload))
+        self._logger.debug('going to send message: %s', payload)
 
         result = await self._request_sender.post_request(
             BOT_API_ENDPOINT.POST, payload,
@@ -89,6 +122,10 @@ class MessageSender:
         chat_id=None,
         broadcast_list=None,
     ):
+        serializer = get_payload_serializer(type(message))
+        if serializer is not None:
+            return serializer(message, sender, receiver, sender_name, sender_avatar, chat_id, broadcast_list)
+
         payload = message.to_dict()
         payload.update({
             'from': sender,
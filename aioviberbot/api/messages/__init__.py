@@ -23,6 +23,7 @@ MESSAGE_TYPE_TO_CLASS = {
     MessageType.RICH_MEDIA: RichMediaMessage,
     MessageType.KEYBOARD: KeyboardMessage
 }
+MESSAGE_CLASS_TO_TYPE = {message_class: message_type for message_type, message_class in MESSAGE_TYPE_TO_CLASS.items()}
 
 
 def get_message(message_dict):
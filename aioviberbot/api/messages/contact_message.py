@@ -4,6 +4,8 @@ from aioviberbot.api.messages.message_type import MessageType
 
 
 class ContactMessage(TypedMessage):
+    __slots__ = ('_contact',)
+
     def __init__(self, tracking_data=None, keyboard=None, contact=None, min_api_version=None):
         super(ContactMessage, self).__init__(MessageType.CONTACT, tracking_data, keyboard, min_api_version)
         self._contact = contact
@@ -1,4 +1,6 @@
 class Contact:
+    __slots__ = ('_name', '_phone_number', '_avatar')
+
     def __init__(self, name=None, phone_number=None, avatar=None):
         self._name = name
         self._phone_number = phone_number
@@ -6,6 +6,8 @@ class LocationConsts:
 
 
 class Location:
+    __slots__ = ('_lat', '_lon')
+
     def __init__(self, lat=None, lon=None):
         self._lat = lat
         self._lon = lon
@@ -4,6 +4,8 @@ from aioviberbot.api.messages.message_type import MessageType
 
 
 class LocationMessage(TypedMessage):
+    __slots__ = ('_location',)
+
     def __init__(self, tracking_data=None, keyboard=None, location=None, min_api_version=None):
         super(LocationMessage, self).__init__(MessageType.LOCATION, tracking_data, keyboard, min_api_version)
         self._location = location
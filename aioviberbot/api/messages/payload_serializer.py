@@ -0,0 +1,118 @@
+from aioviberbot.api.messages.contact_message import ContactMessage
+from aioviberbot.api.messages.file_message import FileMessage
+from aioviberbot.api.messages.keyboard_message import KeyboardMessage
+from aioviberbot.api.messages.location_message import LocationMessage
+from aioviberbot.api.messages.picture_message import PictureMessage
+from aioviberbot.api.messages.rich_media_message import RichMediaMessage
+from aioviberbot.api.messages.sticker_message import StickerMessage
+from aioviberbot.api.messages.text_message import TextMessage
+from aioviberbot.api.messages.url_message import URLMessage
+from aioviberbot.api.messages.video_message import VideoMessage
+
+# how a field gets into the payload, mirrors the to_dict methods
+TRUTHY = 'truthy'  # only set when the value is truthy
+VALUE = 'value'  # set when the value is not None
+NESTED = 'nested'  # value.to_dict() is set when the value is not None
+
+_MESSAGE_FIELDS = (
+    ('tracking_data', '_tracking_data', TRUTHY),
+    ('keyboard', '_keyboard', TRUTHY),
+    ('min_api_version', '_min_api_version', TRUTHY),
+    ('alt_text', '_alt_text', TRUTHY),
+)
+_TYPED_MESSAGE_FIELDS = _MESSAGE_FIELDS + (
+    ('type', '_message_type', VALUE),
+)
+
+PAYLOAD_FIELDS = {
+    TextMessage: _TYPED_MESSAGE_FIELDS + (
+        ('text', '_text', VALUE),
+    ),
+    URLMessage: _TYPED_MESSAGE_FIELDS + (
+        ('media', '_media', VALUE),
+    ),
+    PictureMessage: _TYPED_MESSAGE_FIELDS + (
+        ('text', '_text', VALUE),
+        ('media', '_media', VALUE),
+        ('thumbnail', '_thumbnail', VALUE),
+    ),
+    VideoMessage: _TYPED_MESSAGE_FIELDS + (
+        ('media', '_media', VALUE),
+        ('thumbnail', '_thumbnail', VALUE),
+        ('size', '_size', VALUE),
+        ('duration', '_duration', VALUE),
+        ('text', '_text', VALUE),
+    ),
+    FileMessage: _TYPED_MESSAGE_FIELDS + (
+        ('media', '_media', VALUE),
+        ('size', '_size', VALUE),
+        ('file_name', '_file_name', VALUE),
+    ),
+    StickerMessage: _TYPED_MESSAGE_FIELDS + (
+        ('sticker_id', '_sticker_id', VALUE),
+    ),
+    ContactMessage: _TYPED_MESSAGE_FIELDS + (
+        ('contact', '_contact', NESTED),
+    ),
+    LocationMessage: _TYPED_MESSAGE_FIELDS + (
+        ('location', '_location', NESTED),
+    ),
+    RichMediaMessage: _TYPED_MESSAGE_FIELDS + (
+        ('rich_media', '_rich_media', VALUE),
+        ('alt_text', '_alt_text', VALUE),
+    ),
+    KeyboardMessage: _MESSAGE_FIELDS,
+}
+
+_CONDITIONS = {
+    TRUTHY: '    if value:',
+    VALUE: '    if value is not None:',
+    NESTED: '    if value is not None:',
+}
+
+_serializers = {}
+
+
+def _compile_serializer(message_class, fields):
+    # later fields override earlier ones with the same key, like in the to_dict chain
+    fields_by_key = {}
+    for key, attribute, kind in fields:
+        fields_by_key[key] = (attribute, kind)
+
+    lines = [
+        'def serialize(message, sender, receiver, sender_name, sender_avatar, chat_id, broadcast_list):',
+        '    payload = {}',
+    ]
+    for key, (attribute, kind) in fields_by_key.items():
+        lines.append('    value = message.{0}'.format(attribute))
+        lines.append(_CONDITIONS[kind])
+        lines.append('        payload[{0!r}] = {1}'.format(key, 'value.to_dict()' if kind == NESTED else 'value'))
+    for key, argument in (('from', 'sender'), ('receiver', 'receiver')):
+        lines.append('    if {0} is not None:'.format(argument))
+        lines.append('        payload[{0!r}] = {1}'.format(key, argument))
+    lines.append("    payload['sender'] = {'name': sender_name, 'avatar': sender_avatar}")
+    for argument in ('chat_id', 'broadcast_list'):
+        lines.append('    if {0} is not None:'.format(argument))
+        lines.append('        payload[{0!r}] = {0}'.format(argument))
+    lines.append('    return payload')
+
+    namespace = {}
+    code = compile('\n'.join(lines), '<{0} payload serializer>'.format(message_class.__name__), 'exec')
+    exec(code, namespace)
+    return namespace['serialize']
+
+
+def get_payload_serializer(message_class):
+    """
+    :return: function building the send payload of the message class in one pass,
+        or None for classes not known to this module, e.g. custom subclasses overriding to_dict
+    """
+    try:
+        return _serializers[message_class]
+    except KeyError:
+        pass
+
+    fields = PAYLOAD_FIELDS.get(message_class)
+    serializer = _compile_serializer(message_class, fields) if fields is not None else None
+    _serializers[message_class] = serializer
+    return serializer
@@ -3,6 +3,8 @@ from aioviberbot.api.messages.message_type import MessageType
 
 
 class PictureMessage(TypedMessage):
+    __slots__ = ('_text', '_media', '_thumbnail')
+
     def __init__(self, tracking_data=None, keyboard=None, text=None, media=None, thumbnail=None, min_api_version=None):
         super(PictureMessage, self).__init__(MessageType.PICTURE, tracking_data, keyboard, min_api_version)
         self._text = text or ''
@@ -3,6 +3,8 @@ from aioviberbot.api.messages.message_type import MessageType
 
 
 class RichMediaMessage(TypedMessage):
+    __slots__ = ('_rich_media',)
+
     def __init__(self, tracking_data=None, keyboard=None, rich_media=None, min_api_version=None, alt_text=None):
         super(RichMediaMessage, self).__init__(MessageType.RICH_MEDIA, tracking_data, keyboard, min_api_version)
         self._rich_media = rich_media
@@ -3,6 +3,8 @@ from aioviberbot.api.messages.message_type import MessageType
 
 
 class TextMessage(TypedMessage):
+    __slots__ = ('_text',)
+
     def __init__(self, tracking_data=None, keyboard=None, text=None, min_api_version=None):
         super(TextMessage, self).__init__(MessageType.TEXT, tracking_data, keyboard, min_api_version)
         self._text = text
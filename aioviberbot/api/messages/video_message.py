@@ -3,6 +3,8 @@ from aioviberbot.api.messages.message_type import MessageType
 
 
 class VideoMessage(TypedMessage):
+    __slots__ = ('_media', '_thumbnail', '_size', '_duration', '_text')
+
     def __init__(self, tracking_data=None, keyboard=None, media=None, thumbnail=None, size=None, text=None, duration=None, min_api_version=None):
         super(VideoMessage, self).__init__(MessageType.VIDEO, tracking_data, keyboard, min_api_version)
         self._media = media
@@ -0,0 +1,148 @@
+import logging
+
+from aioviberbot.api.api import Api
+from aioviberbot.api.api_request_sender import create_client_session
+from aioviberbot.api.consts import VIBER_BOT_API_URL
+from aioviberbot.api.errors import ViberValidationError
+
+
+class MultiBotClient:
+    """
+    Many bots over one connection pool, one rate limiter and one instrumentation.
+    Every bot gets its own Api once, when it is added, so its auth token, keyed signature verifier
+    and prepared senders are reused for every request of the bot.
+    """
+
+    def __init__(
+            self,
+            client_session=None,
+            rate_limiter=None,
+            retry_policy=None,
+            logger=None,
+            json_loads=None,
+            api_url=VIBER_BOT_API_URL,
+            instrumentation=None,
+            hedge_policy=None,
+    ):
+        """
+        :param client_session: Optional. aiohttp.ClientSession shared by all bots,
+            by default the client lazily opens one and closes it on close.
+        :param rate_limiter: Optional. RateLimiter shared by all bots.
+        :param instrumentation: Optional. Instrumentation shared by all bots.
+        """
+        self._logger = logger or logging.getLogger('aioviberbot')
+        self._session = _SharedSession(client_session)
+        self._shared_kwargs = dict(
+            client_session=self._session,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            logger=self._logger,
+            json_loads=json_loads,
+            api_url=api_url,
+            instrumentation=instrumentation,
+            hedge_policy=hedge_policy,
+        )
+        self._bots = {}
+
+    async def close(self):
+        """
+        Closes the session opened by the client, a session passed to the constructor is left open.
+        """
+        await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def __len__(self):
+        return len(self._bots)
+
+    def __iter__(self):
+        return iter(self._bots)
+
+    def __contains__(self, bot_id):
+        return bot_id in self._bots
+
+    def __getitem__(self, bot_id):
+        return self._bots[bot_id]
+
+    def get(self, bot_id):
+        """
+        :return: Api of the bot or None for an unknown bot
+        """
+        return self._bots.get(bot_id)
+
+    def add_bot(
+            self,
+            bot_id,
+            bot_configuration,
+            user_cache=None,
+            online_batch_window=None,
+            verification_tokens=None,
+            suppression_list=None,
+    ):
+        """
+        :param bot_id: string the bot is routed by, e.g. in the webhook url
+        :param bot_configuration: BotConfiguration of the bot
+        :return: Api of the bot
+        """
+        if bot_id in self._bots:
+            raise ViberValidationError('bot {0} is already added'.format(bot_id))
+
+        api = Api(
+            bot_configuration,
+            user_cache=user_cache,
+            online_batch_window=online_batch_window,
+            verification_tokens=verification_tokens,
+            suppression_list=suppression_list,
+            **self._shared_kwargs
+        )
+        self._bots[bot_id] = api
+        return api
+
+    def remove_bot(self, bot_id):
+        """
+        :return: Api of the removed bot, its connections stay in the shared pool
+        """
+        return self._bots.pop(bot_id)
+
+    def verify_signature(self, bot_id, request_data, signature):
+        """
+        :return: False for an unknown bot as well
+        """
+        api = self._bots.get(bot_id)
+        if api is None:
+            return False
+        return api.verify_signature(request_data, signature)
+
+    def parse_request(self, bot_id, request_data):
+        return self._bots[bot_id].parse_request(request_data)
+
+
+class _SharedSession:
+    """
+    Stands for the client session in the apis of all bots, so they use one pool of connections
+    which is opened lazily, bound to the running event loop.
+    """
+
+    def __init__(self, client_session=None):
+        self._client_session = client_session
+        self._own_session = None
+
+    def post(self, *args, **kwargs):
+        return self._get_session().post(*args, **kwargs)
+
+    async def close(self):
+        if self._own_session is not None:
+            await self._own_session.close()
+            self._own_session = None
+
+    def _get_session(self):
+        if self._client_session:
+            return self._client_session
+
+        if self._own_session is None or self._own_session.closed:
+            self._own_session = create_client_session()
+        return self._own_session
@@ -0,0 +1,82 @@
+import asyncio
+
+from aioviberbot.api.consts import GET_ONLINE_MAX_IDS
+
+
+class _Batch:
+    def __init__(self, loop):
+        self.ids = {}  # ordered set
+        self.future = loop.create_future()
+        self.timer = None
+
+
+class OnlineStatusCoalescer:
+    """
+    Collects get_online lookups made within a short window, or until GET_ONLINE_MAX_IDS ids,
+    into one request. Every caller gets only the statuses of the ids it asked for.
+    """
+
+    def __init__(self, fetch, window=0.01, max_ids=GET_ONLINE_MAX_IDS):
+        """
+        :param fetch: coroutine function requesting online status of a list of ids
+        :param window: seconds a batch waits for more ids after the first one
+        :param max_ids: batch is sent right away once it has that many ids
+        """
+        self._fetch = fetch
+        self._window = window
+        self._max_ids = max_ids
+        self._batch = None
+        self._requests = set()
+
+    async def get_online(self, ids):
+        if not isinstance(ids, list) or not ids:
+            # let the request sender raise its validation error
+            return await self._fetch(ids)
+
+        batches = []
+        for user_id in ids:
+            batch = self._add(user_id)
+            if not batches or batches[-1] is not batch:
+                batches.append(batch)
+
+        statuses = {}
+        for batch in batches:
+            statuses.update(await asyncio.shield(batch.future))
+
+        return [statuses[user_id] for user_id in ids if user_id in statuses]
+
+    def _add(self, user_id):
+        batch = self._batch
+        if batch is None:
+            loop = asyncio.get_event_loop()
+            batch = self._batch = _Batch(loop)
+            batch.timer = loop.call_later(self._window, self._flush, batch)
+
+        batch.ids[user_id] = None
+        if len(batch.ids) >= self._max_ids:
+            self._flush(batch)
+        return batch
+
+    def _flush(self, batch):
+        if batch is not self._batch:
+            return
+
+        self._batch = None
+        batch.timer.cancel()
+        request = asyncio.ensure_future(self._send(batch))
+        self._requests.add(request)
+        request.add_done_callback(self._requests.discard)
+
+    async def _send(self, batch):
+        try:
+            users = await self._fetch(list(batch.ids))
+        except Exception as e:
+            batch.future.set_exception(e)
+            # raised to the callers, this only silences the warning when all of them were cancelled
+            batch.future.exception()
+        else:
+            batch.future.set_result({user['id']: user for user in users})
+        finally:
+            # e.g. the request was cancelled on shutdown, the callers must not wait forever
+            if not batch.future.done():
+                batch.future.cancel()
@@ -0,0 +1,375 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from aioviberbot.api.consts import TRANSIENT_STATUSES
+from aioviberbot.api.errors import ViberRequestError, ViberValidationError
+from aioviberbot.api.messages import MESSAGE_CLASS_TO_TYPE, MESSAGE_TYPE_TO_CLASS, get_message
+from aioviberbot.api.prepared_message import PreparedMessage
+
+BROADCAST_KEY = '\x00broadcast'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    receiver_key TEXT NOT NULL,
+    receiver TEXT,
+    chat_id TEXT,
+    broadcast_list TEXT,
+    message TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    message_token INTEGER,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (status, next_attempt_at, id);
+CREATE INDEX IF NOT EXISTS outbox_receiver ON outbox (receiver_key, status, id);
+'''
+
+# pending messages of receivers which have an earlier message waiting for a retry are skipped,
+# so messages of a receiver are sent in the order they were enqueued
+_CLAIM = '''
+SELECT id, receiver_key, receiver, chat_id, broadcast_list, message, attempts FROM outbox AS item
+WHERE status = 'pending' AND next_attempt_at <= ? AND NOT EXISTS (
+    SELECT 1 FROM outbox AS earlier
+    WHERE earlier.receiver_key = item.receiver_key AND earlier.status = 'pending'
+        AND earlier.next_attempt_at > ? AND earlier.id < item.id
+)
+ORDER BY id LIMIT ?
+'''
+
+
+class OutboxStatus:
+    PENDING = 'pending'
+    SENDING = 'sending'
+    DONE = 'done'
+    FAILED = 'failed'
+
+
+class Outbox:
+    """
+    Durable queue of outbound messages in a SQLite database in WAL mode.
+    Every message is a row, which is marked done with its message token once sent,
+    so a restarted outbox continues where it stopped without sending completed messages again.
+    Messages which were being sent when the process stopped are sent again (at least once delivery).
+    Messages of one receiver are sent in the order they were enqueued.
+    """
+
+    def __init__(
+            self,
+            api,
+            path,
+            workers=8,
+            batch_size=100,
+            poll_interval=0.5,
+            max_attempts=5,
+            retry_delay=5,
+            synchronous='NORMAL',
+            logger=None,
+            clock=time.time,
+    ):
+        """
+        :param api: Api the messages are sent with
+        :param path: path of the SQLite database
+        :param workers: max number of receivers messages are sent to at the same time
+        :param batch_size: max number of messages claimed and committed at once
+        :param poll_interval: seconds to wait for new messages when the outbox is empty
+        :param max_attempts: attempts after which a message failing with network errors or throttling is marked failed
+        :param retry_delay: seconds before a message failed with a network error or throttling is sent again
+        :param synchronous: SQLite synchronous pragma, 'NORMAL' survives process crashes, 'FULL' power loss
+        """
+        self._api = api
+        self._path = path
+        self._workers = workers
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._max_attempts = max_attempts
+        self._retry_delay = retry_delay
+        self._synchronous = synchronous
+        self._logger = logger or logging.getLogger('aioviberbot')
+        self._clock = clock
+        self._executor = None
+        self._connection = None
+        self._write_buffer = []
+        self._flush_task = None
+        self._drain_task = None
+        self._drain_lock = None
+        self._wakeup = None
+
+    async def start(self):
+        """
+        Opens the database and starts sending the pending messages in background.
+        """
+        # sqlite connection is used from this single thread only
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        await self._run(self._open)
+        # created here to be bound to the running loop
+        self._drain_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._drain_task = asyncio.ensure_future(self._drain_forever())
+
+    async def close(self):
+        """
+        Waits for the messages being sent and stops, pending messages stay in the database.
+        """
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            await asyncio.gather(self._drain_task, return_exceptions=True)
+            self._drain_task = None
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        if self._connection is not None:
+            await self._run(self._connection.close)
+            self._connection = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def enqueue(self, to, messages, chat_id=None):
+        """
+        Stores messages to be sent to a user, returns once they are committed.
+        :param to: Viber user id
+        :param messages: list of Message objects
+        :return: ids of the outbox items, in the order of messages
+        """
+        if not to:
+            raise ViberValidationError('missing parameter to')
+        return await self._enqueue(to, to, chat_id, None, messages)
+
+    async def enqueue_broadcast(self, broadcast_list, messages):
+        """
+        Stores messages to be broadcast, returns once they are committed.
+        :return: ids of the outbox items, in the order of messages
+        """
+        if not broadcast_list:
+            raise ViberValidationError('missing parameter broadcast_list')
+        return await self._enqueue(BROADCAST_KEY, None, None, json.dumps(broadcast_list), messages)
+
+    async def get_item(self, item_id):
+        """
+        :return: dict with status, attempts, message_token and error of the item, None for an unknown id
+        """
+        def select():
+            return self._connection.execute(
+                'SELECT status, attempts, message_token, error FROM outbox WHERE id = ?', (item_id,),
+            ).fetchone()
+
+        row = await self._run(select)
+        if row is None:
+            return None
+        return {'id': item_id, 'status': row[0], 'attempts': row[1], 'message_token': row[2], 'error': row[3]}
+
+    async def get_counts(self):
+        """
+        :return: dict of number of items by OutboxStatus
+        """
+        def select():
+            return self._connection.execute('SELECT status, COUNT(*) FROM outbox GROUP BY status').fetchall()
+
+        counts = {OutboxStatus.PENDING: 0, OutboxStatus.SENDING: 0, OutboxStatus.DONE: 0, OutboxStatus.FAILED: 0}
+        counts.update(await self._run(select))
+        return counts
+
+    async def drain(self):
+        """
+        Sends pending messages until none is ready to be sent.
+        :return: number of messages processed
+        """
+        # one drain at a time, two of them could send messages of one receiver at once and out of order
+        async with self._drain_lock:
+            processed = 0
+            while True:
+                items = await self._run(self._claim)
+                if not items:
+                    return processed
+                await self._send_batch(items)
+                processed += len(items)
+
+    def _run(self, func, *args):
+        return asyncio.get_event_loop().run_in_executor(self._executor, func, *args)
+
+    def _open(self):
+        connection = sqlite3.connect(self._path)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous={0}'.format(self._synchronous))
+        connection.executescript(_SCHEMA)
+        # these were being sent when the process stopped
+        connection.execute(
+            "UPDATE outbox SET status = 'pending' WHERE status = 'sending'",
+        )
+        connection.commit()
+        self._connection = connection
+
+    async def _enqueue(self, receiver_key, receiver, chat_id, broadcast_list, messages):
+        if not isinstance(messages, list):
+            messages = [messages]
+
+        now = self._clock()
+        future = asyncio.get_event_loop().create_future()
+        rows = []
+        for message in messages:
+            if isinstance(message, PreparedMessage):
+                message = message.message
+            if not message.validate():
+                raise ViberValidationError('failed validating message: {0}'.format(message))
+            message_dict = message.to_dict()
+            if 'type' not in message_dict:
+                # keyboard message has no type of its own
+                message_dict['type'] = _get_message_type(message)
+            if message_dict['type'] not in MESSAGE_TYPE_TO_CLASS:
+                # it could not be read back to be sent
+                raise ViberValidationError("message type '{0}' is not supported".format(message_dict['type']))
+            rows.append((receiver_key, receiver, chat_id, broadcast_list, json.dumps(message_dict), now, now))
+        self._write_buffer.append((rows, future))
+
+        # enqueues made while a commit is running are committed together by the next one
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush())
+        return await future
+
+    async def _flush(self):
+        while self._write_buffer:
+            buffer, self._write_buffer = self._write_buffer, []
+            try:
+                ids = await self._run(self._insert, [rows for rows, _ in buffer])
+            except Exception as e:
+                for _, future in buffer:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), item_ids in zip(buffer, ids):
+                if not future.done():
+                    future.set_result(item_ids)
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    def _insert(self, rows_list):
+        ids = []
+        with self._connection:
+            for rows in rows_list:
+                item_ids = []
+                for row in rows:
+                    cursor = self._connection.execute(
+                        'INSERT INTO outbox (receiver_key, receiver, chat_id, broadcast_list, message, status,'
+                        " created_at, updated_at) VALUES (?, ?, ?, ?, ?, 'pending', ?, ?)",
+                        row,
+                    )
+                    item_ids.append(cursor.lastrowid)
+                ids.append(item_ids)
+        return ids
+
+    def _claim(self):
+        now = self._clock()
+        with self._connection:
+            items = self._connection.execute(_CLAIM, (now, now, self._batch_size)).fetchall()
+            self._connection.executemany(
+                "UPDATE outbox SET status = 'sending', updated_at = ? WHERE id = ?",
+                [(now, item[0]) for item in items],
+            )
+        return items
+
+    async def _drain_forever(self):
+        while True:
+            try:
+                processed = await self.drain()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._logger.exception('outbox failed to send a batch')
+                processed = 0
+
+            if not processed:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _send_batch(self, items):
+        by_receiver = {}
+        for item in items:
+            by_receiver.setdefault(item[1], []).append(item)
+
+        semaphore = asyncio.Semaphore(self._workers)
+        results = []
+
+        async def send_receiver_items(receiver_items):
+            async with semaphore:
+                for index, item in enumerate(receiver_items):
+                    result = await self._send_item(item)
+                    results.append(result)
+                    if result[1] == OutboxStatus.PENDING:
+                        # later messages of the receiver wait for this one
+                        results.extend(self._release(later) for later in receiver_items[index + 1:])
+                        return
+
+        # results are committed even if sending is cancelled, e.g. on close
+        sending = asyncio.ensure_future(
+            asyncio.gather(*(send_receiver_items(receiver_items) for receiver_items in by_receiver.values())))
+        try:
+            await asyncio.shield(sending)
+        finally:
+            await asyncio.gather(sending, return_exceptions=True)
+            await self._run(self._update, results)
+
+    async def _send_item(self, item):
+        item_id, _, receiver, chat_id, broadcast_list, message_json, attempts = item
+        now = self._clock()
+        try:
+            message = get_message(json.loads(message_json))
+            if broadcast_list is not None:
+                tokens = await self._api.broadcast_messages(json.loads(broadcast_list), [message])
+            else:
+                tokens = await self._api.send_messages(receiver, [message], chat_id=chat_id)
+        except ViberRequestError as e:
+            if e.status not in TRANSIENT_STATUSES:
+                # viber rejected the message, sending it again would not help
+                return item_id, OutboxStatus.FAILED, attempts + 1, now, None, str(e), now
+            return self._get_retry(item_id, attempts, now, e)
+        except ViberValidationError as e:
+            return item_id, OutboxStatus.FAILED, attempts + 1, now, None, str(e), now
+        except Exception as e:
+            return self._get_retry(item_id, attempts, now, e)
+
+        return item_id, OutboxStatus.DONE, attempts + 1, now, tokens[0], None, now
+
+    def _get_retry(self, item_id, attempts, now, error):
+        attempts += 1
+        if attempts >= self._max_attempts:
+            return item_id, OutboxStatus.FAILED, attempts, now, None, str(error), now
+        self._logger.warning('outbox item=%s failed, will retry', item_id, exc_info=True)
+        return item_id, OutboxStatus.PENDING, attempts, now + self._retry_delay, None, str(error), now
+
+    def _release(self, item):
+        item_id, _, _, _, _, _, attempts = item
+        now = self._clock()
+        return item_id, OutboxStatus.PENDING, attempts, now, None, None, now
+
+    def _update(self, results):
+        with self._connection:
+            self._connection.executemany(
+                'UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, message_token = ?, error = ?,'
+                ' updated_at = ? WHERE id = ?',
+                [result[1:] + (result[0],) for result in results],
+            )
+
+
+def _get_message_type(message):
+    for message_class in type(message).__mro__:
+        if message_class in MESSAGE_CLASS_TO_TYPE:
+            return MESSAGE_CLASS_TO_TYPE[message_class]
+    raise ViberValidationError('unknown type of message: {0}'.format(message))
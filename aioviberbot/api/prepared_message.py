@@ -0,0 +1,50 @@
+import json
+
+_encode = json.JSONEncoder(separators=(',', ':')).encode
+
+
+class PreparedMessage:
+    """
+    Message validated and encoded to json once, to be sent to many receivers.
+    Only receiver, chat_id and tracking_data are encoded on every send.
+    Create it with Api.prepare_message.
+    """
+
+    def __init__(self, message, payload):
+        """
+        :param message: Message object
+        :param payload: send payload of the message without auth_token and receiver
+        """
+        self._message = message
+        payload = dict(payload)
+        tracking_data = payload.pop('tracking_data', None)
+        self._tracking_data = _encode(tracking_data).encode('utf-8') if tracking_data is not None else None
+        # the closing part of the body, starting right after the opening brace
+        self._body_tail = _encode(payload).encode('utf-8')[1:]
+
+    @property
+    def message(self):
+        return self._message
+
+    def build_body(self, receiver=None, chat_id=None, tracking_data=None, auth_token=None):
+        """
+        :param tracking_data: Optional. Overrides tracking_data of the message.
+        :param auth_token: token of the bot sending the message, so a message prepared once can be sent by any bot
+        :return: json bytes of the send request
+        """
+        parts = [b'{']
+        if auth_token is not None:
+            parts.append(b'"auth_token":' + _encode(auth_token).encode('utf-8') + b',')
+        if receiver is not None:
+            parts.append(b'"receiver":' + _encode(receiver).encode('utf-8') + b',')
+        if chat_id is not None:
+            parts.append(b'"chat_id":' + _encode(chat_id).encode('utf-8') + b',')
+        if tracking_data is not None:
+            parts.append(b'"tracking_data":' + _encode(tracking_data).encode('utf-8') + b',')
+        elif self._tracking_data is not None:
+            parts.append(b'"tracking_data":' + self._tracking_data + b',')
+        parts.append(self._body_tail)
+        return b''.join(parts)
+
+    def __str__(self):
+        return 'PreparedMessage [{0}]'.format(self._message)
@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+from aioviberbot.api.errors import ViberValidationError
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        """
+        :param rate: tokens added per second
+        :param capacity: Optional. Max burst size, defaults to rate but at least one token.
+        :param clock: Optional. Monotonic clock, returns seconds.
+        """
+        if rate <= 0:
+            raise ViberValidationError('token bucket rate should be positive')
+        if capacity is None:
+            capacity = max(rate, 1)
+        if capacity < 1:
+            raise ViberValidationError('token bucket capacity should be at least one token')
+
+        self._rate = rate
+        self._capacity = capacity
+        self._clock = clock
+        self._tokens = self._capacity
+        self._updated_at = clock()
+        self._lock = None
+
+    @property
+    def rate(self):
+        return self._rate
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def level(self):
+        """
+        number of tokens available right now
+        """
+        self._refill()
+        return self._tokens
+
+    def try_acquire(self, tokens=1):
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens=1):
+        """
+        Waits until tokens are available and takes them. Waiters are served in arrival order.
+        """
+        if tokens > self._capacity:
+            raise ViberValidationError('can not acquire more tokens than bucket capacity')
+
+        # created lazily, so the bucket can be built outside of the event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                await asyncio.sleep((tokens - self._tokens) / self._rate)
+
+    def _refill(self):
+        now = self._clock()
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+        self._updated_at = now
+
+    def __str__(self):
+        return 'TokenBucket[rate={0}, capacity={1}, level={2}]'.format(self._rate, self._capacity, self.level)
+
+
+class RateLimiter:
+    """
+    Global and per-endpoint token buckets in front of every api request.
+    Any object with the same acquire(endpoint) coroutine can be passed to Api instead.
+    """
+
+    def __init__(self, global_bucket=None, endpoint_buckets=None):
+        """
+        :param global_bucket: Optional. TokenBucket shared by all endpoints.
+        :param endpoint_buckets: Optional. Dict of BOT_API_ENDPOINT value to TokenBucket.
+        """
+        self._global_bucket = global_bucket
+        self._endpoint_buckets = dict(endpoint_buckets or {})
+
+    async def acquire(self, endpoint):
+        # the endpoint bucket goes first, so a request waiting for its endpoint
+        # does not hold back requests to other endpoints
+        endpoint_bucket = self._endpoint_buckets.get(endpoint)
+        if endpoint_bucket is not None:
+            await endpoint_bucket.acquire()
+        if self._global_bucket is not None:
+            await self._global_bucket.acquire()
+
+    @property
+    def levels(self):
+        """
+        current levels of all buckets, the global one is reported under the 'global' key
+        """
+        levels = {endpoint: bucket.level for endpoint, bucket in self._endpoint_buckets.items()}
+        if self._global_bucket is not None:
+            levels['global'] = self._global_bucket.level
+        return levels
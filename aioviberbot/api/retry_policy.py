@@ -0,0 +1,99 @@
+import asyncio
+import random
+import time
+
+import aiohttp
+
+from aioviberbot.api.consts import BOT_API_ENDPOINT, TRANSIENT_STATUSES
+from aioviberbot.api.errors import ViberClientError, ViberRequestError, ViberTimeoutError
+
+# requests that can be repeated without side effects, send endpoints may deliver a message twice
+IDEMPOTENT_ENDPOINTS = frozenset([
+    BOT_API_ENDPOINT.GET_ACCOUNT_INFO,
+    BOT_API_ENDPOINT.GET_ONLINE,
+    BOT_API_ENDPOINT.GET_USER_DETAILS,
+    BOT_API_ENDPOINT.SET_WEBHOOK,
+])
+
+
+class RetryPolicy:
+    def __init__(
+            self,
+            max_attempts=3,
+            base_delay=0.2,
+            max_delay=5,
+            deadline=20,
+            endpoints=IDEMPOTENT_ENDPOINTS,
+            clock=time.monotonic,
+            rand=random.random,
+    ):
+        """
+        :param max_attempts: max number of attempts, including the first one
+        :param base_delay: delay before the first retry in seconds, doubled for every next retry
+        :param max_delay: cap of the delay between attempts in seconds
+        :param deadline: Optional. Total time in seconds after which no more attempts are made.
+        :param endpoints: endpoints safe to retry, see IDEMPOTENT_ENDPOINTS
+        """
+        self._max_attempts = max_attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._deadline = deadline
+        self._endpoints = frozenset(endpoints)
+        self._clock = clock
+        self._rand = rand
+        self._retries_count = 0
+
+    @property
+    def retries_count(self):
+        """
+        total number of retries made with this policy
+        """
+        return self._retries_count
+
+    def is_retryable(self, endpoint, error):
+        if endpoint not in self._endpoints:
+            return False
+
+        if isinstance(error, ViberTimeoutError):
+            return True
+
+        if isinstance(error, ViberClientError):
+            cause = error.args[0] if error.args else None
+            if isinstance(cause, aiohttp.ClientResponseError):
+                # only server errors and throttling are transient
+                return cause.status >= 500 or cause.status == 429
+            return True
+
+        if isinstance(error, ViberRequestError):
+            # throttled by viber with a 200 response
+            return error.status in TRANSIENT_STATUSES
+
+        return False
+
+    def get_delay(self, retry):
+        """
+        capped exponential backoff with full jitter
+        """
+        return self._rand() * min(self._max_delay, self._base_delay * 2 ** retry)
+
+    async def call(self, endpoint, request):
+        """
+        :param endpoint: BOT_API_ENDPOINT the request is sent to
+        :param request: coroutine function making one attempt
+        """
+        started_at = self._clock()
+        attempt = 1
+        while True:
+            try:
+                return await request()
+            except (ViberClientError, ViberTimeoutError, ViberRequestError) as e:
+                if attempt >= self._max_attempts or not self.is_retryable(endpoint, e):
+                    raise
+
+                delay = self.get_delay(attempt - 1)
+                if self._deadline is not None and self._clock() - started_at + delay >= self._deadline:
+                    raise
+
+            await asyncio.sleep(delay)
+            attempt += 1
+            self._retries_count += 1
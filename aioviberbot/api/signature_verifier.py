@@ -0,0 +1,46 @@
+import hashlib
+import hmac
+
+
+class SignatureVerifier:
+    """
+    Verifies X-Viber-Content-Signature of webhook callbacks.
+    HMAC objects are keyed once and copied for every callback,
+    signatures are compared in constant time.
+    """
+
+    def __init__(self, auth_tokens):
+        """
+        :param auth_tokens: tokens a signature is accepted for, e.g. the current and the previous one
+                            while the auth token is rotated
+        """
+        self._keyed_hmacs = tuple(
+            hmac.new(auth_token.encode('ascii'), digestmod=hashlib.sha256) for auth_token in auth_tokens
+        )
+
+    def calculate_signature(self, request_data):
+        """
+        :return: signature of the request data made with the first token
+        """
+        return self._sign(self._keyed_hmacs[0], request_data)
+
+    def verify(self, request_data, signature):
+        if not isinstance(signature, str):
+            return False
+
+        try:
+            signature = signature.encode('ascii')
+        except UnicodeEncodeError:
+            return False
+
+        verified = False
+        # every token is checked, so the time does not depend on which one matched
+        for keyed_hmac in self._keyed_hmacs:
+            verified |= hmac.compare_digest(self._sign(keyed_hmac, request_data).encode('ascii'), signature)
+        return verified
+
+    @staticmethod
+    def _sign(keyed_hmac, request_data):
+        signer = keyed_hmac.copy()
+        signer.update(request_data)
+        return signer.hexdigest()
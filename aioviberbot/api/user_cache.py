@@ -0,0 +1,202 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+from aioviberbot.api.errors import ViberRequestError
+
+USER_DETAILS_KEY = 'user_details:'
+ONLINE_KEY = 'online:'
+
+# statuses meaning the id is unknown or the user is unavailable, other failures like
+# tooManyRequests (12) are transient and not cached
+# 5 - receiverNotRegistered, 6 - receiverNotSubscribed
+NEGATIVE_CACHE_STATUSES = frozenset([5, 6])
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU cache with per-entry ttl.
+    A shared backend (e.g. redis) should implement the same get, set and delete coroutines,
+    values are json serializable dicts.
+    """
+
+    def __init__(self, max_size=10000, clock=time.monotonic):
+        self._max_size = max_size
+        self._clock = clock
+        self._entries = OrderedDict()
+
+    async def get(self, key):
+        """
+        :return: cached value or None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key, value, ttl):
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key):
+        self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class UserCache:
+    def __init__(self, backend=None, ttl=3600, negative_ttl=300, online_ttl=30):
+        """
+        :param backend: Optional. Cache backend, defaults to MemoryCacheBackend.
+        :param ttl: seconds user details are cached for
+        :param negative_ttl: seconds an unknown user id is cached for
+        :param online_ttl: seconds online status is cached for
+        """
+        self._backend = backend if backend is not None else MemoryCacheBackend()
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._online_ttl = online_ttl
+        self._user_details_in_flight = {}
+        self._online_in_flight = {}
+
+    @property
+    def backend(self):
+        return self._backend
+
+    async def get_user_details(self, user_id, fetch, allow_partial=False):
+        """
+        :param fetch: coroutine function requesting user details by id
+        :param allow_partial: whether details primed from a callback are enough,
+            they have no device fields like primary_device_os
+        """
+        entry = await self._backend.get(USER_DETAILS_KEY + user_id)
+        if entry is None or (entry.get('partial') and not allow_partial):
+            # concurrent lookups for the same user share one request
+            in_flight = self._user_details_in_flight.get(user_id)
+            if in_flight is None:
+                in_flight = asyncio.ensure_future(self._fetch_user_details(user_id, fetch))
+                self._user_details_in_flight[user_id] = in_flight
+                in_flight.add_done_callback(lambda task: self._forget_user_details_request(user_id, task))
+            entry = await asyncio.shield(in_flight)
+
+        if 'error' in entry:
+            raise ViberRequestError(entry['error'], status=entry.get('status'))
+        return dict(entry['user'])
+
+    def _forget_user_details_request(self, user_id, request):
+        if self._user_details_in_flight.get(user_id) is request:
+            del self._user_details_in_flight[user_id]
+        _retrieve_exception(request)
+
+    async def _fetch_user_details(self, user_id, fetch):
+        try:
+            user = await fetch(user_id)
+        except ViberRequestError as e:
+            if e.status not in NEGATIVE_CACHE_STATUSES:
+                raise
+            entry = {'error': str(e), 'status': e.status}
+            await self._backend.set(USER_DETAILS_KEY + user_id, entry, self._negative_ttl)
+            return entry
+
+        entry = {'user': user}
+        await self._backend.set(USER_DETAILS_KEY + user_id, entry, self._ttl)
+        return entry
+
+    async def get_online(self, ids, fetch):
+        """
+        :param fetch: coroutine function requesting online status of a list of ids
+        :return: online status of the ids viber reported, in the order of ids
+        """
+        if not isinstance(ids, list) or not ids:
+            # let the request sender raise its validation error
+            return await fetch(ids)
+
+        statuses = {}
+        in_flight = {}
+        missing = []
+        for user_id in ids:
+            status = await self._backend.get(ONLINE_KEY + user_id)
+            if status is not None:
+                statuses[user_id] = status
+            elif user_id in self._online_in_flight:
+                in_flight[user_id] = self._online_in_flight[user_id]
+            elif user_id not in missing:
+                missing.append(user_id)
+
+        if missing:
+            request = asyncio.ensure_future(self._fetch_online(missing, fetch))
+            for user_id in missing:
+                self._online_in_flight[user_id] = request
+                in_flight[user_id] = request
+            request.add_done_callback(lambda task: self._forget_online_request(missing, task))
+
+        for user_id, user_request in in_flight.items():
+            fetched = await asyncio.shield(user_request)
+            if user_id in fetched:
+                statuses[user_id] = fetched[user_id]
+
+        return [dict(statuses[user_id]) for user_id in ids if user_id in statuses]
+
+    async def _fetch_online(self, ids, fetch):
+        users = await fetch(ids)
+        fetched = {}
+        for user in users:
+            fetched[user['id']] = user
+            await self._backend.set(ONLINE_KEY + user['id'], user, self._online_ttl)
+        return fetched
+
+    def _forget_online_request(self, ids, request):
+        for user_id in ids:
+            if self._online_in_flight.get(user_id) is request:
+                del self._online_in_flight[user_id]
+        _retrieve_exception(request)
+
+    async def prime(self, user_profile):
+        """
+        Stores the fields of a UserProfile received in a callback,
+        so cached details are available without a request.
+        Fields of an existing entry which the profile does not have are kept.
+        Details known only from callbacks are partial, they are fetched when full details are requested.
+        """
+        if user_profile is None or user_profile.id is None:
+            return
+
+        fields = {
+            'id': user_profile.id,
+            'name': user_profile.name,
+            'avatar': user_profile.avatar,
+            'country': user_profile.country,
+            'language': user_profile.language,
+            'api_version': user_profile.api_version,
+        }
+        entry = await self._backend.get(USER_DETAILS_KEY + user_profile.id)
+        if entry is not None and 'user' in entry:
+            user = dict(entry['user'])
+            partial = entry.get('partial', False)
+        else:
+            user = {}
+            partial = True
+        user.update((key, value) for key, value in fields.items() if value is not None)
+        entry = {'user': user, 'partial': True} if partial else {'user': user}
+        await self._backend.set(USER_DETAILS_KEY + user_profile.id, entry, self._ttl)
+
+    async def invalidate(self, user_id):
+        await self._backend.delete(USER_DETAILS_KEY + user_id)
+        await self._backend.delete(ONLINE_KEY + user_id)
+
+
+def _retrieve_exception(task):
+    # the error is raised to the waiting callers, this only silences
+    # the warning when all of them were cancelled
+    if not task.cancelled():
+        task.exception()
@@ -1,4 +1,6 @@
 class UserProfile:
+    __slots__ = ('_name', '_avatar', '_id', '_country', '_language', '_api_version')
+
     def __init__(self, name=None, avatar=None, user_id=None, country=None, language=None, api_version=None):
         self._name = name
         self._avatar = avatar
@@ -4,6 +4,8 @@ from aioviberbot.api.viber_requests.viber_request import ViberRequest
 
 
 class ViberConversationStartedRequest(ViberRequest):
+    __slots__ = ('_message_token', '_type', '_context', '_user', '_api_version', '_subscribed')
+
     def __init__(self):
         super(ViberConversationStartedRequest, self).__init__(EventType.CONVERSATION_STARTED)
         self._message_token = None
@@ -3,6 +3,8 @@ from aioviberbot.api.viber_requests.viber_request import ViberRequest
 
 
 class ViberDeliveredRequest(ViberRequest):
+    __slots__ = ('_message_token', '_user_id', '_chat_id')
+
     def __init__(self):
         super(ViberDeliveredRequest, self).__init__(EventType.DELIVERED)
         self._message_token = None
@@ -4,6 +4,8 @@ from aioviberbot.api.viber_requests.viber_request import ViberRequest
 
 
 class ViberFailedRequest(ViberRequest):
+    __slots__ = ('_message_token', '_user_id', '_desc')
+
     def __init__(self):
         super(ViberFailedRequest, self).__init__(EventType.FAILED)
         self._message_token = None
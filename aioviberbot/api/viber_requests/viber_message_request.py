@@ -5,6 +5,8 @@ from aioviberbot.api.viber_requests.viber_request import ViberRequest
 
 
 class ViberMessageRequest(ViberRequest):
+    __slots__ = ('_message', '_sender', '_message_token', '_chat_id', '_reply_type', '_silent')
+
     def __init__(self):
         super(ViberMessageRequest, self).__init__(EventType.MESSAGE)
         self._message = None
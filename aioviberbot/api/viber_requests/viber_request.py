@@ -1,6 +1,8 @@
 
 
 class ViberRequest:
+    __slots__ = ('_event_type', '_timestamp')
+
     def __init__(self, event_type=None):
         self._event_type = event_type
         self._timestamp = None
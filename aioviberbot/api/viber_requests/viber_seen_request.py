@@ -4,6 +4,8 @@ from aioviberbot.api.viber_requests.viber_request import ViberRequest
 
 
 class ViberSeenRequest(ViberRequest):
+    __slots__ = ('_message_token', '_user_id')
+
     def __init__(self):
         super(ViberSeenRequest, self).__init__(EventType.SEEN)
         self._message_token = None
@@ -4,6 +4,8 @@ from aioviberbot.api.viber_requests.viber_request import ViberRequest
 
 
 class ViberSubscribedRequest(ViberRequest):
+    __slots__ = ('_user', '_api_version')
+
     def __init__(self):
         super(ViberSubscribedRequest, self).__init__(EventType.SUBSCRIBED)
         self._user = None
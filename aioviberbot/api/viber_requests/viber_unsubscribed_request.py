@@ -3,6 +3,8 @@ from aioviberbot.api.viber_requests.viber_request import ViberRequest
 
 
 class ViberUnsubscribedRequest(ViberRequest):
+    __slots__ = ('_user_id',)
+
     def __init__(self):
         super(ViberUnsubscribedRequest, self).__init__(EventType.UNSUBSCRIBED)
         self._user_id = None
@@ -0,0 +1,250 @@
+import asyncio
+import functools
+import logging
+
+from aiohttp import web
+
+from aioviberbot.api.errors import ViberValidationError
+
+
+class ShedPolicy:
+    # respond 503, viber delivers the callback again later
+    REJECT = 'reject'
+    # respond 200 and drop the incoming request
+    DROP_NEWEST = 'drop_newest'
+    # respond 200 and drop the longest waiting request to make room
+    DROP_OLDEST = 'drop_oldest'
+
+
+SHED_POLICIES = (ShedPolicy.REJECT, ShedPolicy.DROP_NEWEST, ShedPolicy.DROP_OLDEST)
+
+
+class WebhookSettings:
+    def __init__(self, path='/webhook', queue_size=1000, workers=4,
+                 shed_policy=ShedPolicy.REJECT, shutdown_timeout=10):
+        """
+        :param path: route of the webhook
+        :param queue_size: max number of parsed requests waiting for a worker
+        :param workers: number of worker tasks running the handler
+        :param shed_policy: ShedPolicy applied when the queue is full
+        :param shutdown_timeout: seconds the queued requests get to be handled on shutdown
+        """
+        if queue_size < 1:
+            raise ViberValidationError('queue_size must be positive')
+        if workers < 1:
+            raise ViberValidationError('workers must be positive')
+        if shed_policy not in SHED_POLICIES:
+            raise ViberValidationError("shed policy '{0}' is not supported".format(shed_policy))
+
+        self.path = path
+        self.queue_size = queue_size
+        self.workers = workers
+        self.shed_policy = shed_policy
+        self.shutdown_timeout = shutdown_timeout
+
+
+class WebhookMetrics:
+    def __init__(self):
+        self.received = 0
+        self.unknown_bot = 0
+        self.rejected_signature = 0
+        self.invalid = 0
+        self.duplicates = 0
+        self.queued = 0
+        self.shed = 0
+        self.processed = 0
+        self.failed = 0
+        self.queue_depth = 0
+        self.busy_workers = 0
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+
+class WebhookProcessor:
+    """
+    Acks webhook callbacks as soon as they are verified and parsed,
+    the handler runs later in one of the worker tasks.
+    """
+
+    def __init__(self, viber, handler, settings=None, logger=None, deduplicator=None):
+        """
+        :param viber: Api verifying and parsing the callbacks
+        :param handler: coroutine function called with the viber request, e.g. Dispatcher.dispatch
+        :param settings: Optional. WebhookSettings.
+        :param deduplicator: Optional. Deduplicator acking repeated callbacks without handling them.
+        """
+        self._viber = viber
+        self._handler = handler
+        self._settings = settings or WebhookSettings()
+        self._deduplicator = deduplicator
+        self._logger = logger or logging.getLogger('aioviberbot')
+        self._metrics = WebhookMetrics()
+        self._queue = None
+        self._workers = []
+
+    @property
+    def settings(self):
+        return self._settings
+
+    @property
+    def metrics(self):
+        self._metrics.queue_depth = self._queue.qsize() if self._queue is not None else 0
+        return self._metrics
+
+    async def start(self):
+        # the queue is created here to be bound to the running loop
+        self._queue = asyncio.Queue(maxsize=self._settings.queue_size)
+        self._workers = [asyncio.ensure_future(self._work()) for _ in range(self._settings.workers)]
+
+    async def stop(self):
+        if self._queue is None:
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.join(), self._settings.shutdown_timeout)
+        except asyncio.TimeoutError:
+            self._logger.warning('%s queued requests were not handled on shutdown', self._queue.qsize())
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def handle(self, request):
+        self._metrics.received += 1
+        viber, handler, namespace = self._resolve(request)
+        request_data = await request.read()
+        signature = request.headers.get('X-Viber-Content-Signature')
+        if not viber.verify_signature(request_data, signature):
+            self._metrics.rejected_signature += 1
+            raise web.HTTPForbidden
+
+        try:
+            viber_request = viber.parse_request(request_data)
+        except (ValueError, KeyError, ViberValidationError):
+            self._metrics.invalid += 1
+            self._logger.warning('invalid webhook request', exc_info=True)
+            raise web.HTTPBadRequest
+
+        if self._deduplicator is not None and await self._deduplicator.is_duplicate(viber_request, namespace):
+            self._metrics.duplicates += 1
+            return web.json_response({'ok': True})
+
+        if not self._enqueue(handler, viber_request):
+            if self._deduplicator is not None:
+                # the retry of a rejected callback has to be handled
+                await self._deduplicator.forget(viber_request, namespace)
+            raise web.HTTPServiceUnavailable
+
+        return web.json_response({'ok': True})
+
+    def _resolve(self, request):
+        """
+        :return: Api verifying and parsing the request, the handler it is passed to
+            and the namespace of its deduplication key
+        """
+        return self._viber, self._handler, None
+
+    def _enqueue(self, handler, viber_request):
+        """
+        :return: False when the request has to be rejected
+        """
+        if self._queue.full():
+            self._metrics.shed += 1
+            shed_policy = self._settings.shed_policy
+            self._logger.warning('webhook queue is full, applying shed policy=%s', shed_policy)
+            if shed_policy == ShedPolicy.REJECT:
+                return False
+            if shed_policy == ShedPolicy.DROP_NEWEST:
+                return True
+
+            self._queue.get_nowait()
+            self._queue.task_done()
+
+        self._queue.put_nowait((handler, viber_request))
+        self._metrics.queued += 1
+        return True
+
+    async def _work(self):
+        while True:
+            handler, viber_request = await self._queue.get()
+            self._metrics.busy_workers += 1
+            try:
+                await handler(viber_request)
+            except Exception:
+                self._metrics.failed += 1
+                self._logger.exception('webhook handler failed')
+            else:
+                self._metrics.processed += 1
+            finally:
+                self._metrics.busy_workers -= 1
+                self._queue.task_done()
+
+
+class MultiBotWebhookProcessor(WebhookProcessor):
+    """
+    WebhookProcessor for the bots of a MultiBotClient, routed by the bot_id part of the url.
+    Requests of all bots share one queue and the workers.
+    """
+
+    def __init__(self, client, handler, settings=None, logger=None, deduplicator=None):
+        """
+        :param client: MultiBotClient verifying and parsing the callbacks with the api of the bot
+        :param handler: coroutine function called with the bot id and the viber request
+        """
+        super(MultiBotWebhookProcessor, self).__init__(client, handler, settings, logger, deduplicator)
+        self._bot_handlers = {}
+
+    def _resolve(self, request):
+        bot_id = request.match_info['bot_id']
+        viber = self._viber.get(bot_id)
+        if viber is None:
+            self._metrics.unknown_bot += 1
+            raise web.HTTPNotFound
+
+        bot_handler = self._bot_handlers.get(bot_id)
+        if bot_handler is None:
+            bot_handler = self._bot_handlers[bot_id] = functools.partial(self._handler, bot_id)
+        return viber, bot_handler, bot_id
+
+
+WEBHOOK_PROCESSOR_KEY = web.AppKey('viber_webhook', WebhookProcessor) if hasattr(web, 'AppKey') else 'viber_webhook'
+
+
+def create_webhook_app(viber, handler, settings=None, logger=None, deduplicator=None):
+    """
+    :param viber: Api verifying and parsing the callbacks
+    :param handler: coroutine function called with the viber request, e.g. Dispatcher.dispatch
+    :param settings: Optional. WebhookSettings.
+    :param deduplicator: Optional. Deduplicator acking repeated callbacks without handling them.
+    :return: aiohttp application, its WebhookProcessor is available as app[WEBHOOK_PROCESSOR_KEY]
+    """
+    processor = WebhookProcessor(viber, handler, settings, logger, deduplicator)
+    return _create_app(processor, processor.settings.path)
+
+
+def create_multi_bot_webhook_app(client, handler, settings=None, logger=None, deduplicator=None):
+    """
+    :param client: MultiBotClient, callbacks of a bot are posted to settings.path + '/' + bot id
+    :param handler: coroutine function called with the bot id and the viber request
+    :return: aiohttp application, its MultiBotWebhookProcessor is available as app[WEBHOOK_PROCESSOR_KEY]
+    """
+    processor = MultiBotWebhookProcessor(client, handler, settings, logger, deduplicator)
+    return _create_app(processor, processor.settings.path.rstrip('/') + '/{bot_id}')
+
+
+def _create_app(processor, path):
+    app = web.Application()
+    app[WEBHOOK_PROCESSOR_KEY] = processor
+    app.router.add_route('POST', path, processor.handle)
+
+    async def start(app):
+        await processor.start()
+
+    async def stop(app):
+        await processor.stop()
+
+    app.on_startup.append(start)
+    app.on_shutdown.append(stop)
+    return app
@@ -0,0 +1,248 @@
+import argparse
+import importlib
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import ssl
+import time
+
+from aiohttp import web
+
+from aioviberbot.api.errors import ViberValidationError
+
+
+class WebhookServer:
+    """
+    Runs the webhook application in several worker processes listening on one port with SO_REUSEPORT,
+    so the kernel spreads connections between them and callbacks are parsed and verified on every core.
+    The supervisor respawns workers which exit and stops them gracefully on SIGTERM or SIGINT.
+    Every worker creates its own application, and so its own Api and connection pool, with app_factory.
+    """
+
+    def __init__(
+            self,
+            app_factory,
+            host='0.0.0.0',
+            port=8080,
+            workers=None,
+            shutdown_timeout=10,
+            respawn_delay=1,
+            cert_file=None,
+            key_file=None,
+            logger=None,
+    ):
+        """
+        :param app_factory: 'module:function' or an importable function, called in every worker,
+            returning the aiohttp application or a coroutine returning it
+        :param workers: number of worker processes, the number of cpus by default
+        :param shutdown_timeout: seconds a worker gets to finish its requests on shutdown before it is killed
+        :param respawn_delay: min seconds between starts of a worker in one slot, so a crashing worker does not spin
+        :param cert_file: Optional. Certificate chain file, to serve https.
+        :param key_file: Optional. Private key file of the certificate.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ViberValidationError('workers must be positive')
+        if workers > 1 and not hasattr(socket, 'SO_REUSEPORT'):
+            raise ViberValidationError('SO_REUSEPORT is not supported on this platform, run a single worker')
+
+        self._app_factory = app_factory
+        self._host = host
+        self._port = port
+        self._workers_count = workers
+        self._shutdown_timeout = shutdown_timeout
+        self._respawn_delay = respawn_delay
+        self._cert_file = cert_file
+        self._key_file = key_file
+        self._logger = logger or logging.getLogger('aioviberbot')
+        # workers are spawned, a forked event loop or connection pool of the parent is not safe to use
+        self._context = multiprocessing.get_context('spawn')
+        self._socket = None
+        self._workers = []
+        self._spawned_at = []
+        self._respawns_count = 0
+        self._stopping = False
+
+    @property
+    def port(self):
+        """
+        port the workers listen on, known once the server is started when port 0 was given
+        """
+        return self._port
+
+    @property
+    def worker_pids(self):
+        return [worker.pid for worker in self._workers if worker is not None and worker.is_alive()]
+
+    @property
+    def respawns_count(self):
+        return self._respawns_count
+
+    def start(self):
+        """
+        Reserves the port and starts the workers.
+        """
+        # the reserved socket is bound but never listens, so it gets no connections,
+        # it only holds the port, resolves port 0 and fails early when the port is taken
+        self._socket = _create_socket(self._host, self._port)
+        self._port = self._socket.getsockname()[1]
+        self._workers = [None] * self._workers_count
+        self._spawned_at = [0] * self._workers_count
+        for slot in range(self._workers_count):
+            self._spawn(slot)
+
+    def check_workers(self):
+        """
+        Respawns the workers which exited.
+        :return: number of respawned workers
+        """
+        respawned = 0
+        now = time.monotonic()
+        for slot, worker in enumerate(self._workers):
+            if worker is not None and worker.is_alive():
+                continue
+            if now - self._spawned_at[slot] < self._respawn_delay:
+                continue
+
+            if worker is not None:
+                self._logger.warning('webhook worker pid=%s exited with code=%s, respawning', worker.pid, worker.exitcode)
+                worker.close()
+            self._spawn(slot)
+            self._respawns_count += 1
+            respawned += 1
+        return respawned
+
+    def stop(self):
+        """
+        Asks the workers to finish the requests they are handling and exit, kills those still running after
+        shutdown_timeout.
+        """
+        self._stopping = True
+        workers = [worker for worker in self._workers if worker is not None]
+        for worker in workers:
+            if worker.is_alive():
+                os.kill(worker.pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + self._shutdown_timeout
+        for worker in workers:
+            worker.join(max(0, deadline - time.monotonic()))
+            if worker.is_alive():
+                self._logger.warning('webhook worker pid=%s did not stop in time, killing', worker.pid)
+                worker.kill()
+                worker.join()
+
+        self._workers = []
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def run(self, check_interval=0.5):
+        """
+        Starts the server and supervises the workers until SIGTERM or SIGINT.
+        """
+        def request_stop(signum, frame):
+            self._stopping = True
+
+        previous_handlers = {
+            signum: signal.signal(signum, request_stop) for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            self.start()
+            self._logger.info(
+                'webhook server listening on %s:%s with %s workers', self._host, self._port, self._workers_count)
+            while not self._stopping:
+                time.sleep(check_interval)
+                if not self._stopping:
+                    self.check_workers()
+        finally:
+            self.stop()
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+    def _spawn(self, slot):
+        worker = self._context.Process(
+            target=_run_worker,
+            args=(
+                self._app_factory, self._host, self._port, self._shutdown_timeout, self._cert_file, self._key_file,
+            ),
+            name='aioviberbot-webhook-{0}'.format(slot),
+            daemon=True,
+        )
+        worker.start()
+        self._workers[slot] = worker
+        self._spawned_at[slot] = time.monotonic()
+
+
+def _create_socket(host, port):
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, 'SO_REUSEPORT'):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((host, port))
+    except Exception:
+        sock.close()
+        raise
+    return sock
+
+
+def _load_app_factory(app_factory):
+    if not isinstance(app_factory, str):
+        return app_factory
+
+    module_name, _, attribute = app_factory.partition(':')
+    if not attribute:
+        raise ViberValidationError("app factory should be 'module:function', got: {0}".format(app_factory))
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _run_worker(app_factory, host, port, shutdown_timeout, cert_file, key_file):
+    # the supervisor stops the workers, ctrl+c in a terminal reaches the whole process group
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    ssl_context = None
+    if cert_file is not None:
+        ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        ssl_context.load_cert_chain(cert_file, key_file)
+
+    sock = _create_socket(host, port)
+    # SIGTERM runs the shutdown of the application, e.g. the webhook queue is drained
+    web.run_app(
+        _load_app_factory(app_factory)(),
+        sock=sock,
+        shutdown_timeout=shutdown_timeout,
+        ssl_context=ssl_context,
+        print=None,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Multi-process webhook server')
+    parser.add_argument('app_factory', help="'module:function' returning the aiohttp application")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes, cpus by default')
+    parser.add_argument('--shutdown-timeout', type=float, default=10)
+    parser.add_argument('--cert-file', help='certificate chain file, to serve https')
+    parser.add_argument('--key-file', help='private key file of the certificate')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = WebhookServer(
+        args.app_factory,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        shutdown_timeout=args.shutdown_timeout,
+        cert_file=args.cert_file,
+        key_file=args.key_file,
+    )
+    server.run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+End-to-end send throughput against the local api emulator: Api.send_messages with
+every concurrency over a real connection pool, with and without emulated latency.
+
+    python -m benchmarks.end_to_end [messages]
+"""
+import asyncio
+import sys
+import time
+
+from aioviberbot import Api, BotConfiguration
+from aioviberbot.api.emulator import ViberApiEmulator
+from aioviberbot.api.messages import TextMessage
+
+BOT_CONFIGURATION = BotConfiguration('auth-token', 'benchbot', 'http://avatars.com/')
+
+
+async def bench(latency, concurrency, messages):
+    async with ViberApiEmulator(latency=latency) as emulator:
+        async with Api(BOT_CONFIGURATION, api_url=emulator.url) as viber:
+            started = time.perf_counter()
+            await viber.send_messages(
+                '01234567890A=', [TextMessage(text='hi') for _ in range(messages)], concurrency=concurrency)
+            return messages / (time.perf_counter() - started)
+
+
+async def main(messages):
+    print('{0:>8} {1:>12} {2:>12}'.format('latency', 'concurrency', 'messages/s'))
+    for latency in (0, 0.02):
+        for concurrency in (1, 10, 50):
+            rate = await bench(latency, concurrency, messages)
+            print('{0:>8} {1:>12} {2:>12.0f}'.format(latency, concurrency, rate))
+
+
+if __name__ == '__main__':
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
@@ -0,0 +1,75 @@
+"""
+Measures parse_request plus send_messages with the aioviberbot logger at INFO and DEBUG level,
+and counts how many times the models are formatted to strings.
+
+    python -m benchmarks.lazy_logging [iterations]
+"""
+import asyncio
+import io
+import json
+import logging
+import sys
+import time
+
+from aioviberbot import Api, BotConfiguration
+from aioviberbot.api.messages.message import Message
+from aioviberbot.api.user_profile import UserProfile
+from aioviberbot.api.viber_requests.viber_request import ViberRequest
+
+CALLBACK = json.dumps({
+    'event': 'message',
+    'timestamp': 1457764197627,
+    'message_token': 4912661846655238145,
+    'sender': {'id': '01234567890A=', 'name': 'viberUser', 'avatar': 'http://avatar_url', 'api_version': 2},
+    'message': {'type': 'text', 'text': 'hi!', 'tracking_data': 'tracking'},
+    'silent': False,
+}).encode()
+
+str_calls = 0
+
+
+def count_str_calls(model):
+    original = model.__str__
+
+    def __str__(self):
+        global str_calls
+        str_calls += 1
+        return original(self)
+
+    model.__str__ = __str__
+
+
+async def post_request(endpoint, payload):
+    return {'status': 0, 'message_token': 1}
+
+
+async def run(level, iterations):
+    global str_calls
+    logger = logging.getLogger('aioviberbot.bench')
+    logger.setLevel(level)
+    viber = Api(BotConfiguration('auth-token', 'benchbot', 'http://avatars.com/'), logger=logger)
+    viber._request_sender.post_request = post_request
+
+    str_calls = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        viber_request = viber.parse_request(CALLBACK)
+        await viber.send_messages(viber_request.sender.id, [viber_request.message])
+    elapsed = time.perf_counter() - started
+
+    print('{0:<6} {1:>9.0f} parse+send/s  {2} __str__ calls'.format(
+        logging.getLevelName(level), iterations / elapsed, str_calls))
+
+
+async def main(iterations):
+    for model in (ViberRequest, Message, UserProfile):
+        count_str_calls(model)
+    logging.getLogger('aioviberbot.bench').addHandler(logging.StreamHandler(io.StringIO()))
+    logging.getLogger('aioviberbot.bench').propagate = False
+
+    await run(logging.INFO, iterations)
+    await run(logging.DEBUG, iterations)
+
+
+if __name__ == '__main__':
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
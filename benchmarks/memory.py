@@ -0,0 +1,34 @@
+"""
+Bytes held per parsed webhook event, as when events are buffered in memory for batching or retries.
+Shared objects (strings interned by the json decoder, payload dicts reused by the models) are counted as well.
+
+    python -m benchmarks.memory [events]
+"""
+import gc
+import json
+import sys
+import tracemalloc
+
+from aioviberbot.api.viber_requests import create_request
+from benchmarks.payloads import CALLBACKS, encode
+
+
+def bytes_per_event(body, events):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    requests = [create_request(json.loads(body)) for _ in range(events)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del requests
+    return (after - before) / events
+
+
+def main(events):
+    print('{0:<22}{1:>14}'.format('event', 'bytes/event'))
+    for event_type, callback in CALLBACKS.items():
+        print('{0:<22}{1:>14.0f}'.format(event_type, bytes_per_event(encode(callback), events)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
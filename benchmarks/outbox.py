@@ -0,0 +1,41 @@
+"""
+Outbox throughput: concurrent enqueues of one message each (committed in groups),
+then sending them all to the local api emulator.
+
+    python -m benchmarks.outbox [messages]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from aioviberbot import Api, BotConfiguration
+from aioviberbot.api.emulator import ViberApiEmulator
+from aioviberbot.api.messages import TextMessage
+from aioviberbot.api.outbox import Outbox, OutboxStatus
+
+BOT_CONFIGURATION = BotConfiguration('auth-token', 'benchbot', 'http://avatars.com/')
+
+
+async def main(messages):
+    with tempfile.TemporaryDirectory() as directory:
+        async with ViberApiEmulator() as emulator:
+            async with Api(BOT_CONFIGURATION, api_url=emulator.url) as viber:
+                outbox = Outbox(viber, os.path.join(directory, 'outbox.db'), workers=16, poll_interval=0.01)
+                async with outbox:
+                    started = time.perf_counter()
+                    await asyncio.gather(*(
+                        outbox.enqueue(str(receiver), [TextMessage(text='hi')]) for receiver in range(messages)
+                    ))
+                    enqueued = time.perf_counter()
+                    while (await outbox.get_counts())[OutboxStatus.DONE] < messages:
+                        await asyncio.sleep(0.01)
+                    sent = time.perf_counter()
+
+    print('enqueue  {0:>10.0f} messages/s'.format(messages / (enqueued - started)))
+    print('send     {0:>10.0f} messages/s'.format(messages / (sent - started)))
+
+
+if __name__ == '__main__':
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
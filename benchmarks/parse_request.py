@@ -0,0 +1,52 @@
+"""
+Webhook parsing throughput (events per second on one core) for every event type
+and every installed json backend.
+
+    python -m benchmarks.parse_request [iterations]
+"""
+import sys
+import time
+
+from aioviberbot import Api, BotConfiguration
+from aioviberbot.api.json_backend import JSON_BACKENDS, get_json_loads
+from aioviberbot.api.messages.message_type import MessageType
+from benchmarks.payloads import CALLBACKS, MESSAGE_CALLBACKS, encode
+
+BOT_CONFIGURATION = BotConfiguration('auth-token', 'benchbot', 'http://avatars.com/')
+
+
+def installed_backends():
+    for backend in JSON_BACKENDS:
+        try:
+            yield backend, get_json_loads(backend)
+        except ImportError:
+            pass
+
+
+def bench(viber, body, iterations):
+    parse_request = viber.parse_request
+    started = time.perf_counter()
+    for _ in range(iterations):
+        parse_request(body)
+    return iterations / (time.perf_counter() - started)
+
+
+def main(iterations):
+    payloads = [(event_type, encode(callback)) for event_type, callback in CALLBACKS.items()]
+    payloads += [
+        ('message/' + message_type, encode(MESSAGE_CALLBACKS[message_type]))
+        for message_type in (MessageType.PICTURE, MessageType.LOCATION, MessageType.RICH_MEDIA)
+    ]
+    backends = list(installed_backends())
+
+    print('{0:<22}'.format('events/s') + ''.join('{0:>12}'.format(name) for name, _ in backends))
+    for name, body in payloads:
+        row = '{0:<22}'.format(name)
+        for _, json_loads in backends:
+            viber = Api(BOT_CONFIGURATION, json_loads=json_loads)
+            row += '{0:>12.0f}'.format(bench(viber, body, iterations))
+        print(row)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
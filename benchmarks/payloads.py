@@ -0,0 +1,162 @@
+"""
+Realistic Viber callback payloads, one per event type of EVENT_TYPE_TO_CLASS,
+and a message callback per message type of MESSAGE_TYPE_TO_CLASS.
+"""
+import json
+
+from aioviberbot.api.event_type import EventType
+from aioviberbot.api.messages.message_type import MessageType
+
+TIMESTAMP = 1457764197627
+MESSAGE_TOKEN = 4912661846655238145
+USER_ID = '01234567890A='
+
+USER = {
+    'id': USER_ID,
+    'name': 'John McClane',
+    'avatar': 'https://media-direct.cdn.viber.com/download_photo?dlid=abc&fltp=jpg&imsz=0000',
+    'country': 'UA',
+    'language': 'uk',
+    'api_version': 10,
+}
+
+KEYBOARD = {
+    'Type': 'keyboard',
+    'DefaultHeight': True,
+    'Buttons': [
+        {
+            'Columns': 2,
+            'Rows': 1,
+            'BgColor': '#2db9b9',
+            'ActionType': 'reply',
+            'ActionBody': 'option-{0}'.format(i),
+            'Text': '<font color="#ffffff">Option {0}</font>'.format(i),
+            'TextSize': 'regular',
+        }
+        for i in range(6)
+    ],
+}
+
+RICH_MEDIA = {
+    'Type': 'rich_media',
+    'ButtonsGroupColumns': 6,
+    'ButtonsGroupRows': 7,
+    'BgColor': '#FFFFFF',
+    'Buttons': [
+        {
+            'Columns': 6,
+            'Rows': 3,
+            'ActionType': 'open-url',
+            'ActionBody': 'https://www.example.com/products/{0}'.format(i),
+            'Image': 'https://www.example.com/images/{0}.jpg'.format(i),
+        }
+        for i in range(20)
+    ],
+}
+
+MESSAGES = {
+    MessageType.TEXT: {'type': 'text', 'text': 'Hello! I would like to order a pizza, please.'},
+    MessageType.URL: {'type': 'url', 'media': 'https://www.example.com/products/1'},
+    MessageType.PICTURE: {
+        'type': 'picture',
+        'text': 'look at this',
+        'media': 'https://dl-media.viber.com/1/share/2/long/vibes/icon/image/0x0/95e0/image.jpg',
+        'thumbnail': 'https://dl-media.viber.com/1/share/2/long/vibes/icon/image/0x0/95e0/thumb.jpg',
+    },
+    MessageType.VIDEO: {
+        'type': 'video',
+        'media': 'https://dl-media.viber.com/1/share/2/long/vibes/video.mp4',
+        'thumbnail': 'https://dl-media.viber.com/1/share/2/long/vibes/thumb.jpg',
+        'size': 10000,
+        'duration': 10,
+    },
+    MessageType.FILE: {
+        'type': 'file',
+        'media': 'https://dl-media.viber.com/1/share/2/long/vibes/doc.pdf',
+        'size': 10000,
+        'file_name': 'order.pdf',
+    },
+    MessageType.STICKER: {'type': 'sticker', 'sticker_id': 46105},
+    MessageType.CONTACT: {
+        'type': 'contact',
+        'contact': {'name': 'Itamar', 'phone_number': '+972511123123', 'avatar': 'https://avatar.example.com'},
+    },
+    MessageType.LOCATION: {'type': 'location', 'location': {'lat': 50.76891, 'lon': 6.11499}},
+    MessageType.RICH_MEDIA: {'type': 'rich_media', 'rich_media': RICH_MEDIA, 'alt_text': 'products'},
+    MessageType.KEYBOARD: {'type': 'keyboard', 'keyboard': KEYBOARD},
+}
+
+
+def message_callback(message_type=MessageType.TEXT):
+    return {
+        'event': EventType.MESSAGE,
+        'timestamp': TIMESTAMP,
+        'chat_hostname': 'SN-CHAT-05_',
+        'message_token': MESSAGE_TOKEN,
+        'sender': USER,
+        'message': dict(MESSAGES[message_type], tracking_data='{"step": "order", "cart": [1, 2, 3]}'),
+        'silent': False,
+    }
+
+
+CALLBACKS = {
+    EventType.MESSAGE: message_callback(),
+    EventType.FAILED: {
+        'event': EventType.FAILED,
+        'timestamp': TIMESTAMP,
+        'chat_hostname': 'SN-CHAT-05_',
+        'message_token': MESSAGE_TOKEN,
+        'user_id': USER_ID,
+        'desc': 'failure description',
+    },
+    EventType.CONVERSATION_STARTED: {
+        'event': EventType.CONVERSATION_STARTED,
+        'timestamp': TIMESTAMP,
+        'chat_hostname': 'SN-CHAT-05_',
+        'message_token': MESSAGE_TOKEN,
+        'type': 'open',
+        'context': 'campaign-42',
+        'user': USER,
+        'subscribed': False,
+    },
+    EventType.DELIVERED: {
+        'event': EventType.DELIVERED,
+        'timestamp': TIMESTAMP,
+        'chat_hostname': 'SN-CHAT-05_',
+        'message_token': MESSAGE_TOKEN,
+        'user_id': USER_ID,
+    },
+    EventType.SEEN: {
+        'event': EventType.SEEN,
+        'timestamp': TIMESTAMP,
+        'chat_hostname': 'SN-CHAT-05_',
+        'message_token': MESSAGE_TOKEN,
+        'user_id': USER_ID,
+    },
+    EventType.SUBSCRIBED: {
+        'event': EventType.SUBSCRIBED,
+        'timestamp': TIMESTAMP,
+        'chat_hostname': 'SN-CHAT-05_',
+        'user': USER,
+        'message_token': MESSAGE_TOKEN,
+    },
+    EventType.UNSUBSCRIBED: {
+        'event': EventType.UNSUBSCRIBED,
+        'timestamp': TIMESTAMP,
+        'chat_hostname': 'SN-CHAT-05_',
+        'user_id': USER_ID,
+        'message_token': MESSAGE_TOKEN,
+    },
+    EventType.WEBHOOK: {
+        'event': EventType.WEBHOOK,
+        'timestamp': TIMESTAMP,
+        'chat_hostname': 'SN-CHAT-05_',
+        'message_token': MESSAGE_TOKEN,
+    },
+}
+
+MESSAGE_CALLBACKS = {message_type: message_callback(message_type) for message_type in MESSAGES}
+
+
+def encode(callback):
+    return json.dumps(callback).encode('utf-8')
@@ -0,0 +1,48 @@
+"""
+CPU cost of sending one rich media message to many users: send_messages with the message
+against a PreparedMessage. The request sender is stubbed, the json encoding aiohttp does is included.
+
+    python -m benchmarks.prepared_message [receivers]
+"""
+import asyncio
+import json
+import sys
+import time
+
+from aioviberbot import Api, BotConfiguration
+from aioviberbot.api.messages import RichMediaMessage
+from benchmarks.payloads import KEYBOARD, RICH_MEDIA
+
+RESULT = {'status': 0, 'message_token': 1}
+
+
+async def post_request(endpoint, payload):
+    json.dumps(payload)
+    return RESULT
+
+
+async def post_request_body(endpoint, body):
+    return RESULT
+
+
+async def bench(viber, message, receivers):
+    started = time.perf_counter()
+    for receiver in range(receivers):
+        await viber.send_messages(str(receiver), [message])
+    return receivers / (time.perf_counter() - started)
+
+
+async def main(receivers):
+    viber = Api(BotConfiguration('auth-token', 'benchbot', 'http://avatars.com/'))
+    viber._request_sender.post_request = post_request
+    viber._request_sender.post_request_body = post_request_body
+    message = RichMediaMessage(rich_media=RICH_MEDIA, keyboard=KEYBOARD, alt_text='products', min_api_version=7)
+
+    before = await bench(viber, message, receivers)
+    after = await bench(viber, viber.prepare_message(message), receivers)
+    print('message           {0:>10.0f} sends/s'.format(before))
+    print('prepared message  {0:>10.0f} sends/s  {1:.1f}x'.format(after, after / before))
+
+
+if __name__ == '__main__':
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
@@ -0,0 +1,46 @@
+"""
+Send payload building for every message type: the to_dict chain against the precompiled serializer.
+
+    python -m benchmarks.serialize [iterations]
+"""
+import logging
+import sys
+import time
+
+from aioviberbot.api.message_sender import MessageSender
+from aioviberbot.api.messages import MESSAGE_TYPE_TO_CLASS, get_message
+from benchmarks.payloads import KEYBOARD, MESSAGES
+
+
+def to_dict_payload(message, sender_name, sender_avatar, receiver):
+    payload = message.to_dict()
+    payload.update({
+        'from': None,
+        'receiver': receiver,
+        'sender': {'name': sender_name, 'avatar': sender_avatar},
+        'chat_id': None,
+        'broadcast_list': None,
+    })
+    return {k: v for k, v in payload.items() if v is not None}
+
+
+def bench(func, message, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func(message, 'benchbot', 'http://avatars.com/', receiver='01234567890A=')
+    return iterations / (time.perf_counter() - started)
+
+
+def main(iterations):
+    prepare_payload = MessageSender(logging.getLogger('aioviberbot.bench'), None)._prepare_payload
+
+    print('{0:<12}{1:>14}{2:>14}{3:>9}'.format('messages/s', 'to_dict', 'compiled', 'speedup'))
+    for message_type in MESSAGE_TYPE_TO_CLASS:
+        message = get_message(dict(MESSAGES[message_type], tracking_data='tracking', keyboard=KEYBOARD))
+        before = bench(to_dict_payload, message, iterations)
+        after = bench(prepare_payload, message, iterations)
+        print('{0:<12}{1:>14.0f}{2:>14.0f}{3:>8.2f}x'.format(message_type, before, after, after / before))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,71 @@
+"""
+Compares a session per request (the old behaviour) with the pooled session
+owned by ApiRequestSender, against a local stub of the Viber API.
+
+    python -m benchmarks.session_reuse [requests]
+"""
+import asyncio
+import logging
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+
+from aioviberbot.api.api_request_sender import ApiRequestSender
+from aioviberbot.api.bot_configuration import BotConfiguration
+from aioviberbot.api.consts import VIBER_BOT_USER_AGENT
+
+BOT_CONFIGURATION = BotConfiguration('auth-token', 'benchbot', 'http://avatars.com/')
+LOGGER = logging.getLogger('aioviberbot.bench')
+
+
+async def start_stub_server():
+    connections = set()
+
+    async def get_account_info(request):
+        connections.add(request.transport.get_extra_info('peername'))
+        return web.json_response({'status': 0, 'status_message': 'ok', 'id': 'pa:1'})
+
+    app = web.Application()
+    app.router.add_post('/pa/get_account_info', get_account_info)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, 'http://127.0.0.1:{0}/pa'.format(port), connections
+
+
+async def session_per_request(api_url, requests):
+    for _ in range(requests):
+        async with aiohttp.ClientSession() as session:
+            sender = ApiRequestSender(LOGGER, api_url, BOT_CONFIGURATION, VIBER_BOT_USER_AGENT, session)
+            await sender.get_account_info()
+
+
+async def pooled_session(api_url, requests):
+    sender = ApiRequestSender(LOGGER, api_url, BOT_CONFIGURATION, VIBER_BOT_USER_AGENT)
+    try:
+        for _ in range(requests):
+            await sender.get_account_info()
+    finally:
+        await sender.close()
+
+
+async def main(requests):
+    runner, api_url, connections = await start_stub_server()
+    try:
+        for name, bench in (('session per request', session_per_request), ('pooled session', pooled_session)):
+            connections.clear()
+            started = time.perf_counter()
+            await bench(api_url, requests)
+            elapsed = time.perf_counter() - started
+            print('{0:<20} {1:>8.1f} req/s  {2:>6.3f} ms/req  {3} connections'.format(
+                name, requests / elapsed, elapsed / requests * 1000, len(connections)))
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == '__main__':
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
@@ -0,0 +1,51 @@
+"""
+Webhook signature verifications per second: hmac.new for every callback and == against
+Api.verify_signature with the keyed HMAC copied, with one and with two tokens (rotation).
+
+    python -m benchmarks.signature [iterations]
+"""
+import hashlib
+import hmac
+import sys
+import time
+
+from aioviberbot import Api, BotConfiguration
+from aioviberbot.api.messages.message_type import MessageType
+from benchmarks.payloads import MESSAGE_CALLBACKS, encode
+
+BOT_CONFIGURATION = BotConfiguration('44dafb7e0f40021e-61a47a1e6778d187-f2c5a676a07050b3', 'benchbot', '')
+
+
+def verify_signature_before(request_data, signature):
+    key = bytes(BOT_CONFIGURATION.auth_token.encode('ascii'))
+    return signature == hmac.new(key, request_data, hashlib.sha256).hexdigest()
+
+
+def bench(verify_signature, body, signature, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        verify_signature(body, signature)
+    return iterations / (time.perf_counter() - started)
+
+
+def main(iterations):
+    viber = Api(BOT_CONFIGURATION)
+    rotating_viber = Api(BotConfiguration('new-auth-token', 'benchbot', ''),
+                         verification_tokens=[BOT_CONFIGURATION.auth_token])
+
+    print('{0:<12} {1:>7} {2:>12} {3:>12} {4:>8} {5:>14}'.format(
+        'callback', 'bytes', 'before/s', 'after/s', 'speedup', '2 tokens/s'))
+    for message_type in (MessageType.TEXT, MessageType.RICH_MEDIA):
+        body = encode(MESSAGE_CALLBACKS[message_type])
+        signature = hmac.new(BOT_CONFIGURATION.auth_token.encode('ascii'), body, hashlib.sha256).hexdigest()
+        assert viber.verify_signature(body, signature) and rotating_viber.verify_signature(body, signature)
+
+        before = bench(verify_signature_before, body, signature, iterations)
+        after = bench(viber.verify_signature, body, signature, iterations)
+        rotating = bench(rotating_viber.verify_signature, body, signature, iterations)
+        print('{0:<12} {1:>7} {2:>12.0f} {3:>12.0f} {4:>7.2f}x {5:>14.0f}'.format(
+            message_type, len(body), before, after, after / before, rotating))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,114 @@
+"""
+pytest-benchmark suite of the parse, serialize, sign and send pipelines, for every
+event and message type. Not collected by the unit tests, run it with
+
+    pytest benchmarks --benchmark-only
+
+and compare with a saved baseline with
+
+    pytest benchmarks --benchmark-only --benchmark-autosave
+    pytest benchmarks --benchmark-only --benchmark-compare --benchmark-compare-fail=mean:25%
+"""
+import asyncio
+import hashlib
+import hmac
+import logging
+
+import pytest
+
+from aioviberbot import Api, BotConfiguration
+from aioviberbot.api.emulator import ViberApiEmulator
+from aioviberbot.api.message_sender import MessageSender
+from aioviberbot.api.messages import MESSAGE_TYPE_TO_CLASS, TextMessage, get_message
+from aioviberbot.api.viber_requests import create_request
+from benchmarks.payloads import CALLBACKS, KEYBOARD, MESSAGE_CALLBACKS, MESSAGES, RICH_MEDIA, encode
+
+BOT_CONFIGURATION = BotConfiguration('44dafb7e0f40021e-61a47a1e6778d187-f2c5a676a07050b3', 'benchbot', '')
+SEND_BATCH = 100
+
+ALL_CALLBACKS = dict(CALLBACKS)
+ALL_CALLBACKS.update(('message/' + message_type, callback) for message_type, callback in MESSAGE_CALLBACKS.items())
+
+
+def message_of_type(message_type):
+    return get_message(dict(MESSAGES[message_type], tracking_data='tracking', keyboard=KEYBOARD))
+
+
+@pytest.mark.benchmark(group='create_request')
+@pytest.mark.parametrize('callback_name', ALL_CALLBACKS)
+def test_create_request(benchmark, callback_name):
+    benchmark(create_request, ALL_CALLBACKS[callback_name])
+
+
+@pytest.mark.benchmark(group='parse_request')
+@pytest.mark.parametrize('callback_name', ALL_CALLBACKS)
+def test_parse_request(benchmark, callback_name):
+    benchmark(Api(BOT_CONFIGURATION).parse_request, encode(ALL_CALLBACKS[callback_name]))
+
+
+@pytest.mark.benchmark(group='get_message')
+@pytest.mark.parametrize('message_type', MESSAGE_TYPE_TO_CLASS)
+def test_get_message(benchmark, message_type):
+    benchmark(get_message, MESSAGE_CALLBACKS[message_type]['message'])
+
+
+@pytest.mark.benchmark(group='to_dict')
+@pytest.mark.parametrize('message_type', MESSAGE_TYPE_TO_CLASS)
+def test_to_dict(benchmark, message_type):
+    benchmark(message_of_type(message_type).to_dict)
+
+
+@pytest.mark.benchmark(group='prepare_payload')
+@pytest.mark.parametrize('message_type', MESSAGE_TYPE_TO_CLASS)
+def test_prepare_payload(benchmark, message_type):
+    prepare_payload = MessageSender(logging.getLogger('aioviberbot.bench'), None)._prepare_payload
+    benchmark(prepare_payload, message_of_type(message_type), 'benchbot', '', receiver='01234567890A=')
+
+
+@pytest.mark.benchmark(group='verify_signature')
+@pytest.mark.parametrize('callback_name', ['message/text', 'message/rich_media'])
+def test_verify_signature(benchmark, callback_name):
+    body = encode(ALL_CALLBACKS[callback_name])
+    signature = hmac.new(BOT_CONFIGURATION.auth_token.encode('ascii'), body, hashlib.sha256).hexdigest()
+    assert benchmark(Api(BOT_CONFIGURATION).verify_signature, body, signature)
+
+
+@pytest.fixture(scope='module')
+def emulated_api():
+    loop = asyncio.new_event_loop()
+    emulator = ViberApiEmulator()
+    loop.run_until_complete(emulator.start())
+    viber = Api(BOT_CONFIGURATION, api_url=emulator.url)
+    yield loop, viber
+    loop.run_until_complete(viber.close())
+    loop.run_until_complete(emulator.close())
+    loop.close()
+
+
+@pytest.mark.benchmark(group='send {0} messages'.format(SEND_BATCH))
+@pytest.mark.parametrize('concurrency', [1, 10])
+@pytest.mark.parametrize('message', [
+    TextMessage(text='hi'),
+    get_message({'type': 'rich_media', 'rich_media': RICH_MEDIA, 'alt_text': 'products', 'keyboard': KEYBOARD}),
+], ids=['text', 'rich_media'])
+def test_send_messages(benchmark, emulated_api, message, concurrency):
+    loop, viber = emulated_api
+    messages = [message] * SEND_BATCH
+
+    def send():
+        return loop.run_until_complete(viber.send_messages('01234567890A=', messages, concurrency=concurrency))
+
+    benchmark.pedantic(send, rounds=10, warmup_rounds=1)
+
+
+@pytest.mark.benchmark(group='send {0} messages'.format(SEND_BATCH))
+def test_send_prepared_message(benchmark, emulated_api):
+    loop, viber = emulated_api
+    prepared_message = viber.prepare_message(
+        get_message({'type': 'rich_media', 'rich_media': RICH_MEDIA, 'alt_text': 'products', 'keyboard': KEYBOARD}))
+
+    def send():
+        return loop.run_until_complete(
+            viber.send_messages('01234567890A=', [prepared_message] * SEND_BATCH, concurrency=10))
+
+    benchmark.pedantic(send, rounds=10, warmup_rounds=1)
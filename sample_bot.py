@@ -2,51 +2,54 @@ from aiohttp import web
 
 from aioviberbot import Api
 from aioviberbot.api.bot_configuration import BotConfiguration
+from aioviberbot.api.dispatcher import Dispatcher
+from aioviberbot.api.event_type import EventType
 from aioviberbot.api.messages.text_message import TextMessage
-from aioviberbot.api.viber_requests import ViberConversationStartedRequest
-from aioviberbot.api.viber_requests import ViberMessageRequest
-from aioviberbot.api.viber_requests import ViberSubscribedRequest
+from aioviberbot.api.webhook_app import WebhookSettings, create_webhook_app
 
 viber = Api(BotConfiguration(
     name='PythonSampleBot',
     avatar='http://viber.com/avatar.jpg',
     auth_token='YOUR_AUTH_TOKEN_HERE'
 ))
+dispatcher = Dispatcher()
 
 
-async def webhook(request: web.Request) -> web.Response:
-    request_data = await request.read()
-    signature = request.headers.get('X-Viber-Content-Signature')
-    if not viber.verify_signature(request_data, signature):
-        raise web.HTTPForbidden
-
-    viber_request = viber.parse_request(request_data)
-    if isinstance(viber_request, ViberMessageRequest):
-        # echo message
-        await viber.send_messages(
-            viber_request.sender.id,
-            [viber_request.message],
-        )
-    elif isinstance(viber_request, ViberSubscribedRequest):
-        await viber.send_messages(
-            viber_request.user.id,
-            [TextMessage(text='Thanks for subscribing!')],
-        )
-    elif isinstance(viber_request, ViberConversationStartedRequest):
-        await viber.send_messages(
-            viber_request.user.id,
-            [TextMessage(text='Thanks for starting conversation!')],
-        )
-
-    return web.json_response({'ok': True})
+@dispatcher.message()
+async def echo(viber_request):
+    await viber.send_messages(
+        viber_request.sender.id,
+        [viber_request.message],
+    )
+
+
+@dispatcher.on(EventType.SUBSCRIBED)
+async def subscribed(viber_request):
+    await viber.send_messages(
+        viber_request.user.id,
+        [TextMessage(text='Thanks for subscribing!')],
+    )
+
+
+@dispatcher.on(EventType.CONVERSATION_STARTED)
+async def conversation_started(viber_request):
+    await viber.send_messages(
+        viber_request.user.id,
+        [TextMessage(text='Thanks for starting conversation!')],
+    )
 
 
 async def set_webhook_signal(app: web.Application):
     await viber.set_webhook('https://mybotwebserver.com/webhook')
 
 
+async def close_signal(app: web.Application):
+    await viber.close()
+
+
 if __name__ == '__main__':
-    app = web.Application()
+    # verifies, parses and acks the callbacks, the dispatcher runs in worker tasks
+    app = create_webhook_app(viber, dispatcher.dispatch, WebhookSettings(path='/webhook', workers=4))
     app.on_startup.append(set_webhook_signal)
-    app.router.add_route('POST', '/webhook', webhook),
+    app.on_cleanup.append(close_signal)
     web.run_app(app)
@@ -15,6 +15,9 @@ setuptools.setup(
     packages=['aioviberbot', 'aioviberbot.api', 'aioviberbot.api.viber_requests',
               'aioviberbot.api.messages', 'aioviberbot.api.messages.data_types'],
     install_requires=['aiohttp'],
+    entry_points={
+        'console_scripts': ['aioviberbot-webhook-server = aioviberbot.api.webhook_server:main'],
+    },
     tests_require=['pytest', 'pytest-aiohttp', 'asynctest'],
     url='https://github.com/antonmyronyuk/aioviberbot',
     author='Anton Myronyuk',
@@ -11,7 +11,7 @@ from aioviberbot.api.messages import PictureMessage
 from aioviberbot.api.messages import TextMessage
 from aioviberbot.api.messages import URLMessage
 from aioviberbot.api.messages import VideoMessage
-from aioviberbot.api.messages import get_message
+from aioviberbot.api.messages import MESSAGE_TYPE_TO_CLASS, get_message
 
 
 def test_contact_message():
@@ -222,3 +222,8 @@ def test_get_message_missing_type():
         get_message(json.loads(message_data))
 
     assert str(exc_info.value).startswith("message data doesn't contain a type")
+
+
+@pytest.mark.parametrize('message_class', list(MESSAGE_TYPE_TO_CLASS.values()))
+def test_message_has_no_instance_dict(message_class):
+    assert not hasattr(message_class(), '__dict__')
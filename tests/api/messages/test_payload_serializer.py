@@ -0,0 +1,94 @@
+import logging
+
+import pytest
+
+from aioviberbot.api.message_sender import MessageSender
+from aioviberbot.api.messages import (
+    MESSAGE_TYPE_TO_CLASS,
+    ContactMessage,
+    FileMessage,
+    KeyboardMessage,
+    LocationMessage,
+    PictureMessage,
+    RichMediaMessage,
+    StickerMessage,
+    TextMessage,
+    URLMessage,
+    VideoMessage,
+)
+from aioviberbot.api.messages.data_types.contact import Contact
+from aioviberbot.api.messages.data_types.location import Location
+from aioviberbot.api.messages.payload_serializer import get_payload_serializer
+
+SAMPLE_KEYBOARD = {'Type': 'keyboard', 'Buttons': [{'ActionType': 'reply', 'ActionBody': 'yes'}]}
+COMMON = dict(tracking_data='tracking data', keyboard=SAMPLE_KEYBOARD, min_api_version=7)
+
+MESSAGES = [
+    TextMessage(text='hi!', **COMMON),
+    URLMessage(media='http://site.com', **COMMON),
+    PictureMessage(text='look', media='http://site.com/img.jpg', thumbnail='http://site.com/t.jpg', **COMMON),
+    VideoMessage(media='http://site.com/v.mp4', thumbnail='http://site.com/t.jpg', size=100, text='v', duration=3,
+                 **COMMON),
+    FileMessage(media='http://site.com/f.pdf', size=100, file_name='f.pdf', **COMMON),
+    StickerMessage(sticker_id=46105, **COMMON),
+    ContactMessage(contact=Contact(name='Alex', phone_number='+972511123123'), **COMMON),
+    LocationMessage(location=Location(lat=50.7, lon=6.1), **COMMON),
+    RichMediaMessage(rich_media={'Type': 'rich_media', 'Buttons': []}, alt_text='alt', **COMMON),
+    KeyboardMessage(**COMMON),
+    # sparse messages, with fields which are dropped from the payload
+    TextMessage(tracking_data=''),
+    PictureMessage(),
+    VideoMessage(media='http://site.com/v.mp4', size=100),
+    ContactMessage(),
+    LocationMessage(),
+    RichMediaMessage(rich_media={}),
+    KeyboardMessage(keyboard=SAMPLE_KEYBOARD),
+]
+
+ENVELOPES = [
+    dict(receiver='012345A=', chat_id='chat'),
+    dict(broadcast_list=['012345A=', '012345B=']),
+    dict(sender='012345A='),
+]
+
+
+def to_dict_payload(message, sender_name, sender_avatar, sender=None, receiver=None, chat_id=None,
+                    broadcast_list=None):
+    payload = message.to_dict()
+    payload.update({
+        'from': sender,
+        'receiver': receiver,
+        'sender': {'name': sender_name, 'avatar': sender_avatar},
+        'chat_id': chat_id,
+        'broadcast_list': broadcast_list,
+    })
+    return {k: v for k, v in payload.items() if v is not None}
+
+
+def test_all_message_types_compiled():
+    for message_class in MESSAGE_TYPE_TO_CLASS.values():
+        assert get_payload_serializer(message_class) is not None
+
+
+@pytest.mark.parametrize('message', MESSAGES, ids=lambda message: type(message).__name__)
+@pytest.mark.parametrize('envelope', ENVELOPES)
+def test_same_payload_as_to_dict(message, envelope):
+    message_sender = MessageSender(logging.getLogger('super-logger'), None)
+
+    payload = message_sender._prepare_payload(message, 'testbot', 'http://avatar.com', **envelope)
+
+    assert payload == to_dict_payload(message, 'testbot', 'http://avatar.com', **envelope)
+
+
+def test_custom_subclass_uses_to_dict():
+    class CustomTextMessage(TextMessage):
+        def to_dict(self):
+            message_data = super(CustomTextMessage, self).to_dict()
+            message_data['text'] = message_data['text'].upper()
+            return message_data
+
+    message_sender = MessageSender(logging.getLogger('super-logger'), None)
+    payload = message_sender._prepare_payload(CustomTextMessage(text='hi!'), 'testbot', None, receiver='012345A=')
+
+    assert get_payload_serializer(CustomTextMessage) is None
+    assert payload == {'type': 'text', 'text': 'HI!', 'receiver': '012345A=', 'sender': {'name': 'testbot', 'avatar': None}}
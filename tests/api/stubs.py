@@ -2,11 +2,20 @@ import typing as t
 
 
 class ResponseStub:
-    def __init__(self, return_value: t.Any) -> None:
+    def __init__(self, return_value: t.Any, status: int = 200) -> None:
         self.return_value = return_value
+        self.status = status
 
     def raise_for_status(self) -> None:
         pass
 
     async def json(self) -> t.Any:
         return self.return_value
+
+
+class ClockStub:
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
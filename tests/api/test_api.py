@@ -1,9 +1,16 @@
+import asyncio
+import logging
 import os
 
 import pytest
 
 from aioviberbot import Api
 from aioviberbot import BotConfiguration
+from aioviberbot.api.errors import ViberRequestError, ViberValidationError
+from aioviberbot.api.json_backend import get_json_loads
+from aioviberbot.api.logging_adapter import StructuredLoggerAdapter
+from aioviberbot.api.messages import TextMessage
+from aioviberbot.api.user_profile import UserProfile
 from aioviberbot.api.viber_requests import ViberMessageRequest
 
 VIBER_BOT_CONFIGURATION = BotConfiguration("44dafb7e0f40021e-61a47a1e6778d187-f2c5a676a07050b3", "testbot", "http://avatars.com/")
@@ -25,6 +32,25 @@ def test_verify_signature_failure():
     assert not viber.verify_signature(message, invalid_signature)
 
 
+def test_verify_signature_missing_or_not_ascii():
+    message = "{\"event\":\"webhook\"}".encode("utf-8")
+
+    viber = Api(VIBER_BOT_CONFIGURATION)
+    assert not viber.verify_signature(message, None)
+    assert not viber.verify_signature(message, 'сигнатура')
+
+
+def test_verify_signature_with_verification_tokens():
+    valid_signature = 'd21b343448c8aee33b8e93768ef6ceb64a6ba6163099973a2b8bd028fea510ef'
+    message = "{\"event\":\"webhook\",\"timestamp\":4977069964384421269,\"message_token\":1478683725125}".encode("utf-8")
+
+    viber = Api(
+        BotConfiguration('new-auth-token', 'testbot', 'http://avatars.com/'),
+        verification_tokens=[VIBER_BOT_CONFIGURATION.auth_token],
+    )
+    assert viber.verify_signature(message, valid_signature)
+
+
 def test_parse_request_not_json():
     viber = Api(VIBER_BOT_CONFIGURATION)
 
@@ -39,3 +65,121 @@ def test_parse_request_unicode():
         req = f.read()
         viber_request = viber.parse_request(req)
         assert isinstance(viber_request, ViberMessageRequest)
+
+
+async def test_close_on_context_exit():
+    async with Api(VIBER_BOT_CONFIGURATION) as viber:
+        session = viber._request_sender._get_session()
+        assert not session.closed
+
+    assert session.closed
+
+
+async def test_send_messages_concurrently_keeps_order():
+    in_flight = 0
+    max_in_flight = 0
+
+    async def send_message(to, sender_name, sender_avatar, message, chat_id=None):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # later messages finish first
+        await asyncio.sleep(0.01 / (int(message.text) + 1))
+        in_flight -= 1
+        return 'token-' + message.text
+
+    viber = Api(VIBER_BOT_CONFIGURATION)
+    viber._message_sender.send_message = send_message
+
+    messages = [TextMessage(text=str(i)) for i in range(5)]
+    tokens = await viber.send_messages('012345A=', messages, concurrency=2)
+
+    assert tokens == ['token-{0}'.format(i) for i in range(5)]
+    assert max_in_flight == 2
+
+
+async def test_send_messages_sequential_by_default():
+    sent = []
+
+    async def send_message(to, sender_name, sender_avatar, message, chat_id=None):
+        assert not sent or sent[-1] == 'done'
+        sent.append(message.text)
+        await asyncio.sleep(0)
+        sent.append('done')
+        return message.text
+
+    viber = Api(VIBER_BOT_CONFIGURATION)
+    viber._message_sender.send_message = send_message
+
+    tokens = await viber.send_messages('012345A=', [TextMessage(text='a'), TextMessage(text='b')])
+    assert tokens == ['a', 'b']
+
+
+async def test_send_messages_concurrently_failure():
+    async def send_message(to, sender_name, sender_avatar, message, chat_id=None):
+        if message.text == 'bad':
+            raise ViberRequestError('failed with status: 1, message: failed')
+        await asyncio.sleep(1)
+
+    viber = Api(VIBER_BOT_CONFIGURATION)
+    viber._message_sender.send_message = send_message
+
+    with pytest.raises(ViberRequestError):
+        await viber.send_messages('012345A=', [TextMessage(text='ok'), TextMessage(text='bad')], concurrency=5)
+
+
+async def test_no_formatting_when_debug_disabled(monkeypatch):
+    def fail_str(self):
+        pytest.fail('__str__ is not supposed to be called when debug logging is disabled')
+
+    for model in (ViberMessageRequest, TextMessage, UserProfile):
+        monkeypatch.setattr(model, '__str__', fail_str)
+
+    async def post_request(endpoint, payload):
+        return dict(status=0, message_token='token')
+
+    logger = logging.getLogger('aioviberbot.test-info')
+    logger.setLevel(logging.INFO)
+    viber = Api(VIBER_BOT_CONFIGURATION, logger=logger)
+    viber._request_sender.post_request = post_request
+
+    with open(os.path.join(os.path.dirname(os.path.realpath(__file__)), 'test_data', 'unicode_request')) as f:
+        viber_request = viber.parse_request(f.read())
+
+    assert await viber.send_messages(viber_request.sender.id, [viber_request.message]) == ['token']
+
+
+def test_structured_logger_adapter(caplog):
+    logger = StructuredLoggerAdapter(logging.getLogger('aioviberbot.test-structured'), bot='testbot')
+    logger = logger.bind(tenant='shop')
+
+    with caplog.at_level(logging.INFO, logger='aioviberbot.test-structured'):
+        logger.info('sent %s', 'message', extra={'endpoint': 'send_message'})
+
+    record = caplog.records[0]
+    assert record.getMessage() == 'sent message'
+    assert record.bot == 'testbot'
+    assert record.tenant == 'shop'
+    assert record.endpoint == 'send_message'
+
+
+@pytest.mark.parametrize('backend', ['auto', 'json', 'orjson'])
+def test_parse_request_json_backend(backend):
+    if backend == 'orjson':
+        pytest.importorskip('orjson')
+    viber = Api(VIBER_BOT_CONFIGURATION, json_loads=get_json_loads(backend))
+
+    with open(os.path.join(os.path.dirname(os.path.realpath(__file__)), 'test_data', 'unicode_request'), 'rb') as f:
+        viber_request = viber.parse_request(f.read())
+
+    assert isinstance(viber_request, ViberMessageRequest)
+    assert viber_request.message_token == 4912661846655238145
+    assert viber_request.message.tracking_data == 'אל תעקוב אחרי!'
+
+    with pytest.raises(ValueError):
+        viber.parse_request(b'bad json')
+
+
+def test_unknown_json_backend():
+    with pytest.raises(ViberValidationError):
+        get_json_loads('simplejson')
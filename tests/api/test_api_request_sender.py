@@ -106,9 +106,39 @@ async def test_post_request_success(monkeypatch):
     with patch('aiohttp.ClientSession.close') as close_session_mock:
         response = await request_sender.get_account_info()
         assert response['id'] == account_id
+        close_session_mock.assert_not_called()
+
+        await request_sender.close()
         close_session_mock.assert_called_once()
 
 
+async def test_post_request_reuses_own_session(monkeypatch):
+    sessions = []
+
+    async def callback(session, url, json, headers, *args, **kwargs):
+        sessions.append(session)
+        return ResponseStub({
+            'status': 0,
+            'status_message': 'ok',
+        })
+
+    monkeypatch.setattr('aiohttp.ClientSession.post', callback)
+    request_sender = ApiRequestSender(logger, VIBER_BOT_API_URL, VIBER_BOT_CONFIGURATION, VIBER_BOT_USER_AGENT)
+
+    await request_sender.get_account_info()
+    await request_sender.get_account_info()
+    assert len(sessions) == 2
+    assert sessions[0] is sessions[1]
+
+    await request_sender.close()
+    assert sessions[0].closed
+
+    # a new session is opened after close
+    await request_sender.get_account_info()
+    assert sessions[2] is not sessions[0]
+    await request_sender.close()
+
+
 async def test_post_request_json_exception(monkeypatch):
     async def json_decode_error_mock():
         return json.loads('not a json')
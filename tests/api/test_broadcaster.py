@@ -0,0 +1,118 @@
+import asyncio
+import logging
+from unittest.mock import Mock
+
+import pytest
+
+from aioviberbot.api.bot_configuration import BotConfiguration
+from aioviberbot.api.broadcaster import Broadcaster
+from aioviberbot.api.consts import BOT_API_ENDPOINT
+from aioviberbot.api.errors import ViberRequestError, ViberValidationError
+from aioviberbot.api.message_sender import MessageSender
+from aioviberbot.api.messages import TextMessage
+
+logger = logging.getLogger('super-logger')
+VIBER_BOT_CONFIGURATION = BotConfiguration(
+    auth_token='auth-token-sample',
+    name='testbot',
+    avatar='https://avatars.com/avatar.jpg',
+)
+
+
+def create_broadcaster(post_request):
+    request_sender = Mock()
+    request_sender.post_request = post_request
+    message_sender = MessageSender(logger, request_sender)
+    return Broadcaster(logger, message_sender, VIBER_BOT_CONFIGURATION)
+
+
+async def test_broadcast_chunks_receivers():
+    chunks = []
+
+    async def post_request(endpoint, payload):
+        assert endpoint == BOT_API_ENDPOINT.BROADCAST_MESSAGE
+        chunks.append(payload['broadcast_list'])
+        return dict(
+            status=0,
+            message_token='token-{0}'.format(len(chunks)),
+            failed_list=[{'receiver': payload['broadcast_list'][0], 'status': 6, 'status_message': 'Not subscribed'}],
+        )
+
+    broadcaster = create_broadcaster(post_request)
+    receivers = ('user-{0}'.format(i) for i in range(700))
+    result = await broadcaster.broadcast(receivers, [TextMessage(text='hi!')], parallelism=2)
+
+    assert [len(chunk) for chunk in sorted(chunks, key=len, reverse=True)] == [300, 300, 100]
+    assert sorted(receiver for chunk in chunks for receiver in chunk) == sorted(
+        'user-{0}'.format(i) for i in range(700))
+    assert result.receivers_count == 700
+    assert result.chunks_count == 3
+    assert sorted(result.message_tokens) == ['token-1', 'token-2', 'token-3']
+    assert len(result.failed_list) == 3
+
+
+async def test_broadcast_async_iterable():
+    async def receivers():
+        for i in range(301):
+            yield 'user-{0}'.format(i)
+
+    async def post_request(endpoint, payload):
+        return dict(status=0, message_token=len(payload['broadcast_list']))
+
+    broadcaster = create_broadcaster(post_request)
+    result = await broadcaster.broadcast(receivers(), [TextMessage(text='a'), TextMessage(text='b')])
+
+    assert sorted(result.message_tokens) == [1, 1, 300, 300]
+    assert result.failed_list == []
+
+
+async def test_broadcast_limits_parallelism():
+    in_flight = 0
+    max_in_flight = 0
+
+    async def post_request(endpoint, payload):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return dict(status=0, message_token='token')
+
+    broadcaster = create_broadcaster(post_request)
+    await broadcaster.broadcast(range(3000), TextMessage(text='hi!'), parallelism=3)
+
+    assert max_in_flight == 3
+
+
+async def test_broadcast_failed_chunk():
+    async def post_request(endpoint, payload):
+        if payload['broadcast_list'][0] == 0:
+            raise ViberRequestError('failed with status: 1, message: failed')
+        return dict(status=0, message_token='token')
+
+    broadcaster = create_broadcaster(post_request)
+    result = await broadcaster.broadcast(range(600), TextMessage(text='hi!'))
+
+    assert result.message_tokens == ['token']
+    assert len(result.failed_list) == 300
+    assert result.failed_list[0] == {
+        'receiver': 0, 'status': None, 'status_message': 'failed with status: 1, message: failed',
+    }
+
+
+async def test_broadcast_unexpected_error():
+    async def post_request(endpoint, payload):
+        raise RuntimeError('boom')
+
+    broadcaster = create_broadcaster(post_request)
+    with pytest.raises(RuntimeError):
+        await broadcaster.broadcast(range(10000), TextMessage(text='hi!'), parallelism=2)
+
+
+async def test_broadcast_invalid_message():
+    async def post_request(endpoint, payload):
+        pytest.fail('broadcaster not supposed to call post_request')
+
+    broadcaster = create_broadcaster(post_request)
+    with pytest.raises(ViberValidationError):
+        await broadcaster.broadcast(range(10), TextMessage(text=None))
@@ -0,0 +1,64 @@
+from aioviberbot.api.deduplicator import Deduplicator, MemoryDeduplicationStore, get_request_key
+from aioviberbot.api.viber_requests import create_request
+from .stubs import ClockStub
+
+
+def delivered_request(message_token, user_id):
+    return create_request({
+        'event': 'delivered',
+        'timestamp': 1457764197627,
+        'message_token': message_token,
+        'user_id': user_id,
+    })
+
+
+async def test_memory_store_window():
+    clock = ClockStub()
+    store = MemoryDeduplicationStore(window=10, clock=clock)
+
+    assert await store.add('a')
+    assert not await store.add('a')
+
+    # still remembered in the previous generation
+    clock.now = 15
+    assert not await store.add('a')
+
+    clock.now = 35
+    assert await store.add('a')
+
+
+async def test_memory_store_is_bounded():
+    store = MemoryDeduplicationStore(window=10, max_size=2, clock=ClockStub())
+    for key in range(10):
+        assert await store.add(key)
+        assert len(store) <= 4
+
+
+async def test_memory_store_discard():
+    store = MemoryDeduplicationStore()
+    await store.add('a')
+    await store.discard('a')
+    assert await store.add('a')
+
+
+def test_request_key_includes_user():
+    # callbacks of a broadcast share the message token
+    assert get_request_key(delivered_request(1, 'a')) != get_request_key(delivered_request(1, 'b'))
+    assert get_request_key(delivered_request(1, 'a')) == 'delivered:1:a'
+    assert get_request_key(delivered_request(1, 'a'), 'bot') == 'bot:delivered:1:a'
+
+
+async def test_wrap_skips_duplicates():
+    handled = []
+
+    async def handler(viber_request):
+        handled.append(viber_request.user_id)
+
+    deduplicator = Deduplicator()
+    handler = deduplicator.wrap(handler)
+    await handler(delivered_request(1, 'a'))
+    await handler(delivered_request(1, 'a'))
+    await handler(delivered_request(1, 'b'))
+
+    assert handled == ['a', 'b']
+    assert deduplicator.duplicates_count == 1
@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+
+from aioviberbot.api.delivery_tracker import DeliveryState, DeliveryTracker
+from aioviberbot.api.viber_requests import create_request
+from .stubs import ClockStub
+
+
+class BackendStub:
+    def __init__(self):
+        self.saved = []
+        self.deliveries = {}
+
+    async def save(self, deliveries):
+        self.saved.append(deliveries)
+        for delivery in deliveries:
+            self.deliveries[delivery['message_token'], delivery['user_id']] = dict(delivery)
+
+    async def get(self, message_token, user_id):
+        await asyncio.sleep(0)
+        return self.deliveries.get((message_token, user_id))
+
+
+def callback(event_type, message_token, user_id, timestamp=1457764197627):
+    return create_request({
+        'event': event_type,
+        'timestamp': timestamp,
+        'message_token': message_token,
+        'user_id': user_id,
+    })
+
+
+def test_callbacks_update_state_and_counters():
+    tracker = DeliveryTracker()
+    tracker.track(1, 'a', campaign='sale')
+    tracker.track_broadcast(2, ['a', 'b', 'c'], campaign='sale')
+
+    # seen may come before delivered
+    assert tracker.update(callback('seen', 1, 'a'))
+    assert tracker.update(callback('delivered', 1, 'a'))
+    assert tracker.update(callback('delivered', 2, 'b'))
+    assert tracker.update(callback('failed', 2, 'c'))
+    assert not tracker.update(callback('delivered', 3, 'a'))
+
+    assert tracker.get(1, 'a')['state'] == DeliveryState.SEEN
+    assert tracker.get(1, 'a')['delivered_at'] == 1457764197.627
+    assert tracker.get(2, 'a')['state'] == DeliveryState.SENT
+    assert tracker.get(2, 'b')['state'] == DeliveryState.DELIVERED
+    assert tracker.get(2, 'c')['state'] == DeliveryState.FAILED
+    assert tracker.get_campaign_counters('sale') == {'sent': 4, 'delivered': 2, 'seen': 1, 'failed': 1}
+    assert tracker.untracked_count == 1
+
+
+def test_ttl_and_size_eviction():
+    clock = ClockStub(1000.0)
+    tracker = DeliveryTracker(ttl=10, max_size=2, clock=clock)
+    tracker.track(1, 'a', campaign='sale')
+    tracker.track(2, 'a')
+    tracker.track(3, 'a')
+    assert tracker.get(1, 'a') is None
+    assert len(tracker) == 2
+
+    clock.now += 10
+    tracker.track(4, 'a')
+    assert len(tracker) == 1
+    # counters outlive the deliveries
+    assert tracker.get_campaign_counters('sale')['sent'] == 1
+
+
+async def test_wait_for():
+    tracker = DeliveryTracker()
+    tracker.track(1, 'a')
+    tracker.track(2, 'a')
+
+    seen = asyncio.ensure_future(tracker.wait_for(1, 'a', DeliveryState.SEEN))
+    delivered = asyncio.ensure_future(tracker.wait_for(1, 'a'))
+    failed = asyncio.ensure_future(tracker.wait_for(2, 'a', DeliveryState.SEEN))
+    await asyncio.sleep(0)
+
+    tracker.update(callback('delivered', 1, 'a'))
+    tracker.update(callback('failed', 2, 'a'))
+    assert await delivered == DeliveryState.DELIVERED
+    assert await failed == DeliveryState.FAILED
+    assert not seen.done()
+
+    tracker.update(callback('seen', 1, 'a'))
+    assert await seen == DeliveryState.SEEN
+    assert await tracker.wait_for(1, 'a') == DeliveryState.SEEN
+
+    with pytest.raises(asyncio.TimeoutError):
+        tracker.track(3, 'a')
+        await tracker.wait_for(3, 'a', timeout=0.01)
+    with pytest.raises(KeyError):
+        await tracker.wait_for(4, 'a')
+
+
+async def test_flush_saves_changed_deliveries_in_one_call():
+    backend = BackendStub()
+    tracker = DeliveryTracker(backend=backend)
+    tracker.track(1, 'a')
+    tracker.track(2, 'a')
+    assert await tracker.flush() == 2
+
+    tracker.update(callback('delivered', 1, 'a'))
+    tracker.update(callback('seen', 1, 'a'))
+    assert await tracker.flush() == 1
+    assert await tracker.flush() == 0
+
+    assert len(backend.saved) == 2
+    assert backend.saved[1][0]['state'] == DeliveryState.SEEN
+
+
+async def test_flush_saves_evicted_deliveries():
+    backend = BackendStub()
+    tracker = DeliveryTracker(max_size=2, backend=backend)
+    tracker.track(1, 'a')
+    tracker.update(callback('delivered', 1, 'a'))
+    tracker.track(2, 'a')
+    tracker.track(3, 'a')
+
+    assert await tracker.flush() == 3
+    assert backend.deliveries[1, 'a']['state'] == DeliveryState.DELIVERED
+    assert backend.deliveries[3, 'a']['state'] == DeliveryState.SENT
+
+
+async def test_callbacks_fall_back_to_backend():
+    backend = BackendStub()
+    tracker = DeliveryTracker(backend=backend)
+    tracker.track(1, 'a', campaign='sale')
+    tracker.track(2, 'a')
+    await tracker.flush()
+
+    # e.g. after a restart
+    tracker = DeliveryTracker(backend=backend)
+    assert not tracker.update(callback('seen', 1, 'a'))
+    assert await tracker.flush() == 1
+    assert backend.deliveries[1, 'a']['state'] == DeliveryState.SEEN
+    assert tracker.get(1, 'a')['campaign'] == 'sale'
+
+    assert (await tracker.load(2, 'a'))['state'] == DeliveryState.SENT
+    assert await tracker.load(3, 'a') is None
+    waiting = asyncio.ensure_future(tracker.wait_for(2, 'a'))
+    await asyncio.sleep(0.01)
+    tracker.update(callback('delivered', 2, 'a'))
+    assert await asyncio.wait_for(waiting, 1) == DeliveryState.DELIVERED
+
+    tracker.update(callback('delivered', 4, 'a'))
+    await tracker.flush()
+    assert tracker.untracked_count == 1
+
+
+async def test_wrap():
+    tracker = DeliveryTracker()
+    tracker.track(1, 'a')
+    handled = []
+
+    async def handler(viber_request):
+        handled.append(viber_request.event_type)
+
+    await tracker.wrap(handler)(callback('delivered', 1, 'a'))
+    assert handled == ['delivered']
+    assert tracker.get(1, 'a')['state'] == DeliveryState.DELIVERED
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import re
+
+import pytest
+
+from aioviberbot.api.dispatcher import Dispatcher
+from aioviberbot.api.errors import ViberValidationError
+from aioviberbot.api.event_type import EventType
+from aioviberbot.api.messages.message_type import MessageType
+from aioviberbot.api.viber_requests import create_request
+
+logger = logging.getLogger('super-logger')
+
+
+def message_request(message):
+    return create_request({
+        'event': 'message',
+        'timestamp': 1457764197627,
+        'message_token': 4912661846655238145,
+        'sender': {'id': '01234567890A=', 'name': 'viberUser'},
+        'message': message,
+    })
+
+
+def subscribed_request():
+    return create_request({
+        'event': 'subscribed',
+        'timestamp': 1457764197627,
+        'message_token': 4912661846655238145,
+        'user': {'id': '01234567890A=', 'name': 'viberUser'},
+    })
+
+
+async def test_routes_by_event_and_message_type():
+    dispatcher = Dispatcher(logger)
+
+    @dispatcher.message(MessageType.TEXT)
+    async def text(viber_request):
+        return 'text'
+
+    @dispatcher.message()
+    async def any_message(viber_request):
+        return 'any'
+
+    @dispatcher.on(EventType.SUBSCRIBED)
+    async def subscribed(viber_request):
+        return 'subscribed'
+
+    assert await dispatcher.dispatch(message_request({'type': 'text', 'text': 'hi'})) == 'text'
+    assert await dispatcher.dispatch(message_request({'type': 'sticker', 'sticker_id': 40100})) == 'any'
+    assert await dispatcher.dispatch(subscribed_request()) == 'subscribed'
+
+
+async def test_text_and_tracking_data_filters():
+    dispatcher = Dispatcher(logger)
+
+    @dispatcher.message(MessageType.TEXT, text='hi')
+    async def exact(viber_request):
+        return 'exact'
+
+    @dispatcher.message(MessageType.TEXT, text=re.compile(r'order \d+'))
+    async def pattern(viber_request):
+        return 'pattern'
+
+    @dispatcher.message(tracking_data=lambda tracking_data: tracking_data == 'menu')
+    async def menu(viber_request):
+        return 'menu'
+
+    assert await dispatcher.dispatch(message_request({'type': 'text', 'text': 'hi'})) == 'exact'
+    assert await dispatcher.dispatch(message_request({'type': 'text', 'text': 'order 12'})) == 'pattern'
+    assert await dispatcher.dispatch(message_request({'type': 'text', 'text': 'order 12 now'})) is None
+    assert await dispatcher.dispatch(
+        message_request({'type': 'sticker', 'sticker_id': 40100, 'tracking_data': 'menu'})) == 'menu'
+
+
+async def test_unhandled_request():
+    dispatcher = Dispatcher(logger)
+    assert dispatcher.resolve(subscribed_request()) is None
+    assert await dispatcher.dispatch(subscribed_request()) is None
+
+
+def test_add_handler_validation():
+    dispatcher = Dispatcher(logger)
+
+    async def handler(viber_request):
+        pass
+
+    with pytest.raises(ViberValidationError):
+        dispatcher.add_handler(handler, 'unknown')
+    with pytest.raises(ViberValidationError):
+        dispatcher.add_handler(handler, EventType.MESSAGE, message_type='unknown')
+    with pytest.raises(ViberValidationError):
+        dispatcher.add_handler(handler, EventType.SUBSCRIBED, text='hi')
+
+
+async def test_dispatch_in_background(caplog):
+    dispatcher = Dispatcher(logger)
+    release = asyncio.Event()
+    handled = []
+
+    @dispatcher.message()
+    async def slow(viber_request):
+        await release.wait()
+        handled.append(viber_request.message.text)
+
+    @dispatcher.on(EventType.SUBSCRIBED)
+    async def failing(viber_request):
+        raise RuntimeError('boom')
+
+    dispatcher.dispatch_in_background(message_request({'type': 'text', 'text': 'hi'}))
+    dispatcher.dispatch_in_background(subscribed_request())
+    assert dispatcher.pending_count == 2
+
+    release.set()
+    with caplog.at_level(logging.ERROR, logger='super-logger'):
+        await dispatcher.join()
+
+    assert handled == ['hi']
+    assert dispatcher.pending_count == 0
+    assert 'handler failed' in caplog.text
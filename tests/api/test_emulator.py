@@ -0,0 +1,111 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from aioviberbot import Api
+from aioviberbot import BotConfiguration
+from aioviberbot.api.dispatcher import Dispatcher
+from aioviberbot.api.emulator import Fault, ViberApiEmulator, message_callback
+from aioviberbot.api.errors import ViberClientError, ViberRequestError, ViberTimeoutError
+from aioviberbot.api.messages import TextMessage
+from aioviberbot.api.webhook_app import create_webhook_app
+
+VIBER_BOT_CONFIGURATION = BotConfiguration('auth-token-sample', 'testbot', 'http://avatars.com/')
+USER_ID = '01234567890A='
+
+
+@pytest.fixture
+async def emulator():
+    async with ViberApiEmulator(auth_tokens=[VIBER_BOT_CONFIGURATION.auth_token]) as emulator:
+        yield emulator
+
+
+@pytest.fixture
+async def viber(emulator):
+    async with Api(VIBER_BOT_CONFIGURATION, api_url=emulator.url) as viber:
+        yield viber
+
+
+async def test_endpoints(emulator, viber):
+    assert await viber.set_webhook('http://localhost/webhook')
+    assert (await viber.get_account_info())['webhook'] == 'http://localhost/webhook'
+
+    tokens = await viber.send_messages(USER_ID, [TextMessage(text='hi'), TextMessage(text='there')])
+    assert len(set(tokens)) == 2
+    assert await viber.broadcast_messages([USER_ID], [TextMessage(text='hi')])
+    assert await viber.post_messages_to_public_account(USER_ID, [TextMessage(text='hi')])
+
+    assert (await viber.get_online([USER_ID]))[0]['id'] == USER_ID
+    assert (await viber.get_user_details(USER_ID))['id'] == USER_ID
+
+    assert emulator.requests_count['send_message'] == 2
+    endpoint, payload = emulator.last_requests[-1]
+    assert endpoint == 'get_user_details'
+    assert payload == {'id': USER_ID, 'auth_token': VIBER_BOT_CONFIGURATION.auth_token}
+
+
+async def test_invalid_auth_token(emulator):
+    async with Api(BotConfiguration('wrong', 'testbot', ''), api_url=emulator.url) as viber:
+        with pytest.raises(ViberRequestError) as exc_info:
+            await viber.get_account_info()
+    assert str(exc_info.value) == 'failed with status: 2, message: invalidAuthToken'
+
+
+async def test_faults(emulator, viber):
+    emulator.faults.append(Fault(Fault.STATUS, endpoints=['get_user_details']))
+    with pytest.raises(ViberRequestError):
+        await viber.get_user_details(USER_ID)
+
+    emulator.faults[:] = [Fault(Fault.HTTP_ERROR, status=503)]
+    with pytest.raises(ViberClientError):
+        await viber.get_account_info()
+
+    emulator.faults[:] = [Fault(Fault.RATE_LIMIT)]
+    with pytest.raises(ViberClientError):
+        await viber.get_account_info()
+
+
+async def test_timeout_fault(emulator):
+    emulator.faults.append(Fault(Fault.TIMEOUT, delay=0.2))
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(0.05)) as session:
+        viber = Api(VIBER_BOT_CONFIGURATION, client_session=session, api_url=emulator.url)
+        with pytest.raises(ViberTimeoutError):
+            await viber.get_account_info()
+
+
+async def test_signed_callbacks(aiohttp_server, emulator, viber):
+    received = []
+    dispatcher = Dispatcher()
+
+    @dispatcher.message()
+    async def handle(viber_request):
+        received.append(viber_request.message.text)
+
+    server = await aiohttp_server(create_webhook_app(viber, dispatcher.dispatch))
+    await viber.set_webhook(str(server.make_url('/webhook')))
+
+    status = await emulator.send_callback(message_callback(USER_ID, {'type': 'text', 'text': 'hi'}))
+    assert status == 200
+    await asyncio.sleep(0.01)
+    assert received == ['hi']
+
+
+async def test_delivery_callbacks(aiohttp_server):
+    delivered = []
+
+    async def handle(request):
+        delivered.append((await request.json())['user_id'])
+        return aiohttp.web.json_response({'ok': True})
+
+    app = aiohttp.web.Application()
+    app.router.add_route('POST', '/webhook', handle)
+    server = await aiohttp_server(app)
+
+    async with ViberApiEmulator(delivery_callbacks=True) as emulator:
+        async with Api(VIBER_BOT_CONFIGURATION, api_url=emulator.url) as viber:
+            await viber.set_webhook(str(server.make_url('/webhook')))
+            await viber.broadcast_messages(['a', 'b'], [TextMessage(text='hi')])
+            await asyncio.sleep(0.05)
+
+    assert sorted(delivered) == ['a', 'b']
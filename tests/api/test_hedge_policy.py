@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from aioviberbot import Api
+from aioviberbot import BotConfiguration
+from aioviberbot.api.consts import BOT_API_ENDPOINT
+from aioviberbot.api.emulator import ViberApiEmulator
+from aioviberbot.api.errors import ViberClientError, ViberValidationError
+from aioviberbot.api.hedge_policy import HedgePolicy
+from aioviberbot.api.messages import TextMessage
+
+VIBER_BOT_CONFIGURATION = BotConfiguration('auth-token-sample', 'testbot', 'http://avatars.com/')
+
+
+def create_request(delays, calls):
+    """
+    :param delays: seconds every next attempt takes, an exception instance fails the attempt
+    """
+    delays = iter(delays)
+
+    async def request():
+        calls.append(None)
+        delay = next(delays)
+        if isinstance(delay, Exception):
+            raise delay
+        await asyncio.sleep(delay)
+        return len(calls)
+    return request
+
+
+def test_send_endpoints_cannot_be_hedged():
+    with pytest.raises(ViberValidationError):
+        HedgePolicy(endpoints=[BOT_API_ENDPOINT.GET_ONLINE, BOT_API_ENDPOINT.SEND_MESSAGE])
+
+
+async def test_fast_request_is_not_hedged():
+    calls = []
+    hedge_policy = HedgePolicy(max_delay=0.05)
+    assert await hedge_policy.call(BOT_API_ENDPOINT.GET_ONLINE, create_request([0], calls)) == 1
+    assert len(calls) == 1
+    assert hedge_policy.hedges_count == 0
+
+
+async def test_slow_request_is_hedged():
+    calls = []
+    hedge_policy = HedgePolicy(max_delay=0.01)
+    result = await hedge_policy.call(BOT_API_ENDPOINT.GET_USER_DETAILS, create_request([1, 0], calls))
+    assert result == 2
+    assert hedge_policy.hedges_count == 1
+
+
+async def test_failed_attempt_waits_for_the_other():
+    calls = []
+    hedge_policy = HedgePolicy(max_delay=0.01)
+    request = create_request([0.02, ViberClientError('connection reset')], calls)
+    assert await hedge_policy.call(BOT_API_ENDPOINT.GET_ONLINE, request) == 2
+
+    calls = []
+    request = create_request([ViberClientError('first'), 0], calls)
+    with pytest.raises(ViberClientError):
+        await hedge_policy.call(BOT_API_ENDPOINT.GET_ONLINE, request)
+    assert len(calls) == 1
+
+
+async def test_send_endpoint_is_not_hedged():
+    calls = []
+    hedge_policy = HedgePolicy(max_delay=0.01)
+    assert await hedge_policy.call(BOT_API_ENDPOINT.SEND_MESSAGE, create_request([0.03], calls)) == 1
+    assert hedge_policy.hedges_count == 0
+
+
+def test_delay_follows_percentile():
+    hedge_policy = HedgePolicy(percentile=90, min_delay=0.01, max_delay=1, min_samples=10)
+    assert hedge_policy.get_delay(BOT_API_ENDPOINT.GET_ONLINE) == 1
+
+    latencies = hedge_policy._latencies[BOT_API_ENDPOINT.GET_ONLINE]
+    latencies.extend(i / 100 for i in range(1, 11))
+    assert hedge_policy.get_delay(BOT_API_ENDPOINT.GET_ONLINE) == 0.09
+
+    latencies.extend([0.001] * 100)
+    assert hedge_policy.get_delay(BOT_API_ENDPOINT.GET_ONLINE) == 0.01
+
+
+async def test_api_hedges_read_only_requests():
+    latencies = iter([0.3, 0, 0.3])
+    hedge_policy = HedgePolicy(max_delay=0.02)
+    async with ViberApiEmulator(latency=lambda: next(latencies, 0)) as emulator:
+        async with Api(VIBER_BOT_CONFIGURATION, api_url=emulator.url, hedge_policy=hedge_policy) as viber:
+            user = await viber.get_user_details('01234567890A=')
+            assert user['id'] == '01234567890A='
+            assert hedge_policy.hedges_count == 1
+
+            # sending is never hedged
+            await viber.send_messages('01234567890A=', [TextMessage(text='hi')])
+            assert hedge_policy.hedges_count == 1
+            assert emulator.requests_count[BOT_API_ENDPOINT.GET_USER_DETAILS] == 2
+            assert emulator.requests_count[BOT_API_ENDPOINT.SEND_MESSAGE] == 1
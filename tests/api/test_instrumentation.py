@@ -0,0 +1,150 @@
+import hashlib
+import hmac
+
+import pytest
+
+from aioviberbot import Api
+from aioviberbot import BotConfiguration
+from aioviberbot.api.emulator import Fault, ViberApiEmulator
+from aioviberbot.api.errors import ViberRequestError
+from aioviberbot.api.hedge_policy import HedgePolicy
+from aioviberbot.api.instrumentation import Instrumentation
+
+VIBER_BOT_CONFIGURATION = BotConfiguration('auth-token-sample', 'testbot', 'http://avatars.com/')
+CALLBACK = b'{"event": "webhook", "timestamp": 1457764197627, "message_token": 1}'
+SIGNATURE = hmac.new(b'auth-token-sample', CALLBACK, hashlib.sha256).hexdigest()
+
+
+class RecordingInstrumentation(Instrumentation):
+    def __init__(self):
+        self.calls = []
+
+    def request_started(self, endpoint, payload_size):
+        self.calls.append(('started', endpoint, payload_size))
+        return endpoint
+
+    def request_finished(self, context, endpoint, duration, http_status, viber_status, error):
+        assert context == endpoint
+        assert duration >= 0
+        self.calls.append(('finished', endpoint, http_status, viber_status, type(error)))
+
+    def request_parsed(self, event_type, duration, size, error):
+        self.calls.append(('parsed', event_type, size, type(error)))
+
+    def signature_verified(self, duration, size, verified):
+        self.calls.append(('verified', size, verified))
+
+
+async def test_request_hooks():
+    instrumentation = RecordingInstrumentation()
+    async with ViberApiEmulator(faults=[Fault(Fault.STATUS, endpoints=['get_user_details'])]) as emulator:
+        async with Api(VIBER_BOT_CONFIGURATION, api_url=emulator.url, instrumentation=instrumentation) as viber:
+            await viber.get_account_info()
+            with pytest.raises(ViberRequestError):
+                await viber.get_user_details('01234567890A=')
+
+    payload_size = len(b'{"auth_token": "auth-token-sample"}')
+    assert instrumentation.calls == [
+        ('started', 'get_account_info', payload_size),
+        ('finished', 'get_account_info', 200, 0, type(None)),
+        ('started', 'get_user_details', payload_size + len(b'"id": "01234567890A=", ')),
+        ('finished', 'get_user_details', 200, 5, ViberRequestError),
+    ]
+
+
+async def test_cancelled_hedge_attempt_is_not_an_error():
+    instrumentation = RecordingInstrumentation()
+    latencies = iter([0.3, 0])
+    async with ViberApiEmulator(latency=lambda: next(latencies, 0)) as emulator:
+        async with Api(VIBER_BOT_CONFIGURATION, api_url=emulator.url, instrumentation=instrumentation,
+                       hedge_policy=HedgePolicy(max_delay=0.02)) as viber:
+            await viber.get_user_details('01234567890A=')
+
+    finished = sorted(
+        (call for call in instrumentation.calls if call[0] == 'finished'), key=lambda call: call[2] is None)
+    assert finished == [
+        ('finished', 'get_user_details', 200, 0, type(None)),
+        ('finished', 'get_user_details', None, None, type(None)),
+    ]
+
+
+def test_parse_and_verify_hooks():
+    instrumentation = RecordingInstrumentation()
+    viber = Api(VIBER_BOT_CONFIGURATION, instrumentation=instrumentation)
+
+    assert viber.verify_signature(CALLBACK, SIGNATURE)
+    viber.parse_request(CALLBACK)
+    with pytest.raises(ValueError):
+        viber.parse_request(b'not json')
+
+    assert instrumentation.calls[:2] == [
+        ('verified', len(CALLBACK), True),
+        ('parsed', 'webhook', len(CALLBACK), type(None)),
+    ]
+    _, event_type, size, error_type = instrumentation.calls[2]
+    assert (event_type, size) == (None, len(b'not json'))
+    assert issubclass(error_type, ValueError)
+
+
+async def test_prometheus_instrumentation():
+    prometheus_client = pytest.importorskip('prometheus_client')
+    from aioviberbot.api.instrumentation import PrometheusInstrumentation
+
+    registry = prometheus_client.CollectorRegistry()
+    async with ViberApiEmulator() as emulator:
+        async with Api(VIBER_BOT_CONFIGURATION, api_url=emulator.url,
+                       instrumentation=PrometheusInstrumentation(registry)) as viber:
+            await viber.get_account_info()
+            viber.verify_signature(CALLBACK, SIGNATURE)
+            viber.parse_request(CALLBACK)
+
+    labels = {'endpoint': 'get_account_info', 'http_status': '200', 'viber_status': '0'}
+    assert registry.get_sample_value('aioviberbot_requests_total', labels) == 1
+    assert registry.get_sample_value(
+        'aioviberbot_request_duration_seconds_count', {'endpoint': 'get_account_info'}) == 1
+    assert registry.get_sample_value('aioviberbot_requests_in_flight', {'endpoint': 'get_account_info'}) == 0
+    assert registry.get_sample_value('aioviberbot_signatures_total', {'verified': 'true'}) == 1
+    assert registry.get_sample_value(
+        'aioviberbot_parse_request_duration_seconds_count', {'event_type': 'webhook'}) == 1
+
+
+async def test_prometheus_hedged_request_is_not_an_error():
+    prometheus_client = pytest.importorskip('prometheus_client')
+    from aioviberbot.api.instrumentation import PrometheusInstrumentation
+
+    registry = prometheus_client.CollectorRegistry()
+    latencies = iter([0.3, 0])
+    async with ViberApiEmulator(latency=lambda: next(latencies, 0)) as emulator:
+        async with Api(VIBER_BOT_CONFIGURATION, api_url=emulator.url, hedge_policy=HedgePolicy(max_delay=0.02),
+                       instrumentation=PrometheusInstrumentation(registry)) as viber:
+            await viber.get_user_details('01234567890A=')
+
+    assert registry.get_sample_value(
+        'aioviberbot_request_errors_total', {'endpoint': 'get_user_details', 'error': 'CancelledError'}) is None
+    assert registry.get_sample_value('aioviberbot_requests_in_flight', {'endpoint': 'get_user_details'}) == 0
+
+
+async def test_opentelemetry_instrumentation():
+    pytest.importorskip('opentelemetry.sdk')
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+    from aioviberbot.api.instrumentation import OpenTelemetryInstrumentation
+
+    exporter = InMemorySpanExporter()
+    tracer_provider = TracerProvider()
+    tracer_provider.add_span_processor(SimpleSpanProcessor(exporter))
+    instrumentation = OpenTelemetryInstrumentation(tracer_provider.get_tracer('test'))
+
+    async with ViberApiEmulator(faults=[Fault(Fault.HTTP_ERROR)]) as emulator:
+        async with Api(VIBER_BOT_CONFIGURATION, api_url=emulator.url, instrumentation=instrumentation) as viber:
+            with pytest.raises(Exception):
+                await viber.get_account_info()
+            viber.parse_request(CALLBACK)
+
+    request_span, parse_span = exporter.get_finished_spans()
+    assert request_span.name == 'viber get_account_info'
+    assert request_span.attributes['http.response.status_code'] == 500
+    assert not request_span.status.is_ok
+    assert parse_span.name == 'viber parse_request'
+    assert parse_span.attributes['viber.event_type'] == 'webhook'
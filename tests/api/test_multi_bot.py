@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import hmac
+import json
+
+import pytest
+
+from aioviberbot import BotConfiguration
+from aioviberbot.api.deduplicator import Deduplicator
+from aioviberbot.api.errors import ViberValidationError
+from aioviberbot.api.messages import TextMessage
+from aioviberbot.api.multi_bot import MultiBotClient
+from aioviberbot.api.rate_limiter import RateLimiter, TokenBucket
+from aioviberbot.api.webhook_app import WEBHOOK_PROCESSOR_KEY, create_multi_bot_webhook_app
+from .stubs import ResponseStub
+
+BOT_CONFIGURATIONS = {
+    'brand-a': BotConfiguration('auth-token-a', 'bot a', 'http://avatars.com/a.jpg'),
+    'brand-b': BotConfiguration('auth-token-b', 'bot b', 'http://avatars.com/b.jpg'),
+}
+
+
+class SessionStub:
+    def __init__(self):
+        self.requests = []
+
+    async def post(self, url, headers, json=None, data=None):
+        self.requests.append((url, json))
+        return ResponseStub({'status': 0, 'message_token': len(self.requests)})
+
+
+def create_client(**kwargs):
+    client = MultiBotClient(**kwargs)
+    for bot_id, bot_configuration in BOT_CONFIGURATIONS.items():
+        client.add_bot(bot_id, bot_configuration)
+    return client
+
+
+def callback(bot_id, message_token):
+    request_data = json.dumps({
+        'event': 'message',
+        'timestamp': 1457764197627,
+        'message_token': message_token,
+        'sender': {'id': '01234567890A=', 'name': 'viberUser'},
+        'message': {'type': 'text', 'text': 'hi'},
+    }).encode('utf-8')
+    auth_token = BOT_CONFIGURATIONS[bot_id].auth_token
+    signature = hmac.new(auth_token.encode('ascii'), request_data, hashlib.sha256).hexdigest()
+    return request_data, signature
+
+
+async def test_bots_share_session_and_rate_limiter():
+    session = SessionStub()
+    acquired = []
+
+    class RateLimiterStub(RateLimiter):
+        async def acquire(self, endpoint):
+            acquired.append(endpoint)
+
+    client = create_client(client_session=session, rate_limiter=RateLimiterStub(TokenBucket(rate=100)))
+
+    await client['brand-a'].send_messages('user-1', [TextMessage(text='a')])
+    await client['brand-b'].send_messages('user-1', [TextMessage(text='b')])
+
+    assert [payload['auth_token'] for _, payload in session.requests] == ['auth-token-a', 'auth-token-b']
+    assert [payload['sender']['name'] for _, payload in session.requests] == ['bot a', 'bot b']
+    assert len(acquired) == 2
+
+
+async def test_own_session_is_shared_and_closed():
+    async with create_client() as client:
+        assert client['brand-a']._request_sender._get_session() is client._session
+        assert client['brand-b']._request_sender._get_session() is client._session
+        session = client._session._get_session()
+    assert session.closed
+
+
+def test_add_and_remove_bots():
+    client = create_client()
+    assert sorted(client) == ['brand-a', 'brand-b']
+
+    with pytest.raises(ViberValidationError):
+        client.add_bot('brand-a', BOT_CONFIGURATIONS['brand-a'])
+
+    api = client.remove_bot('brand-b')
+    assert api.name == 'bot b'
+    assert 'brand-b' not in client
+    assert client.get('brand-b') is None
+    assert len(client) == 1
+
+
+def test_verify_and_parse_by_bot():
+    client = create_client()
+    request_data, signature = callback('brand-a', 1)
+
+    assert client.verify_signature('brand-a', request_data, signature)
+    assert not client.verify_signature('brand-b', request_data, signature)
+    assert not client.verify_signature('brand-c', request_data, signature)
+    assert client.parse_request('brand-a', request_data).message_token == 1
+
+
+async def test_webhook_routes_by_bot(aiohttp_client):
+    handled = []
+    done = asyncio.Event()
+
+    async def handler(bot_id, viber_request):
+        handled.append((bot_id, viber_request.message_token))
+        if len(handled) == 2:
+            done.set()
+
+    app = create_multi_bot_webhook_app(create_client(), handler)
+    http_client = await aiohttp_client(app)
+
+    for bot_id, message_token in (('brand-a', 1), ('brand-b', 2)):
+        request_data, signature = callback(bot_id, message_token)
+        response = await http_client.post(
+            '/webhook/' + bot_id, data=request_data, headers={'X-Viber-Content-Signature': signature})
+        assert response.status == 200
+
+    request_data, signature = callback('brand-a', 3)
+    response = await http_client.post(
+        '/webhook/brand-b', data=request_data, headers={'X-Viber-Content-Signature': signature})
+    assert response.status == 403
+
+    response = await http_client.post(
+        '/webhook/brand-c', data=request_data, headers={'X-Viber-Content-Signature': signature})
+    assert response.status == 404
+
+    await asyncio.wait_for(done.wait(), 1)
+    assert sorted(handled) == [('brand-a', 1), ('brand-b', 2)]
+    metrics = app[WEBHOOK_PROCESSOR_KEY].metrics
+    assert metrics.unknown_bot == 1
+    assert metrics.rejected_signature == 1
+
+
+async def test_webhook_deduplicates_by_bot(aiohttp_client):
+    handled = []
+    done = asyncio.Event()
+
+    async def handler(bot_id, viber_request):
+        handled.append((bot_id, viber_request.message_token))
+        if len(handled) == 2:
+            done.set()
+
+    deduplicator = Deduplicator()
+    app = create_multi_bot_webhook_app(create_client(), handler, deduplicator=deduplicator)
+    http_client = await aiohttp_client(app)
+
+    for bot_id in ('brand-a', 'brand-b', 'brand-a'):
+        request_data, signature = callback(bot_id, 1)
+        response = await http_client.post(
+            '/webhook/' + bot_id, data=request_data, headers={'X-Viber-Content-Signature': signature})
+        assert response.status == 200
+
+    await asyncio.wait_for(done.wait(), 1)
+    assert sorted(handled) == [('brand-a', 1), ('brand-b', 1)]
+    assert deduplicator.duplicates_count == 1
@@ -0,0 +1,92 @@
+import asyncio
+
+from aioviberbot import Api
+from aioviberbot import BotConfiguration
+from aioviberbot.api.errors import ViberRequestError
+from aioviberbot.api.online_coalescer import OnlineStatusCoalescer
+from .stubs import ResponseStub
+
+VIBER_BOT_CONFIGURATION = BotConfiguration('auth-token-sample', 'testbot', 'http://avatars.com/')
+
+
+def create_fetch(calls):
+    async def fetch(ids):
+        calls.append(ids)
+        await asyncio.sleep(0)
+        return [{'id': user_id, 'online_status': 0} for user_id in ids if user_id != 'unknown']
+
+    return fetch
+
+
+async def test_lookups_within_window_share_request():
+    calls = []
+    coalescer = OnlineStatusCoalescer(create_fetch(calls), window=0.01)
+
+    first, second, third = await asyncio.gather(
+        coalescer.get_online(['a']),
+        coalescer.get_online(['b', 'unknown']),
+        coalescer.get_online(['a', 'c']),
+    )
+
+    assert calls == [['a', 'b', 'unknown', 'c']]
+    assert first == [{'id': 'a', 'online_status': 0}]
+    assert second == [{'id': 'b', 'online_status': 0}]
+    assert [user['id'] for user in third] == ['a', 'c']
+
+
+async def test_full_batch_sent_right_away():
+    calls = []
+    coalescer = OnlineStatusCoalescer(create_fetch(calls), window=60, max_ids=3)
+
+    result = await asyncio.wait_for(coalescer.get_online(['a', 'b', 'c', 'd', 'e', 'f']), 1)
+
+    assert calls == [['a', 'b', 'c'], ['d', 'e', 'f']]
+    assert len(result) == 6
+
+
+async def test_error_raised_to_all_callers():
+    async def fetch(ids):
+        raise ViberRequestError('failed with status: 1, message: failed')
+
+    coalescer = OnlineStatusCoalescer(fetch, window=0.001)
+    results = await asyncio.gather(
+        coalescer.get_online(['a']), coalescer.get_online(['b']), return_exceptions=True)
+
+    assert all(isinstance(result, ViberRequestError) for result in results)
+
+
+async def test_cancelled_request_releases_callers():
+    started = asyncio.Event()
+
+    async def fetch(ids):
+        started.set()
+        await asyncio.sleep(60)
+
+    coalescer = OnlineStatusCoalescer(fetch, window=0.001)
+    lookup = asyncio.ensure_future(coalescer.get_online(['a']))
+    await started.wait()
+    for request in coalescer._requests:
+        request.cancel()
+
+    done, _ = await asyncio.wait([lookup], timeout=1)
+    assert done
+    assert lookup.cancelled()
+
+
+async def test_api_coalesces_get_online(monkeypatch):
+    calls = []
+
+    async def callback(session, url, json, headers, *args, **kwargs):
+        calls.append(json['ids'])
+        return ResponseStub({
+            'status': 0,
+            'status_message': 'ok',
+            'users': [{'id': user_id, 'online_status': 0} for user_id in json['ids']],
+        })
+
+    monkeypatch.setattr('aiohttp.ClientSession.post', callback)
+    async with Api(VIBER_BOT_CONFIGURATION, online_batch_window=0.01) as viber:
+        results = await asyncio.gather(*(viber.get_online([str(i)]) for i in range(10)))
+
+    assert calls == [[str(i) for i in range(10)]]
+    assert [result[0]['id'] for result in results] == [str(i) for i in range(10)]
@@ -0,0 +1,209 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from aioviberbot import Api
+from aioviberbot import BotConfiguration
+from aioviberbot.api.emulator import ViberApiEmulator
+from aioviberbot.api.errors import ViberClientError, ViberRequestError, ViberValidationError
+from aioviberbot.api.messages import KeyboardMessage, RichMediaMessage, TextMessage
+from aioviberbot.api.messages.message import Message
+from aioviberbot.api.outbox import Outbox, OutboxStatus
+
+VIBER_BOT_CONFIGURATION = BotConfiguration('auth-token-sample', 'testbot', 'http://avatars.com/')
+SAMPLE_KEYBOARD = {'Type': 'keyboard', 'Buttons': [{'ActionType': 'reply', 'ActionBody': 'yes'}]}
+
+
+class ApiStub:
+    def __init__(self, errors=None):
+        """
+        :param errors: dict of message text to a list of errors raised by the next sends of it
+        """
+        self.errors = errors or {}
+        self.sent = []
+        self.tokens = iter(range(1000, 2000))
+
+    async def send_messages(self, to, messages, chat_id=None):
+        text = getattr(messages[0], 'text', None)
+        errors = self.errors.get(text)
+        if errors:
+            raise errors.pop(0)
+        self.sent.append((to, text))
+        return [next(self.tokens)]
+
+    async def broadcast_messages(self, broadcast_list, messages):
+        self.sent.append((tuple(broadcast_list), messages[0].text))
+        return [next(self.tokens)]
+
+
+async def wait_for(outbox, status, count):
+    for _ in range(200):
+        if (await outbox.get_counts())[status] == count:
+            return
+        await asyncio.sleep(0.01)
+    pytest.fail('outbox did not reach {0} {1} items'.format(count, status))
+
+
+async def test_sends_and_marks_done(tmp_path):
+    async with ViberApiEmulator() as emulator:
+        async with Api(VIBER_BOT_CONFIGURATION, api_url=emulator.url) as viber:
+            async with Outbox(viber, str(tmp_path / 'outbox.db')) as outbox:
+                ids = await outbox.enqueue('user', [
+                    TextMessage(text='hi', keyboard=SAMPLE_KEYBOARD),
+                    RichMediaMessage(rich_media={'Type': 'rich_media', 'Buttons': []}, alt_text='products'),
+                    KeyboardMessage(keyboard=SAMPLE_KEYBOARD, tracking_data='menu'),
+                ])
+                ids += await outbox.enqueue_broadcast(['a', 'b'], [TextMessage(text='news')])
+                await wait_for(outbox, OutboxStatus.DONE, 4)
+
+                item = await outbox.get_item(ids[0])
+                assert item['status'] == OutboxStatus.DONE
+                assert item['attempts'] == 1
+                assert item['message_token'] is not None
+
+            payloads = [payload for endpoint, payload in emulator.last_requests if endpoint == 'send_message']
+            assert [payload.get('type') for payload in payloads] == ['text', 'rich_media', None]
+            assert payloads[2]['keyboard'] == SAMPLE_KEYBOARD
+            assert payloads[2]['tracking_data'] == 'menu'
+            assert emulator.requests_count['broadcast_message'] == 1
+
+
+async def test_restart_does_not_resend_completed(tmp_path):
+    path = str(tmp_path / 'outbox.db')
+    api = ApiStub()
+    async with Outbox(api, path) as outbox:
+        await outbox.enqueue('user', [TextMessage(text='first')])
+        await wait_for(outbox, OutboxStatus.DONE, 1)
+
+    # the process stopped while the second message was being sent, the third one was pending
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute(
+            "INSERT INTO outbox (receiver_key, receiver, message, status, created_at, updated_at)"
+            " VALUES ('user', 'user', '{\"type\": \"text\", \"text\": \"second\"}', 'sending', 0, 0),"
+            " ('user', 'user', '{\"type\": \"text\", \"text\": \"third\"}', 'pending', 0, 0)")
+    connection.close()
+
+    async with Outbox(api, path) as outbox:
+        await wait_for(outbox, OutboxStatus.DONE, 3)
+
+    assert api.sent == [('user', 'first'), ('user', 'second'), ('user', 'third')]
+
+
+async def test_retry_keeps_order_of_receiver(tmp_path):
+    api = ApiStub(errors={'first': [ViberClientError('connection reset')]})
+    async with Outbox(api, str(tmp_path / 'outbox.db'), retry_delay=0.05, poll_interval=0.01) as outbox:
+        await outbox.enqueue('user', [TextMessage(text='first'), TextMessage(text='second')])
+        await outbox.enqueue('other', [TextMessage(text='other')])
+        await wait_for(outbox, OutboxStatus.DONE, 3)
+
+    assert api.sent.index(('user', 'first')) < api.sent.index(('user', 'second'))
+    # other receivers do not wait for the retry
+    assert api.sent[0] == ('other', 'other')
+
+
+async def test_rejected_and_exhausted_messages_fail(tmp_path):
+    api = ApiStub(errors={
+        'rejected': [ViberRequestError('failed with status: 5, message: receiverNotRegistered', status=5)],
+        'flaky': [ViberClientError('connection reset')] * 2,
+        'throttled': [ViberRequestError('failed with status: 12, message: tooManyRequests', status=12)] * 2,
+    })
+    async with Outbox(api, str(tmp_path / 'outbox.db'), max_attempts=2, retry_delay=0.01,
+                      poll_interval=0.01) as outbox:
+        rejected_id, = await outbox.enqueue('a', [TextMessage(text='rejected')])
+        flaky_id, = await outbox.enqueue('b', [TextMessage(text='flaky')])
+        throttled_id, = await outbox.enqueue('c', [TextMessage(text='throttled')])
+        await wait_for(outbox, OutboxStatus.FAILED, 3)
+
+        rejected = await outbox.get_item(rejected_id)
+        assert rejected['attempts'] == 1
+        assert rejected['error'] == 'failed with status: 5, message: receiverNotRegistered'
+        assert (await outbox.get_item(flaky_id))['attempts'] == 2
+        assert (await outbox.get_item(throttled_id))['attempts'] == 2
+    assert api.sent == []
+
+
+async def test_throttled_message_is_retried(tmp_path):
+    api = ApiStub(errors={
+        'throttled': [ViberRequestError('failed with status: 12, message: tooManyRequests', status=12)],
+    })
+    async with Outbox(api, str(tmp_path / 'outbox.db'), retry_delay=0.01, poll_interval=0.01) as outbox:
+        item_id, = await outbox.enqueue('user', [TextMessage(text='throttled')])
+        await wait_for(outbox, OutboxStatus.DONE, 1)
+
+        item = await outbox.get_item(item_id)
+        assert item['attempts'] == 2
+    assert api.sent == [('user', 'throttled')]
+
+
+async def test_enqueue_validation(tmp_path):
+    async with Outbox(ApiStub(), str(tmp_path / 'outbox.db')) as outbox:
+        with pytest.raises(ViberValidationError):
+            await outbox.enqueue('user', [TextMessage()])
+        with pytest.raises(ViberValidationError):
+            await outbox.enqueue_broadcast([], [TextMessage(text='hi')])
+        with pytest.raises(ViberValidationError):
+            await outbox.enqueue('user', [CustomMessage()])
+
+
+class CustomMessage(Message):
+    def to_dict(self):
+        return {'text': 'custom'}
+
+    def from_dict(self, message_data):
+        return self
+
+    def validate(self):
+        return True
+
+
+class MenuMessage(KeyboardMessage):
+    pass
+
+
+async def test_enqueue_subclass_and_prepared_message(tmp_path):
+    api = ApiStub()
+    viber = Api(VIBER_BOT_CONFIGURATION)
+    async with Outbox(api, str(tmp_path / 'outbox.db')) as outbox:
+        await outbox.enqueue('user', [
+            viber.prepare_message(TextMessage(text='prepared')),
+            MenuMessage(keyboard=SAMPLE_KEYBOARD),
+        ])
+        await wait_for(outbox, OutboxStatus.DONE, 2)
+
+    assert api.sent == [('user', 'prepared'), ('user', None)]
+
+
+async def test_restart_after_close(tmp_path):
+    api = ApiStub()
+    outbox = Outbox(api, str(tmp_path / 'outbox.db'))
+    async with outbox:
+        await outbox.enqueue('user', [TextMessage(text='first')])
+        await wait_for(outbox, OutboxStatus.DONE, 1)
+    async with outbox:
+        await outbox.enqueue('user', [TextMessage(text='second')])
+        await wait_for(outbox, OutboxStatus.DONE, 2)
+
+    assert api.sent == [('user', 'first'), ('user', 'second')]
+
+
+async def test_concurrent_drains_keep_order_of_receiver(tmp_path):
+    in_flight = set()
+    sent = []
+
+    class SlowApi(ApiStub):
+        async def send_messages(self, to, messages, chat_id=None):
+            assert to not in in_flight, 'two messages of one receiver are sent at once'
+            in_flight.add(to)
+            await asyncio.sleep(0.01)
+            in_flight.discard(to)
+            sent.append(messages[0].text)
+            return [1]
+
+    async with Outbox(SlowApi(), str(tmp_path / 'outbox.db'), batch_size=1, poll_interval=0.01) as outbox:
+        await outbox.enqueue('user', [TextMessage(text=str(i)) for i in range(5)])
+        await asyncio.gather(outbox.drain(), outbox.drain())
+        await wait_for(outbox, OutboxStatus.DONE, 5)
+
+    assert sent == [str(i) for i in range(5)]
@@ -0,0 +1,111 @@
+import json
+import logging
+from unittest.mock import Mock
+
+import pytest
+
+from aioviberbot import Api
+from aioviberbot.api.bot_configuration import BotConfiguration
+from aioviberbot.api.consts import BOT_API_ENDPOINT, VIBER_BOT_API_URL, VIBER_BOT_USER_AGENT
+from aioviberbot.api.errors import ViberValidationError
+from aioviberbot.api.message_sender import MessageSender
+from aioviberbot.api.messages import KeyboardMessage, TextMessage
+from .stubs import ResponseStub
+
+logger = logging.getLogger('super-logger')
+VIBER_BOT_CONFIGURATION = BotConfiguration(
+    auth_token='auth-token-sample',
+    name='testbot',
+    avatar='https://avatars.com/avatar.jpg',
+)
+SAMPLE_KEYBOARD = {'Type': 'keyboard', 'Buttons': [{'ActionType': 'reply', 'ActionBody': 'так'}]}
+
+
+def create_message_sender(post_request_body):
+    request_sender = Mock()
+    request_sender.post_request_body = post_request_body
+    request_sender.auth_token = VIBER_BOT_CONFIGURATION.auth_token
+    return MessageSender(logger, request_sender)
+
+
+def prepare(message_sender, message):
+    return message_sender.prepare_message(
+        message, VIBER_BOT_CONFIGURATION.name, VIBER_BOT_CONFIGURATION.avatar)
+
+
+def test_build_body():
+    message_sender = create_message_sender(None)
+    message = KeyboardMessage(tracking_data='original', keyboard=SAMPLE_KEYBOARD)
+    prepared_message = prepare(message_sender, message)
+
+    body = json.loads(prepared_message.build_body(
+        '012345A=', chat_id='chat', auth_token=VIBER_BOT_CONFIGURATION.auth_token))
+    expected = message_sender._prepare_payload(
+        message, VIBER_BOT_CONFIGURATION.name, VIBER_BOT_CONFIGURATION.avatar, receiver='012345A=', chat_id='chat')
+    expected['auth_token'] = VIBER_BOT_CONFIGURATION.auth_token
+    assert body == expected
+
+    body = json.loads(prepared_message.build_body('012345B=', tracking_data={'step': 2}))
+    assert body['receiver'] == '012345B='
+    assert body['tracking_data'] == {'step': 2}
+    assert 'chat_id' not in body
+    assert 'auth_token' not in body
+
+
+def test_prepare_invalid_message():
+    with pytest.raises(ViberValidationError):
+        prepare(create_message_sender(None), TextMessage(text=None))
+
+
+async def test_send_prepared_message():
+    bodies = []
+
+    async def post_request_body(endpoint, body):
+        assert endpoint == BOT_API_ENDPOINT.SEND_MESSAGE
+        bodies.append(json.loads(body))
+        return dict(status=0, message_token='token-{0}'.format(len(bodies)))
+
+    message_sender = create_message_sender(post_request_body)
+    prepared_message = prepare(message_sender, TextMessage(text='hi!'))
+
+    assert await message_sender.send_message(
+        '012345A=', VIBER_BOT_CONFIGURATION.name, VIBER_BOT_CONFIGURATION.avatar, prepared_message) == 'token-1'
+    assert await message_sender.send_prepared_message('012345B=', prepared_message, tracking_data='t') == 'token-2'
+
+    assert [body['receiver'] for body in bodies] == ['012345A=', '012345B=']
+    assert [body['text'] for body in bodies] == ['hi!', 'hi!']
+    assert 'tracking_data' not in bodies[0]
+    assert bodies[1]['tracking_data'] == 't'
+
+
+async def test_api_sends_prepared_body(monkeypatch):
+    async def callback(session, url, headers, data, *args, **kwargs):
+        assert url == VIBER_BOT_API_URL + '/' + BOT_API_ENDPOINT.SEND_MESSAGE
+        assert headers['User-Agent'] == VIBER_BOT_USER_AGENT
+        assert headers['Content-Type'] == 'application/json'
+        body = json.loads(data)
+        assert body['auth_token'] == VIBER_BOT_CONFIGURATION.auth_token
+        assert body['receiver'] == '012345A='
+        return ResponseStub({'status': 0, 'status_message': 'ok', 'message_token': 'token'})
+
+    monkeypatch.setattr('aiohttp.ClientSession.post', callback)
+    async with Api(VIBER_BOT_CONFIGURATION) as viber:
+        prepared_message = viber.prepare_message(TextMessage(text='hi!'))
+        assert await viber.send_messages('012345A=', [prepared_message]) == ['token']
+
+
+async def test_prepared_message_sent_with_token_of_sending_api(monkeypatch):
+    tokens = []
+
+    async def callback(session, url, headers, data, *args, **kwargs):
+        tokens.append(json.loads(data)['auth_token'])
+        return ResponseStub({'status': 0, 'status_message': 'ok', 'message_token': 'token'})
+
+    monkeypatch.setattr('aiohttp.ClientSession.post', callback)
+    other_configuration = BotConfiguration('other-auth-token', 'otherbot', 'https://avatars.com/other.jpg')
+    async with Api(VIBER_BOT_CONFIGURATION) as viber, Api(other_configuration) as other_viber:
+        prepared_message = viber.prepare_message(TextMessage(text='hi!'))
+        await viber.send_prepared_message('012345A=', prepared_message)
+        await other_viber.send_prepared_message('012345A=', prepared_message)
+
+    assert tokens == [VIBER_BOT_CONFIGURATION.auth_token, 'other-auth-token']
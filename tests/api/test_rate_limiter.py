@@ -0,0 +1,101 @@
+import asyncio
+import logging
+
+import pytest
+
+from aioviberbot.api.api_request_sender import ApiRequestSender
+from aioviberbot.api.bot_configuration import BotConfiguration
+from aioviberbot.api.consts import BOT_API_ENDPOINT, VIBER_BOT_USER_AGENT
+from aioviberbot.api.errors import ViberValidationError
+from aioviberbot.api.rate_limiter import RateLimiter, TokenBucket
+from .stubs import ClockStub, ResponseStub
+
+logger = logging.getLogger('super-logger')
+VIBER_BOT_CONFIGURATION = BotConfiguration(
+    auth_token='auth-token-sample',
+    name='testbot',
+    avatar='https://avatars.com/avatar.jpg',
+)
+
+
+def test_token_bucket_refill():
+    clock = ClockStub()
+    bucket = TokenBucket(rate=10, capacity=5, clock=clock)
+
+    assert bucket.level == 5
+    assert all(bucket.try_acquire() for _ in range(5))
+    assert not bucket.try_acquire()
+
+    clock.now = 0.2
+    assert bucket.level == pytest.approx(2)
+
+    clock.now = 10
+    assert bucket.level == 5
+
+
+def test_token_bucket_invalid_rate():
+    with pytest.raises(ViberValidationError):
+        TokenBucket(rate=0)
+
+
+def test_token_bucket_rate_below_one():
+    clock = ClockStub()
+    bucket = TokenBucket(rate=0.5, clock=clock)
+
+    assert bucket.capacity == 1
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+    clock.now = 1
+    assert not bucket.try_acquire()
+
+    clock.now = 2
+    assert bucket.try_acquire()
+
+    with pytest.raises(ViberValidationError):
+        TokenBucket(rate=1, capacity=0.5)
+
+
+async def test_token_bucket_acquire_waits():
+    bucket = TokenBucket(rate=100, capacity=1)
+    loop = asyncio.get_event_loop()
+
+    await bucket.acquire()
+    started = loop.time()
+    await bucket.acquire()
+    await bucket.acquire()
+
+    assert loop.time() - started >= 0.015
+
+
+async def test_rate_limiter_levels():
+    clock = ClockStub()
+    rate_limiter = RateLimiter(
+        global_bucket=TokenBucket(rate=10, clock=clock),
+        endpoint_buckets={BOT_API_ENDPOINT.SEND_MESSAGE: TokenBucket(rate=3, clock=clock)},
+    )
+
+    await rate_limiter.acquire(BOT_API_ENDPOINT.SEND_MESSAGE)
+    await rate_limiter.acquire(BOT_API_ENDPOINT.GET_ONLINE)
+
+    assert rate_limiter.levels == {BOT_API_ENDPOINT.SEND_MESSAGE: 2, 'global': 8}
+
+
+async def test_post_request_acquires_token(monkeypatch):
+    acquired = []
+
+    class RateLimiterStub:
+        async def acquire(self, endpoint):
+            acquired.append(endpoint)
+
+    async def callback(session, url, json, headers, *args, **kwargs):
+        assert acquired == [BOT_API_ENDPOINT.GET_ACCOUNT_INFO]
+        return ResponseStub({'status': 0, 'status_message': 'ok'})
+
+    monkeypatch.setattr('aiohttp.ClientSession.post', callback)
+    request_sender = ApiRequestSender(
+        logger, 'http://site.com', VIBER_BOT_CONFIGURATION, VIBER_BOT_USER_AGENT, rate_limiter=RateLimiterStub())
+
+    await request_sender.get_account_info()
+    await request_sender.close()
+    assert acquired == [BOT_API_ENDPOINT.GET_ACCOUNT_INFO]
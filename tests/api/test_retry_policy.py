@@ -0,0 +1,137 @@
+import asyncio
+import logging
+
+import aiohttp
+import pytest
+
+from aioviberbot.api.api_request_sender import ApiRequestSender
+from aioviberbot.api.bot_configuration import BotConfiguration
+from aioviberbot.api.consts import BOT_API_ENDPOINT, VIBER_BOT_USER_AGENT
+from aioviberbot.api.errors import ViberClientError, ViberRequestError, ViberTimeoutError
+from aioviberbot.api.retry_policy import RetryPolicy
+from .stubs import ResponseStub
+
+logger = logging.getLogger('super-logger')
+VIBER_BOT_CONFIGURATION = BotConfiguration(
+    auth_token='auth-token-sample',
+    name='testbot',
+    avatar='https://avatars.com/avatar.jpg',
+)
+
+
+def create_request_sender(retry_policy):
+    return ApiRequestSender(
+        logger, 'http://site.com', VIBER_BOT_CONFIGURATION, VIBER_BOT_USER_AGENT, retry_policy=retry_policy)
+
+
+def response_error(status):
+    return aiohttp.ClientResponseError(None, (), status=status)
+
+
+@pytest.mark.parametrize('endpoint,error,retryable', [
+    (BOT_API_ENDPOINT.GET_ONLINE, ViberTimeoutError(asyncio.TimeoutError()), True),
+    (BOT_API_ENDPOINT.GET_USER_DETAILS, ViberClientError(aiohttp.ClientConnectionError()), True),
+    (BOT_API_ENDPOINT.GET_ACCOUNT_INFO, ViberClientError(response_error(503)), True),
+    (BOT_API_ENDPOINT.SET_WEBHOOK, ViberClientError(response_error(429)), True),
+    (BOT_API_ENDPOINT.GET_ACCOUNT_INFO, ViberClientError(response_error(400)), False),
+    (BOT_API_ENDPOINT.GET_ONLINE, ViberRequestError('failed with status: 1, message: failed'), False),
+    (BOT_API_ENDPOINT.GET_ONLINE, ViberRequestError('failed with status: 5', status=5), False),
+    (BOT_API_ENDPOINT.GET_USER_DETAILS, ViberRequestError('failed with status: 12', status=12), True),
+    (BOT_API_ENDPOINT.SEND_MESSAGE, ViberRequestError('failed with status: 12', status=12), False),
+    (BOT_API_ENDPOINT.SEND_MESSAGE, ViberTimeoutError(asyncio.TimeoutError()), False),
+    (BOT_API_ENDPOINT.BROADCAST_MESSAGE, ViberClientError(aiohttp.ClientConnectionError()), False),
+    (BOT_API_ENDPOINT.POST, ViberClientError(response_error(503)), False),
+])
+def test_is_retryable(endpoint, error, retryable):
+    assert RetryPolicy().is_retryable(endpoint, error) == retryable
+
+
+def test_get_delay_capped():
+    retry_policy = RetryPolicy(base_delay=1, max_delay=5, rand=lambda: 1)
+
+    assert [retry_policy.get_delay(retry) for retry in range(5)] == [1, 2, 4, 5, 5]
+
+
+async def test_post_request_retries(monkeypatch):
+    calls = []
+
+    async def callback(session, url, json, headers, *args, **kwargs):
+        calls.append(url)
+        if len(calls) < 3:
+            raise aiohttp.ClientConnectionError()
+        return ResponseStub({'status': 0, 'status_message': 'ok', 'users': []})
+
+    monkeypatch.setattr('aiohttp.ClientSession.post', callback)
+    retry_policy = RetryPolicy(max_attempts=3, base_delay=0.001)
+    request_sender = create_request_sender(retry_policy)
+
+    assert await request_sender.get_online_status(['0123456789=']) == []
+    assert len(calls) == 3
+    assert retry_policy.retries_count == 2
+    await request_sender.close()
+
+
+async def test_post_request_retries_throttled(monkeypatch):
+    calls = []
+
+    async def callback(session, url, json, headers, *args, **kwargs):
+        calls.append(url)
+        if len(calls) < 2:
+            return ResponseStub({'status': 12, 'status_message': 'tooManyRequests'})
+        return ResponseStub({'status': 0, 'status_message': 'ok', 'users': []})
+
+    monkeypatch.setattr('aiohttp.ClientSession.post', callback)
+    retry_policy = RetryPolicy(max_attempts=3, base_delay=0.001)
+    request_sender = create_request_sender(retry_policy)
+
+    assert await request_sender.get_online_status(['0123456789=']) == []
+    assert len(calls) == 2
+    assert retry_policy.retries_count == 1
+    await request_sender.close()
+
+
+async def test_post_request_gives_up(monkeypatch):
+    async def callback(session, url, json, headers, *args, **kwargs):
+        raise asyncio.TimeoutError()
+
+    monkeypatch.setattr('aiohttp.ClientSession.post', callback)
+    retry_policy = RetryPolicy(max_attempts=2, base_delay=0.001)
+    request_sender = create_request_sender(retry_policy)
+
+    with pytest.raises(ViberTimeoutError):
+        await request_sender.get_account_info()
+    assert retry_policy.retries_count == 1
+    await request_sender.close()
+
+
+async def test_post_request_not_retried_for_send(monkeypatch):
+    calls = []
+
+    async def callback(session, url, json, headers, *args, **kwargs):
+        calls.append(url)
+        raise aiohttp.ClientConnectionError()
+
+    monkeypatch.setattr('aiohttp.ClientSession.post', callback)
+    retry_policy = RetryPolicy(base_delay=0.001)
+    request_sender = create_request_sender(retry_policy)
+
+    with pytest.raises(ViberClientError):
+        await request_sender.post_request(BOT_API_ENDPOINT.SEND_MESSAGE, {'receiver': '0123456789='})
+    assert len(calls) == 1
+    assert retry_policy.retries_count == 0
+    await request_sender.close()
+
+
+async def test_deadline_stops_retries():
+    now = 0
+
+    async def request():
+        nonlocal now
+        now += 10
+        raise ViberTimeoutError(asyncio.TimeoutError())
+
+    retry_policy = RetryPolicy(max_attempts=10, base_delay=0.001, deadline=25, clock=lambda: now)
+
+    with pytest.raises(ViberTimeoutError):
+        await retry_policy.call(BOT_API_ENDPOINT.GET_ONLINE, request)
+    assert retry_policy.retries_count == 2
@@ -0,0 +1,103 @@
+import pytest
+
+from aioviberbot import Api
+from aioviberbot import BotConfiguration
+from aioviberbot.api.errors import ViberReceiverSuppressedError
+from aioviberbot.api.messages import TextMessage
+from aioviberbot.api.suppression_list import SuppressionList
+from aioviberbot.api.viber_requests import create_request
+
+VIBER_BOT_CONFIGURATION = BotConfiguration('auth-token-sample', 'testbot', 'http://avatars.com/')
+
+
+def test_add_discard_and_filter():
+    suppression_list = SuppressionList()
+    user_ids = ['user-{0}'.format(i) for i in range(5000)]
+    for user_id in user_ids[::2]:
+        suppression_list.add(user_id)
+    suppression_list.add(user_ids[0])
+
+    assert len(suppression_list) == 2500
+    assert suppression_list.filter(user_ids) == user_ids[1::2]
+
+    for user_id in user_ids[:1000]:
+        suppression_list.discard(user_id)
+
+    assert len(suppression_list) == 2000
+    assert user_ids[0] not in suppression_list
+    assert user_ids[1000] in suppression_list
+    assert suppression_list.filter(user_ids[:1001]) == user_ids[:1000]
+
+
+def test_update_from_callbacks():
+    suppression_list = SuppressionList()
+
+    suppression_list.update(create_request({'event': 'unsubscribed', 'timestamp': 1, 'user_id': 'user-1'}))
+    suppression_list.update(create_request({
+        'event': 'failed', 'timestamp': 1, 'message_token': 1, 'user_id': 'user-2', 'desc': 'failed',
+    }))
+    suppression_list.update(create_request({
+        'event': 'delivered', 'timestamp': 1, 'message_token': 1, 'user_id': 'user-3',
+    }))
+    assert suppression_list.filter(['user-1', 'user-2', 'user-3']) == ['user-3']
+
+    suppression_list.update(create_request({
+        'event': 'subscribed', 'timestamp': 1, 'user': {'id': 'user-1', 'name': 'user'},
+    }))
+    assert suppression_list.filter(['user-1', 'user-2', 'user-3']) == ['user-1', 'user-3']
+
+    suppression_list.update_failed_list([
+        {'receiver': 'user-3', 'status': 6, 'status_message': 'Not subscribed'},
+        {'receiver': 'user-4', 'status': None, 'status_message': 'timeout'},
+    ])
+    assert 'user-3' in suppression_list
+    assert 'user-4' not in suppression_list
+
+
+async def test_save_and_load(tmp_path):
+    path = str(tmp_path / 'suppressed')
+    suppression_list = SuppressionList(path)
+    await suppression_list.load()
+    assert len(suppression_list) == 0
+
+    suppression_list.add('user-1')
+    suppression_list.add('user-2')
+    assert suppression_list.changed
+    await suppression_list.save()
+    assert not suppression_list.changed
+
+    loaded = SuppressionList(path)
+    await loaded.load()
+    assert len(loaded) == 2
+    assert loaded.filter(['user-1', 'user-2', 'user-3']) == ['user-3']
+
+
+async def test_api_skips_suppressed_receivers():
+    requests = []
+
+    async def post_request(endpoint, payload):
+        requests.append(payload)
+        return dict(status=0, message_token='token', failed_list=[
+            {'receiver': 'user-3', 'status': 6, 'status_message': 'Not subscribed'},
+        ])
+
+    suppression_list = SuppressionList()
+    viber = Api(VIBER_BOT_CONFIGURATION, suppression_list=suppression_list)
+    viber._request_sender.post_request = post_request
+
+    viber.parse_request(b'{"event": "unsubscribed", "timestamp": 1, "user_id": "user-1"}')
+
+    with pytest.raises(ViberReceiverSuppressedError):
+        await viber.send_messages('user-1', [TextMessage(text='hi!')])
+    assert requests == []
+
+    assert await viber.broadcast_messages(['user-1', 'user-2', 'user-3'], [TextMessage(text='hi!')]) == ['token']
+    assert requests[0]['broadcast_list'] == ['user-2', 'user-3']
+
+    with pytest.raises(ViberReceiverSuppressedError):
+        await viber.broadcast_messages(['user-1', 'user-3'], [TextMessage(text='hi!')])
+
+    result = await viber.broadcast(['user-{0}'.format(i) for i in range(5)], [TextMessage(text='hi!')])
+    assert requests[1]['broadcast_list'] == ['user-0', 'user-2', 'user-4']
+    assert result.receivers_count == 3
+    assert result.suppressed_count == 2
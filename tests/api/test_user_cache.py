@@ -0,0 +1,173 @@
+import asyncio
+
+import pytest
+
+from aioviberbot import Api
+from aioviberbot import BotConfiguration
+from aioviberbot.api.errors import ViberRequestError, ViberValidationError
+from aioviberbot.api.user_cache import MemoryCacheBackend, UserCache
+from aioviberbot.api.user_profile import UserProfile
+from .stubs import ClockStub
+
+VIBER_BOT_CONFIGURATION = BotConfiguration('auth-token-sample', 'testbot', 'http://avatars.com/')
+USER_ID = '01234567890A='
+
+
+async def test_memory_backend_ttl_and_lru():
+    clock = ClockStub()
+    backend = MemoryCacheBackend(max_size=2, clock=clock)
+
+    await backend.set('a', {'v': 1}, ttl=10)
+    await backend.set('b', {'v': 2}, ttl=10)
+    assert await backend.get('a') == {'v': 1}
+
+    # 'b' is the least recently used one
+    await backend.set('c', {'v': 3}, ttl=10)
+    assert await backend.get('b') is None
+    assert len(backend) == 2
+
+    clock.now = 10
+    assert await backend.get('a') is None
+
+
+async def test_user_details_single_flight():
+    calls = []
+
+    async def fetch(user_id):
+        calls.append(user_id)
+        await asyncio.sleep(0.01)
+        return {'id': user_id, 'language': 'uk'}
+
+    user_cache = UserCache()
+    results = await asyncio.gather(*(user_cache.get_user_details(USER_ID, fetch) for _ in range(5)))
+    assert results == [{'id': USER_ID, 'language': 'uk'}] * 5
+    assert calls == [USER_ID]
+
+    assert await user_cache.get_user_details(USER_ID, fetch) == {'id': USER_ID, 'language': 'uk'}
+    assert calls == [USER_ID]
+
+
+async def test_user_details_negative_cache():
+    calls = []
+
+    async def fetch(user_id):
+        calls.append(user_id)
+        raise ViberRequestError('failed with status: 5, message: receiverNotRegistered', status=5)
+
+    user_cache = UserCache()
+    for _ in range(2):
+        with pytest.raises(ViberRequestError) as exc_info:
+            await user_cache.get_user_details('unknown', fetch)
+        assert str(exc_info.value) == 'failed with status: 5, message: receiverNotRegistered'
+    assert calls == ['unknown']
+
+
+async def test_user_details_transient_error_not_cached():
+    calls = []
+
+    async def fetch(user_id):
+        calls.append(user_id)
+        if len(calls) == 1:
+            raise ViberRequestError('failed with status: 12, message: tooManyRequests', status=12)
+        return {'id': user_id}
+
+    user_cache = UserCache()
+    with pytest.raises(ViberRequestError):
+        await user_cache.get_user_details(USER_ID, fetch)
+    assert await user_cache.get_user_details(USER_ID, fetch) == {'id': USER_ID}
+    assert calls == [USER_ID, USER_ID]
+
+
+async def test_get_online_fetches_missing_only():
+    calls = []
+
+    async def fetch(ids):
+        calls.append(ids)
+        return [{'id': user_id, 'online_status': 0} for user_id in ids if user_id != 'unknown']
+
+    user_cache = UserCache()
+    assert await user_cache.get_online(['a', 'b'], fetch) == [
+        {'id': 'a', 'online_status': 0}, {'id': 'b', 'online_status': 0},
+    ]
+    assert await user_cache.get_online(['b', 'c', 'unknown'], fetch) == [
+        {'id': 'b', 'online_status': 0}, {'id': 'c', 'online_status': 0},
+    ]
+    assert calls == [['a', 'b'], ['c', 'unknown']]
+
+
+async def test_get_online_concurrent_lookups_share_request():
+    calls = []
+
+    async def fetch(ids):
+        calls.append(ids)
+        await asyncio.sleep(0.01)
+        return [{'id': user_id, 'online_status': 0} for user_id in ids]
+
+    user_cache = UserCache()
+    first, second = await asyncio.gather(
+        user_cache.get_online(['a', 'b'], fetch),
+        user_cache.get_online(['b'], fetch),
+    )
+    assert [user['id'] for user in first] == ['a', 'b']
+    assert [user['id'] for user in second] == ['b']
+    assert calls == [['a', 'b']]
+
+
+async def test_prime_keeps_fetched_fields():
+    async def fetch(user_id):
+        return {'id': user_id, 'name': 'old name', 'primary_device_os': 'Android'}
+
+    user_cache = UserCache()
+    await user_cache.get_user_details(USER_ID, fetch)
+    await user_cache.prime(UserProfile(user_id=USER_ID, name='new name', language='uk'))
+
+    assert await user_cache.get_user_details(USER_ID, fetch) == {
+        'id': USER_ID, 'name': 'new name', 'language': 'uk', 'primary_device_os': 'Android',
+    }
+
+
+async def test_api_primes_cache_from_request():
+    async def get_user_details(user_id):
+        pytest.fail('cached user details are not supposed to be requested')
+
+    viber = Api(VIBER_BOT_CONFIGURATION, user_cache=UserCache())
+    viber._request_sender.get_user_details = get_user_details
+
+    viber.parse_request(
+        b'{"event": "message", "timestamp": 1457764197627, "message_token": 4912661846655238145,'
+        b' "sender": {"id": "01234567890A=", "name": "viberUser", "language": "uk", "country": "UA"},'
+        b' "message": {"type": "text", "text": "hi!"}}'
+    )
+    await asyncio.sleep(0)
+
+    user = await viber.get_user_details(USER_ID, allow_partial=True)
+    assert user['language'] == 'uk'
+    assert user['country'] == 'UA'
+
+
+async def test_primed_details_are_partial():
+    calls = []
+
+    async def fetch(user_id):
+        calls.append(user_id)
+        return {'id': user_id, 'name': 'viberUser', 'primary_device_os': 'Android'}
+
+    user_cache = UserCache()
+    await user_cache.prime(UserProfile(user_id=USER_ID, name='viberUser'))
+
+    assert await user_cache.get_user_details(USER_ID, fetch, allow_partial=True) == {
+        'id': USER_ID, 'name': 'viberUser',
+    }
+    assert calls == []
+
+    user = await user_cache.get_user_details(USER_ID, fetch)
+    assert user['primary_device_os'] == 'Android'
+    assert await user_cache.get_user_details(USER_ID, fetch) == user
+    assert calls == [USER_ID]
+
+
+async def test_api_get_online_validation():
+    viber = Api(VIBER_BOT_CONFIGURATION, user_cache=UserCache())
+
+    with pytest.raises(ViberValidationError):
+        await viber.get_online(None)
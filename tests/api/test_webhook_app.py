@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import hmac
+import json
+
+import pytest
+
+from aioviberbot import Api
+from aioviberbot import BotConfiguration
+from aioviberbot.api.deduplicator import Deduplicator
+from aioviberbot.api.errors import ViberValidationError
+from aioviberbot.api.webhook_app import WEBHOOK_PROCESSOR_KEY, ShedPolicy, WebhookSettings, create_webhook_app
+
+VIBER_BOT_CONFIGURATION = BotConfiguration('auth-token-sample', 'testbot', 'http://avatars.com/')
+
+
+def callback(message_token, text='hi'):
+    return json.dumps({
+        'event': 'message',
+        'timestamp': 1457764197627,
+        'message_token': message_token,
+        'sender': {'id': '01234567890A=', 'name': 'viberUser'},
+        'message': {'type': 'text', 'text': text},
+    }).encode('utf-8')
+
+
+def sign(request_data):
+    return hmac.new(
+        VIBER_BOT_CONFIGURATION.auth_token.encode('ascii'), request_data, hashlib.sha256).hexdigest()
+
+
+async def post_callback(client, request_data):
+    return await client.post(
+        '/webhook', data=request_data, headers={'X-Viber-Content-Signature': sign(request_data)})
+
+
+async def test_acks_before_handling(aiohttp_client):
+    release = asyncio.Event()
+    handled = []
+
+    async def handler(viber_request):
+        await release.wait()
+        handled.append(viber_request.message_token)
+
+    app = create_webhook_app(Api(VIBER_BOT_CONFIGURATION), handler, WebhookSettings(workers=2))
+    client = await aiohttp_client(app)
+
+    for message_token in range(3):
+        response = await post_callback(client, callback(message_token))
+        assert response.status == 200
+        assert await response.json() == {'ok': True}
+
+    processor = app[WEBHOOK_PROCESSOR_KEY]
+    await asyncio.sleep(0)
+    assert handled == []
+    assert processor.metrics.busy_workers == 2
+    assert processor.metrics.queue_depth == 1
+
+    release.set()
+    await client.close()
+    assert sorted(handled) == [0, 1, 2]
+    assert processor.metrics.processed == 3
+
+
+async def test_rejects_invalid_requests(aiohttp_client):
+    async def handler(viber_request):
+        pytest.fail('invalid requests are not supposed to be handled')
+
+    app = create_webhook_app(Api(VIBER_BOT_CONFIGURATION), handler)
+    client = await aiohttp_client(app)
+
+    response = await client.post('/webhook', data=callback(1), headers={'X-Viber-Content-Signature': 'wrong'})
+    assert response.status == 403
+
+    response = await post_callback(client, b'{"event": "unknown"}')
+    assert response.status == 400
+
+    metrics = app[WEBHOOK_PROCESSOR_KEY].metrics
+    assert metrics.rejected_signature == 1
+    assert metrics.invalid == 1
+
+
+@pytest.mark.parametrize('shed_policy, status, handled_tokens', [
+    (ShedPolicy.REJECT, 503, [0, 1]),
+    (ShedPolicy.DROP_NEWEST, 200, [0, 1]),
+    (ShedPolicy.DROP_OLDEST, 200, [0, 2]),
+])
+async def test_shed_policy(aiohttp_client, shed_policy, status, handled_tokens):
+    release = asyncio.Event()
+    handled = []
+
+    async def handler(viber_request):
+        await release.wait()
+        handled.append(viber_request.message_token)
+
+    settings = WebhookSettings(queue_size=1, workers=1, shed_policy=shed_policy)
+    app = create_webhook_app(Api(VIBER_BOT_CONFIGURATION), handler, settings)
+    client = await aiohttp_client(app)
+
+    assert (await post_callback(client, callback(0))).status == 200
+    await asyncio.sleep(0)  # the worker takes the first request
+    assert (await post_callback(client, callback(1))).status == 200
+    assert (await post_callback(client, callback(2))).status == status
+
+    release.set()
+    await client.close()
+    assert handled == handled_tokens
+    assert app[WEBHOOK_PROCESSOR_KEY].metrics.shed == 1
+
+
+async def test_handler_errors_are_counted(aiohttp_client):
+    async def handler(viber_request):
+        raise RuntimeError('boom')
+
+    app = create_webhook_app(Api(VIBER_BOT_CONFIGURATION), handler)
+    client = await aiohttp_client(app)
+    assert (await post_callback(client, callback(1))).status == 200
+
+    await client.close()
+    assert app[WEBHOOK_PROCESSOR_KEY].metrics.failed == 1
+
+
+def test_settings_validation():
+    with pytest.raises(ViberValidationError):
+        WebhookSettings(shed_policy='unknown')
+    with pytest.raises(ViberValidationError):
+        WebhookSettings(workers=0)
+
+
+async def test_duplicates_are_acked_without_handling(aiohttp_client):
+    handled = []
+
+    async def handler(viber_request):
+        handled.append(viber_request.message_token)
+
+    app = create_webhook_app(Api(VIBER_BOT_CONFIGURATION), handler, deduplicator=Deduplicator())
+    client = await aiohttp_client(app)
+    for message_token in (1, 1, 2):
+        assert (await post_callback(client, callback(message_token))).status == 200
+
+    await client.close()
+    assert handled == [1, 2]
+    assert app[WEBHOOK_PROCESSOR_KEY].metrics.duplicates == 1
+
+
+async def test_rejected_callback_is_not_a_duplicate(aiohttp_client):
+    release = asyncio.Event()
+
+    async def handler(viber_request):
+        await release.wait()
+
+    settings = WebhookSettings(queue_size=1, workers=1)
+    app = create_webhook_app(Api(VIBER_BOT_CONFIGURATION), handler, settings, deduplicator=Deduplicator())
+    client = await aiohttp_client(app)
+
+    assert (await post_callback(client, callback(0))).status == 200
+    await asyncio.sleep(0)
+    assert (await post_callback(client, callback(1))).status == 200
+    assert (await post_callback(client, callback(2))).status == 503
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert (await post_callback(client, callback(2))).status == 200
+    assert app[WEBHOOK_PROCESSOR_KEY].metrics.duplicates == 0
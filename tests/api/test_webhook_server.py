@@ -0,0 +1,102 @@
+import asyncio
+import os
+import signal
+import threading
+import time
+import urllib.request
+
+import pytest
+from aiohttp import web
+
+from aioviberbot.api.errors import ViberValidationError
+from aioviberbot.api.webhook_server import WebhookServer
+
+APP_FACTORY = 'tests.api.test_webhook_server:create_app'
+
+
+def create_app():
+    async def pid(request):
+        return web.Response(text=str(os.getpid()))
+
+    async def slow(request):
+        await asyncio.sleep(0.5)
+        return web.Response(text='done')
+
+    app = web.Application()
+    app.router.add_get('/pid', pid)
+    app.router.add_get('/slow', slow)
+    return app
+
+
+def get(server, path, timeout=5):
+    url = 'http://127.0.0.1:{0}{1}'.format(server.port, path)
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.read().decode('utf-8')
+
+
+def wait_for_pids(server, pids, timeout=30):
+    # connections are spread by the hash of the client port, so new connections reach every worker soon
+    seen = set()
+    deadline = time.monotonic() + timeout
+    while not set(pids) <= seen:
+        assert time.monotonic() < deadline, 'workers {0} did not respond'.format(set(pids) - seen)
+        try:
+            seen.add(int(get(server, '/pid')))
+        except OSError:
+            time.sleep(0.05)
+    return seen
+
+
+@pytest.fixture
+def server():
+    server = WebhookServer(APP_FACTORY, host='127.0.0.1', port=0, workers=2, shutdown_timeout=5, respawn_delay=0)
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_workers_share_port(server):
+    assert server.port != 0
+    assert len(server.worker_pids) == 2
+    wait_for_pids(server, server.worker_pids)
+
+
+def test_respawns_exited_worker(server):
+    wait_for_pids(server, server.worker_pids)
+    killed_pid = server.worker_pids[0]
+    os.kill(killed_pid, signal.SIGKILL)
+
+    deadline = time.monotonic() + 5
+    while killed_pid in server.worker_pids:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    assert server.check_workers() == 1
+    assert server.respawns_count == 1
+    assert killed_pid not in server.worker_pids
+    wait_for_pids(server, server.worker_pids)
+
+
+def test_stop_finishes_requests_in_flight(server):
+    wait_for_pids(server, server.worker_pids)
+    responses = []
+    requests = [
+        threading.Thread(target=lambda: responses.append(get(server, '/slow')))
+        for _ in range(4)
+    ]
+    for request in requests:
+        request.start()
+    time.sleep(0.2)
+
+    server.stop()
+    for request in requests:
+        request.join()
+
+    assert responses == ['done'] * 4
+    assert server.worker_pids == []
+
+
+def test_invalid_settings():
+    for workers in (0, -1):
+        with pytest.raises(ViberValidationError):
+            WebhookServer(APP_FACTORY, workers=workers)
@@ -3,7 +3,7 @@ from datetime import datetime
 import pytest
 from aioviberbot.api.errors import ViberValidationError
 from aioviberbot.api.messages import MessageType
-from aioviberbot.api.viber_requests import create_request
+from aioviberbot.api.viber_requests import EVENT_TYPE_TO_CLASS, create_request
 
 
 def test_create_request_missing_event():
@@ -24,3 +24,8 @@ def test_create_request_missing_event():
         create_request(sample_request)
 
     assert str(exc_info.value).startswith("request is missing field 'event'")
+
+
+@pytest.mark.parametrize('request_class', list(EVENT_TYPE_TO_CLASS.values()))
+def test_request_has_no_instance_dict(request_class):
+    assert not hasattr(request_class(), '__dict__')